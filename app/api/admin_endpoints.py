@@ -4,6 +4,7 @@ Admin endpoints (require is_admin=True):
   POST  /admin/users           — create a user (admin can set is_admin flag)
   PATCH /admin/users/{user_id} — update is_active / is_admin / full_name
 """
+import asyncio
 import logging
 from uuid import UUID
 
@@ -13,9 +14,13 @@ from sqlalchemy.orm import Session
 from app.db.models import User
 from app.schemas.auth import AdminUserCreate, AdminUserUpdate, UserResponse
 from app.services.auth_service import (
+    Principal,
     get_current_admin_user,
     get_db,
-    hash_password,
+    email_taken,
+    hash_password_async,
+    invalidate_principal,
+    save_user,
 )
 
 logger = logging.getLogger(__name__)
@@ -26,7 +31,7 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 @router.get("/users", response_model=list[UserResponse])
 def list_users(
     db: Session = Depends(get_db),
-    _admin: User = Depends(get_current_admin_user),
+    _admin: Principal = Depends(get_current_admin_user),
 ):
     """Return all users (admin only)."""
     users = db.query(User).order_by(User.created_at.desc()).all()
@@ -34,13 +39,13 @@ def list_users(
 
 
 @router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(
+async def create_user(
     payload: AdminUserCreate,
     db: Session = Depends(get_db),
-    _admin: User = Depends(get_current_admin_user),
+    _admin: Principal = Depends(get_current_admin_user),
 ):
     """Admin creates a user directly (can set is_admin flag)."""
-    if db.query(User).filter(User.email == payload.email).first():
+    if await asyncio.to_thread(email_taken, db, payload.email):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="An account with this email already exists.",
@@ -48,14 +53,12 @@ def create_user(
 
     user = User(
         email=payload.email,
-        hashed_password=hash_password(payload.password),
+        hashed_password=await hash_password_async(payload.password),
         full_name=payload.full_name,
         is_active=True,
         is_admin=payload.is_admin,
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    await asyncio.to_thread(save_user, db, user)
     logger.info(f"Admin created user: {user.email} (admin={user.is_admin})")
     return UserResponse.model_validate(user)
 
@@ -65,7 +68,7 @@ def update_user(
     user_id: UUID,
     payload: AdminUserUpdate,
     db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin_user),
+    admin: Principal = Depends(get_current_admin_user),
 ):
     """Update a user's status or role (admin only)."""
     user = db.query(User).filter(User.id == user_id).first()
@@ -88,5 +91,7 @@ def update_user(
 
     db.commit()
     db.refresh(user)
+    # Role / deactivation must take effect now, not when cached principals expire
+    invalidate_principal(user.id)
     logger.info(f"Admin updated user {user.email}: active={user.is_active}, admin={user.is_admin}")
     return UserResponse.model_validate(user)
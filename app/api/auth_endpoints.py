@@ -4,6 +4,7 @@ Auth endpoints:
   POST /auth/login     — get a JWT (OAuth2 password form)
   GET  /auth/me        — return current user info
 """
+import asyncio
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -20,7 +21,10 @@ from app.services.auth_service import (
     RESET_TOKEN_EXPIRE_MINUTES,
     get_current_user,
     get_db,
-    hash_password,
+    hash_password_async,
+    email_taken,
+    is_first_user,
+    save_user,
 )
 
 logger = logging.getLogger(__name__)
@@ -29,27 +33,25 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=UserWithToken, status_code=status.HTTP_201_CREATED)
-def register(payload: UserCreate, db: Session = Depends(get_db)):
+async def register(payload: UserCreate, db: Session = Depends(get_db)):
     """Open self-signup. First ever user automatically becomes admin."""
-    # Duplicate email check
-    if db.query(User).filter(User.email == payload.email).first():
+    # Database work runs in a thread and hashing on the auth pool — the loop never blocks
+    if await asyncio.to_thread(email_taken, db, payload.email):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="An account with this email already exists.",
         )
 
-    is_first_user = db.query(User).count() == 0
+    first_user = await asyncio.to_thread(is_first_user, db)
 
     user = User(
         email=payload.email,
-        hashed_password=hash_password(payload.password),
+        hashed_password=await hash_password_async(payload.password),
         full_name=payload.full_name,
         is_active=True,
-        is_admin=is_first_user,  # first user gets admin
+        is_admin=first_user,  # first user gets admin
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    await asyncio.to_thread(save_user, db, user)
 
     logger.info(f"New user registered: {user.email} (admin={user.is_admin})")
 
@@ -60,9 +62,9 @@ def register(payload: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=UserWithToken)
-def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """Login with email + password. Returns a JWT."""
-    user = authenticate_user(db, form.username, form.password)
+    user = await authenticate_user(db, form.username, form.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -243,17 +245,17 @@ def forgot_password(payload: ForgotPasswordRequest, db: Session = Depends(get_db
 
 
 @router.post("/reset-password", status_code=status.HTTP_200_OK)
-def reset_password(payload: ResetPasswordRequest, db: Session = Depends(get_db)):
+async def reset_password(payload: ResetPasswordRequest, db: Session = Depends(get_db)):
     """Use a reset token to set a new password."""
     from datetime import datetime
     if len(payload.new_password) < 6:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Password must be at least 6 characters.")
-    user = db.query(User).filter(User.reset_token == payload.token).first()
+    user = await asyncio.to_thread(lambda: db.query(User).filter(User.reset_token == payload.token).first())
     if not user or not user.reset_token_expires or user.reset_token_expires < datetime.utcnow():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired reset token.")
-    user.hashed_password = hash_password(payload.new_password)
+    user.hashed_password = await hash_password_async(payload.new_password)
     user.reset_token = None
     user.reset_token_expires = None
-    db.commit()
+    await asyncio.to_thread(save_user, db, user)
     logger.info(f"Password reset for {user.email}")
     return {"message": "Password updated. You can now sign in."}
@@ -1,21 +1,23 @@
 import logging
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.session import get_db
-from app.db.models import Client, User
+from app.db.models import Client, Job
 from app.schemas.client import ClientCreate, ClientUpdate, ClientResponse
-from app.services.auth_service import get_current_user
+from app.services.auth_service import Principal, get_current_principal
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-def _get_client_or_403(client_id: str, db: Session, current_user: User) -> Client:
+def _get_client_or_403(client_id: str, db: Session, current_user: Principal) -> Client:
     client = db.query(Client).filter(Client.id == client_id).first()
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
@@ -24,7 +26,11 @@ def _get_client_or_403(client_id: str, db: Session, current_user: User) -> Clien
     return client
 
 
-def _to_response(client: Client) -> ClientResponse:
+def _campaign_count(db: Session, client_id) -> int:
+    return db.query(func.count(Job.id)).filter(Job.client_id == client_id).scalar()
+
+
+def _to_response(client: Client, campaign_count: int) -> ClientResponse:
     return ClientResponse(
         id=client.id,
         user_id=client.user_id,
@@ -43,33 +49,53 @@ def _to_response(client: Client) -> ClientResponse:
         main_competitors=client.main_competitors,
         current_marketing_efforts=client.current_marketing_efforts,
         known_customer_objections=client.known_customer_objections,
-        campaign_count=len(client.campaigns),
+        campaign_count=campaign_count,
     )
 
 
 @router.get("/clients", summary="List My Clients", response_model=List[ClientResponse])
 def list_clients(
+    response: Response,
+    q: Optional[str] = Query(None, description="Case-insensitive brand name search"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped at CLIENTS_PAGE_MAX)"),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    """Returns all clients owned by the current user (admins see all)."""
-    if current_user.is_admin:
-        clients = db.query(Client).order_by(Client.brand_name).all()
-    else:
-        clients = (
-            db.query(Client)
-            .filter(Client.user_id == current_user.id)
-            .order_by(Client.brand_name)
-            .all()
-        )
-    return [_to_response(c) for c in clients]
+    """
+    Returns clients owned by the current user (admins see all), ordered by brand name.
+    Campaign counts are a correlated count over the indexed jobs.client_id, computed
+    in the same statement for just the rows on the page — one bounded query.
+    X-Total-Count holds the number of matching clients; when more rows exist, the
+    X-Next-Offset response header holds the offset of the next page.
+    """
+    limit = min(limit or settings.CLIENTS_PAGE_DEFAULT, settings.CLIENTS_PAGE_MAX)
+    campaign_count = (
+        db.query(func.count(Job.id))
+        .filter(Job.client_id == Client.id)
+        .correlate(Client)
+        .scalar_subquery()
+    )
+    query = db.query(Client, campaign_count)
+    if not current_user.is_admin:
+        query = query.filter(Client.user_id == current_user.id)
+    if q:
+        pattern = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(Client.brand_name.ilike(f"%{pattern}%", escape="\\"))
+
+    total = query.with_entities(func.count(Client.id)).scalar()
+    rows = query.order_by(Client.brand_name, Client.id).limit(limit).offset(offset).all()
+    response.headers["X-Total-Count"] = str(total)
+    if offset + len(rows) < total:
+        response.headers["X-Next-Offset"] = str(offset + len(rows))
+    return [_to_response(client, count) for client, count in rows]
 
 
 @router.post("/clients", summary="Create Client", status_code=status.HTTP_201_CREATED, response_model=ClientResponse)
 def create_client(
     body: ClientCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Creates a new client (brand profile) for the current user."""
     client = Client(
@@ -91,18 +117,18 @@ def create_client(
     db.add(client)
     db.commit()
     db.refresh(client)
-    return _to_response(client)
+    return _to_response(client, 0)
 
 
 @router.get("/clients/{client_id}", summary="Get Client", response_model=ClientResponse)
 def get_client(
     client_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Returns a single client profile."""
     client = _get_client_or_403(client_id, db, current_user)
-    return _to_response(client)
+    return _to_response(client, _campaign_count(db, client.id))
 
 
 @router.put("/clients/{client_id}", summary="Update Client", response_model=ClientResponse)
@@ -110,7 +136,7 @@ def update_client(
     client_id: str,
     body: ClientUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Updates an existing client profile."""
     client = _get_client_or_403(client_id, db, current_user)
@@ -118,21 +144,23 @@ def update_client(
         setattr(client, field, value)
     db.commit()
     db.refresh(client)
-    return _to_response(client)
+    return _to_response(client, _campaign_count(db, client.id))
 
 
 @router.delete("/clients/{client_id}", summary="Delete Client", status_code=status.HTTP_204_NO_CONTENT)
 def delete_client(
     client_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Deletes a client. Fails if the client has existing campaigns."""
     client = _get_client_or_403(client_id, db, current_user)
-    if client.campaigns:
+    has_campaigns = db.query(db.query(Job.id).filter(Job.client_id == client.id).exists()).scalar()
+    if has_campaigns:
+        campaign_count = _campaign_count(db, client.id)
         raise HTTPException(
             status_code=409,
-            detail=f"Cannot delete client with {len(client.campaigns)} existing campaign(s). Delete campaigns first.",
+            detail=f"Cannot delete client with {campaign_count} existing campaign(s). Delete campaigns first.",
         )
     db.delete(client)
     db.commit()
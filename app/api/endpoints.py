@@ -1,17 +1,25 @@
+import asyncio
+import base64
+import json
 import logging
-from typing import List
+import uuid
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from fastapi.responses import RedirectResponse, StreamingResponse
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.schemas.questionnaire import QuestionnaireRequest, CampaignCreateRequest
 from app.services.gemini_service import validate_questionnaire, recommend_channels
 from app.services.storage_service import storage_service
-from app.services.workflow import perform_research_workflow
+from app.services.job_events import TERMINAL_EVENTS, job_events
+from app.services.job_queue import RESEARCH_WORKFLOW_TASK, get_job_queue
 from app.db.session import get_db
 from app.db.models import Job, JobStatus, User, Client
-from app.services.auth_service import get_current_user
+from app.services.auth_service import Principal, get_current_principal, get_current_user
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +34,7 @@ router = APIRouter()
 @router.post("/validate", summary="Validate Questionnaire Input")
 async def validate_submission(request: QuestionnaireRequest):
     """Validates the questionnaire data using Gemini AI."""
-    result = validate_questionnaire(request)
+    result = await validate_questionnaire(request)
     if not result.get("valid"):
         raise HTTPException(status_code=400, detail=result)
     return {
@@ -43,9 +51,8 @@ async def validate_submission(request: QuestionnaireRequest):
 @router.post("/jobs", summary="Create a New Campaign", status_code=status.HTTP_201_CREATED)
 async def create_job(
     request: CampaignCreateRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Create a new campaign for an existing client.
     The client profile provides sections 1-4; only the campaign goal (objective + tone)
@@ -58,17 +65,8 @@ async def create_job(
     if not current_user.is_admin and client.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorised to create campaigns for this client")
 
-    # 2. AI-recommended channels
-    channels = recommend_channels(
-        primary_objective=request.primary_objective,
-        desired_tone_of_voice=request.desired_tone_of_voice,
-        industry=client.industry,
-        demographics=client.demographics,
-        psychographics=client.psychographics,
-    )
-
-    # 3. Reconstruct the full questionnaire from client data + campaign goal
-    questionnaire = QuestionnaireRequest(
+    # 2. Reconstruct the full questionnaire from client data + campaign goal
+    questionnaire_data = dict(
         project_metadata={
             "brand_name": client.brand_name,
             "website_url": client.website_url,
@@ -93,16 +91,34 @@ async def create_job(
         the_creative_goal={
             "primary_objective": request.primary_objective,
             "desired_tone_of_voice": request.desired_tone_of_voice,
-            "specific_channels": channels,
+            "specific_channels": [],
         },
     )
 
-    # 4. Validate
-    validation_result = validate_questionnaire(questionnaire)
+    # 3. AI-recommended channels + validation, concurrently. Channels are AI output
+    #    and not known yet, so validation judges only the user-supplied profile and
+    #    goal — the empty placeholder is left out of the validated payload.
+    channels, validation_result = await asyncio.gather(
+        recommend_channels(
+            primary_objective=request.primary_objective,
+            desired_tone_of_voice=request.desired_tone_of_voice,
+            industry=client.industry,
+            demographics=client.demographics,
+            psychographics=client.psychographics,
+        ),
+        validate_questionnaire(
+            QuestionnaireRequest(**questionnaire_data),
+            exclude={"the_creative_goal": {"specific_channels"}},
+        ),
+    )
     if not validation_result.get("valid"):
         raise HTTPException(status_code=400, detail=validation_result)
 
-    # 5. Create Job in DB
+    questionnaire_data["the_creative_goal"]["specific_channels"] = channels
+    questionnaire = QuestionnaireRequest(**questionnaire_data)
+
+    # 4. Create Job in DB and enqueue the workflow in the same transaction,
+    #    so a job can never exist without the queue entry that will run it
     new_job = Job(
         status=JobStatus.APPROVED,
         project_metadata={
@@ -118,67 +134,164 @@ async def create_job(
         client_id=client.id,
     )
     db.add(new_job)
-    db.commit()
-    db.refresh(new_job)
+    db.flush()
 
-    # 6. Persist questionnaire snapshot to MinIO
+    # 5. Persist questionnaire snapshot to MinIO (before the job becomes claimable)
     storage_key = f"jobs/{new_job.id}/questionnaire.json"
-    success = storage_service.upload_json(storage_key, questionnaire.model_dump(mode="json"))
+    success = await storage_service.upload_json_async(storage_key, questionnaire.model_dump(mode="json"))
     if not success:
         logger.error(f"Failed to upload questionnaire artifact for job {new_job.id}")
 
-    # 7. Trigger background research with the reconstructed questionnaire
-    background_tasks.add_task(
-        perform_research_workflow, str(new_job.id), questionnaire.model_dump(mode="json")
+    # 6. Queue the research workflow — picked up by `python -m app.worker`
+    get_job_queue().enqueue(
+        str(new_job.id),
+        RESEARCH_WORKFLOW_TASK,
+        {"request_data": questionnaire.model_dump(mode="json"), "force_refresh": request.force_refresh},
+        db=db,
     )
+    db.commit()
+    db.refresh(new_job)
 
     return {
         "job_id": str(new_job.id),
         "status": "submitted",
-        "message": "Campaign accepted. Research started in background.",
+        "message": "Campaign accepted. Research queued for a worker.",
         "validation_passed": True,
         "recommended_channels": channels,
     }
 
 
+@router.post("/jobs/{job_id}/resume", summary="Resume a Failed Job")
+def resume_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Re-queues a failed job. Steps whose artifacts are already in storage are reused,
+    so the workflow restarts from the first missing step instead of from scratch.
+    The job keeps the force_refresh it was submitted with.
+    """
+    # Row lock: concurrent resumes of the same job queue it only once
+    job = db.query(Job).filter(Job.id == job_id).with_for_update().first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not current_user.is_admin and job.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorised to resume this job")
+    if job.status != JobStatus.FAILED:
+        raise HTTPException(status_code=409, detail=f"Only failed jobs can be resumed (status: {job.status})")
+    queue = get_job_queue()
+    if queue.has_pending(job_id, db=db):
+        raise HTTPException(status_code=409, detail="Job is already queued or running")
+
+    questionnaire = storage_service.get_json(f"jobs/{job_id}/questionnaire.json")
+    if not questionnaire:
+        raise HTTPException(status_code=409, detail="Questionnaire snapshot missing — job cannot be resumed")
+
+    # Imported here: workflow pulls in every pipeline service and python-pptx,
+    # which the API otherwise never needs
+    from app.services.workflow import find_resume_step
+
+    resume_from = find_resume_step(job_id)
+
+    force_refresh = bool((queue.last_payload(job_id, db=db) or {}).get("force_refresh", False))
+
+    job.status = JobStatus.APPROVED
+    job.failed_step = None
+    job.error_message = None
+    queue.enqueue(
+        job_id,
+        RESEARCH_WORKFLOW_TASK,
+        {"request_data": questionnaire, "resume": True, "force_refresh": force_refresh},
+        db=db,
+    )
+    db.commit()
+
+    return {
+        "job_id": job_id,
+        "status": "resumed",
+        "resume_from": resume_from,
+        "message": f"Job re-queued from step '{resume_from}'." if resume_from else "Job re-queued.",
+    }
+
+
+def _encode_cursor(created_at: datetime, job_id) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{job_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, job_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(job_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# project_metadata fields returned by the job list, extracted in SQL (->>) so rows
+# are never hydrated as ORM objects
+_JOB_LIST_METADATA = (
+    "brand_name", "industry", "target_country", "primary_objective",
+    "campaign_name", "campaign_description",
+)
+
+
 @router.get("/jobs", summary="List My Jobs")
 def list_jobs(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped at JOBS_PAGE_MAX)"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    client_id: Optional[uuid.UUID] = Query(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
-    Returns all jobs for the current user.
-    Admins also see ALL jobs across all users.
+    Returns the current user's jobs, newest first. Admins see ALL jobs across all users.
+    Keyset-paginated on (created_at, id): when more rows exist, the X-Next-Cursor
+    response header holds the cursor for the next page.
     """
-    if current_user.is_admin:
-        jobs = db.query(Job).order_by(Job.created_at.desc()).all()
-    else:
-        jobs = (
-            db.query(Job)
-            .filter(Job.user_id == current_user.id)
-            .order_by(Job.created_at.desc())
-            .all()
-        )
+    limit = min(limit or settings.JOBS_PAGE_DEFAULT, settings.JOBS_PAGE_MAX)
+    meta = Job.project_metadata
+    query = db.query(
+        Job.id,
+        Job.status,
+        *(meta[field].as_string().label(field) for field in _JOB_LIST_METADATA),
+        meta["recommended_channels"].label("recommended_channels"),
+        Job.client_id,
+        Job.created_at,
+        Job.updated_at,
+        Job.failed_step,
+        Job.error_message,
+        Job.user_id,
+    )
+    if not current_user.is_admin:
+        query = query.filter(Job.user_id == current_user.id)
+    if status_filter:
+        query = query.filter(Job.status == status_filter)
+    if client_id:
+        query = query.filter(Job.client_id == client_id)
+    if cursor:
+        query = query.filter(tuple_(Job.created_at, Job.id) < tuple_(*_decode_cursor(cursor)))
+
+    rows = query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
 
     return [
         {
-            "job_id": str(j.id),
-            "status": j.status,
-            "brand_name": (j.project_metadata or {}).get("brand_name"),
-            "industry": (j.project_metadata or {}).get("industry"),
-            "target_country": (j.project_metadata or {}).get("target_country"),
-            "primary_objective": (j.project_metadata or {}).get("primary_objective"),
-            "campaign_name": (j.project_metadata or {}).get("campaign_name"),
-            "campaign_description": (j.project_metadata or {}).get("campaign_description"),
-            "recommended_channels": (j.project_metadata or {}).get("recommended_channels"),
-            "client_id": str(j.client_id) if j.client_id else None,
-            "created_at": j.created_at,
-            "updated_at": j.updated_at,
-            "failed_step": j.failed_step,
-            "error_message": j.error_message,
-            "owner_id": str(j.user_id) if j.user_id else None,
+            "job_id": str(r.id),
+            "status": r.status,
+            **{field: getattr(r, field) for field in _JOB_LIST_METADATA},
+            "recommended_channels": r.recommended_channels,
+            "client_id": str(r.client_id) if r.client_id else None,
+            "created_at": r.created_at,
+            "updated_at": r.updated_at,
+            "failed_step": r.failed_step,
+            "error_message": r.error_message,
+            "owner_id": str(r.user_id) if r.user_id else None,
         }
-        for j in jobs
+        for r in rows
     ]
 
 
@@ -186,7 +299,7 @@ def list_jobs(
 def get_job_status(
     job_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Returns the current status and metadata for a specific job."""
     job = db.query(Job).filter(Job.id == job_id).first()
@@ -206,6 +319,8 @@ def get_job_status(
         "campaign_name": (job.project_metadata or {}).get("campaign_name"),
         "campaign_description": (job.project_metadata or {}).get("campaign_description"),
         "recommended_channels": (job.project_metadata or {}).get("recommended_channels"),
+        # "provider/model" → calls, prompt_tokens, cached_tokens (provider prompt-cache hits)
+        "llm_usage": (job.project_metadata or {}).get("llm_usage"),
         "client_id": str(job.client_id) if job.client_id else None,
         "failed_step": job.failed_step,
         "error_message": job.error_message,
@@ -213,11 +328,68 @@ def get_job_status(
     }
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/jobs/{job_id}/events", summary="Stream Job Progress")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Server-Sent Events stream of job progress: a `status` snapshot first, then one
+    event per finished step (research source, analysis model, consensus, each slide
+    as it is written, PPTX) until `completed` or `failed`. Replaces polling GET /jobs/{job_id}.
+    """
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not current_user.is_admin and job.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorised to view this job")
+
+    # Subscribe before taking the snapshot so no event can slip in between
+    queue = job_events.subscribe(job_id)
+    db.refresh(job)
+    snapshot = {
+        "job_id": str(job.id),
+        "status": job.status,
+        "failed_step": job.failed_step,
+        "error_message": job.error_message,
+    }
+    terminal = job.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    async def stream():
+        try:
+            yield _sse("status", snapshot)
+            if terminal:
+                return
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=settings.SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(message["event"], {**message["data"], "ts": message["ts"]})
+                if message["event"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            job_events.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/jobs/{job_id}/questionnaire", summary="Get Job Questionnaire Input")
 def get_job_questionnaire(
     job_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Returns the original questionnaire data submitted for a job."""
     job = db.query(Job).filter(Job.id == job_id).first()
@@ -237,7 +409,7 @@ def get_job_questionnaire(
 def get_job_analysis(
     job_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Retrieves the generated analysis JSON (Hooks, Angles, etc.)"""
     job = db.query(Job).filter(Job.id == job_id).first()
@@ -254,13 +426,24 @@ def get_job_analysis(
     return data
 
 
+PPTX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+
 @router.get("/jobs/{job_id}/download", summary="Download Presentation")
 def download_presentation(
     job_id: str,
+    mode: Optional[Literal["stream", "redirect", "url"]] = Query(
+        None, description="stream = proxy the bytes, redirect = 307 to storage, url = JSON with a presigned URL",
+    ),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    """Downloads the generated PowerPoint presentation for a completed job."""
+    """
+    Downloads the generated PowerPoint presentation for a completed job.
+    In "redirect" and "url" modes the file is served by storage through a short-lived
+    presigned URL, so the download never passes through the API. Without a
+    MINIO_PUBLIC_ENDPOINT those modes fall back to streaming the bytes.
+    """
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -269,6 +452,21 @@ def download_presentation(
         raise HTTPException(status_code=403, detail="Not authorised to download this job")
 
     pptx_key = f"jobs/{job_id}/presentation.pptx"
+    filename = f"marketing_strategy_{job_id}.pptx"
+    mode = mode or settings.DOWNLOAD_MODE
+    if mode != "stream" and not storage_service.presigned_downloads_enabled:
+        mode = "stream"  # a URL signed for the internal MinIO host would not resolve for the browser
+
+    if mode in ("redirect", "url"):
+        if not storage_service.exists(pptx_key):
+            raise HTTPException(
+                status_code=404, detail="Presentation not found (or job is not complete)"
+            )
+        url = storage_service.presigned_download_url(pptx_key, filename=filename, content_type=PPTX_MEDIA_TYPE)
+        if mode == "redirect":
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+        return {"url": url, "filename": filename, "expires_in": settings.PRESIGNED_URL_EXPIRY}
+
     file_stream = storage_service.get_file_stream(pptx_key)
     if not file_stream:
         raise HTTPException(
@@ -277,9 +475,9 @@ def download_presentation(
 
     return StreamingResponse(
         file_stream,
-        media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        media_type=PPTX_MEDIA_TYPE,
         headers={
-            "Content-Disposition": f'attachment; filename="marketing_strategy_{job_id}.pptx"'
+            "Content-Disposition": f'attachment; filename="{filename}"'
         },
     )
 
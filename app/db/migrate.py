@@ -0,0 +1,155 @@
+"""
+Versioned schema migrations — run as a deploy step, not on app import.
+
+    python -m app.db.migrate            # apply pending migrations
+    python -m app.db.migrate --check    # exit 1 if the database is behind
+
+Applied versions are recorded in `schema_migrations`. On Postgres the runner holds
+an advisory lock, so concurrent deploys serialise instead of racing on DDL locks.
+The runner itself is dialect-neutral, so it can be exercised against SQLite in tests.
+API and worker startup only compare versions (see `ensure_schema`), unless
+AUTO_MIGRATE is set for single-process dev setups.
+
+Migration 1 builds the current model metadata, so a fresh database already has
+every later column and index. Later migrations therefore exist to upgrade older
+databases and must stay idempotent (IF NOT EXISTS / IF EXISTS).
+"""
+import argparse
+import logging
+import sys
+from typing import Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant shared by every runner — pg_advisory_lock keys are bigint
+_LOCK_KEY = 0x5048494C  # "PHIL"
+
+
+def _baseline(conn: Connection) -> None:
+    from app.db import models  # noqa: F401 — registers the tables on Base.metadata
+    from app.db.base import Base
+
+    Base.metadata.create_all(bind=conn, checkfirst=True)
+
+
+def _client_scoped_jobs_and_chat(conn: Connection) -> None:
+    conn.execute(text("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS client_id UUID REFERENCES clients(id)"))
+    conn.execute(text("ALTER TABLE chat_messages ALTER COLUMN job_id DROP NOT NULL"))
+    conn.execute(text("ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS client_id UUID REFERENCES clients(id)"))
+
+
+def _list_pagination_indexes(conn: Connection) -> None:
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_created_at_id ON jobs (created_at, id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_user_created_at_id ON jobs (user_id, created_at, id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_clients_user_brand_name ON clients (user_id, brand_name)"))
+
+
+def _jobs_client_id_index(conn: Connection) -> None:
+    # Migration 2 added jobs.client_id without the index the model declares (same name)
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_client_id ON jobs (client_id)"))
+
+
+# (version, name, apply) — append only; never renumber or edit an applied migration
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "baseline", _baseline),
+    (2, "client_scoped_jobs_and_chat", _client_scoped_jobs_and_chat),
+    (3, "list_pagination_indexes", _list_pagination_indexes),
+    (4, "jobs_client_id_index", _jobs_client_id_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: Connection) -> int:
+    """Highest applied version, or 0 for a database that has never been migrated."""
+    if not inspect(conn).has_table("schema_migrations"):
+        return 0
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+
+
+def upgrade() -> int:
+    """Applies pending migrations under the advisory lock; returns how many ran."""
+    applied = 0
+    with engine.connect() as conn:
+        locking = conn.dialect.name == "postgresql"
+        if locking:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _LOCK_KEY})
+            conn.commit()
+        try:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                " version INTEGER PRIMARY KEY,"
+                " name TEXT NOT NULL,"
+                " applied_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+            ))
+            conn.commit()
+            # Read under the lock — another runner may have finished while we waited
+            start = current_version(conn)
+            for version, name, apply in MIGRATIONS:
+                if version <= start:
+                    continue
+                logger.info(f"Applying migration {version}: {name}")
+                apply(conn)
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version, name) VALUES (:v, :n)"),
+                    {"v": version, "n": name},
+                )
+                conn.commit()  # DDL is transactional in Postgres — each migration is atomic
+                applied += 1
+        finally:
+            conn.rollback()
+            if locking:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _LOCK_KEY})
+                conn.commit()
+    return applied
+
+
+def ensure_schema() -> None:
+    """
+    Startup check: one query. Raises if the database is behind this code, unless
+    AUTO_MIGRATE is on, in which case pending migrations are applied first.
+    A database *ahead* of this code is accepted (rolling deploys).
+    """
+    if settings.AUTO_MIGRATE:
+        applied = upgrade()
+        if applied:
+            logger.info(f"AUTO_MIGRATE applied {applied} migration(s)")
+        return
+    with engine.connect() as conn:
+        version = current_version(conn)
+    if version < LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, code expects {LATEST_VERSION}. "
+            f"Run `python -m app.db.migrate` (or set AUTO_MIGRATE=true)."
+        )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Apply database schema migrations.")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if migrations are pending; apply nothing")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+    if args.check:
+        with engine.connect() as conn:
+            version = current_version(conn)
+        logger.info(f"Schema version {version}, latest {LATEST_VERSION}")
+        sys.exit(0 if version >= LATEST_VERSION else 1)
+
+    applied = upgrade()
+    logger.info(f"Applied {applied} migration(s); schema is at version {LATEST_VERSION}")
+
+
+if __name__ == "__main__":
+    main()
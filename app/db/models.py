@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, JSON, Index
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, JSON, Index, Integer, Float
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -17,6 +17,13 @@ class JobStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+class QueueStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -66,6 +73,9 @@ class Job(Base):
     __table_args__ = (
         Index("ix_jobs_status", "status"),
         Index("ix_jobs_created_at", "created_at"),
+        # Keyset pagination of the job list: (created_at, id) for admins, per owner otherwise
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        Index("ix_jobs_user_created_at_id", "user_id", "created_at", "id"),
     )
 
 
@@ -101,6 +111,10 @@ class Client(Base):
     owner = relationship("User", back_populates="clients")
     campaigns = relationship("Job", back_populates="client")
 
+    __table_args__ = (
+        Index("ix_clients_user_brand_name", "user_id", "brand_name"),
+    )
+
     # Client-level chat messages
     chat_messages = relationship("ChatMessage", back_populates="client", order_by="ChatMessage.created_at",
                                   primaryjoin="ChatMessage.client_id == Client.id")
@@ -120,3 +134,39 @@ class ChatMessage(Base):
     job = relationship("Job", back_populates="chat_messages")
     client = relationship("Client", back_populates="chat_messages",
                           primaryjoin="ChatMessage.client_id == Client.id")
+
+
+class JobQueueEntry(Base):
+    """A unit of background work claimed by `python -m app.worker` processes."""
+    __tablename__ = "job_queue"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    task = Column(String, nullable=False)  # e.g. "research_workflow"
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String, default=QueueStatus.QUEUED, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Lease — refreshed by the owning worker; stale leases are requeued
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_job_queue_status_run_after", "status", "run_after"),
+    )
+
+
+class RateLimitBucket(Base):
+    """Shared token bucket for provider rate limiting across worker processes."""
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True)  # "{provider}:{model}:{rpm|tpm}"
+    tokens = Column(Float, nullable=False)  # negative = reserved ahead by queued callers
+    updated_at = Column(DateTime, nullable=False)
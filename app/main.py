@@ -1,6 +1,8 @@
+import asyncio
 import logging
 import sys
-from sqlalchemy import text
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
@@ -10,9 +12,11 @@ from app.api import endpoints
 from app.api.auth_endpoints import router as auth_router
 from app.api.admin_endpoints import router as admin_router
 from app.api.client_endpoints import router as client_router
-from app.db.base import Base
-from app.db.session import engine
-from app.db import models  # Import models to register them
+from app.db.migrate import ensure_schema
+from app.services.http_clients import http_clients
+from app.services.job_events import job_events
+from app.services.render_pool import render_pool
+from app.services.storage_service import storage_service
 
 # Configure structured logging once at startup
 logging.basicConfig(
@@ -22,17 +26,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create tables (checkfirst=True skips objects that already exist)
-Base.metadata.create_all(bind=engine, checkfirst=True)
 
-# Incremental migrations — safe to run repeatedly (IF NOT EXISTS / DROP NOT NULL is idempotent)
-with engine.connect() as _conn:
-    _conn.execute(text("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS client_id UUID REFERENCES clients(id)"))
-    _conn.execute(text("ALTER TABLE chat_messages ALTER COLUMN job_id DROP NOT NULL"))
-    _conn.execute(text("ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS client_id UUID REFERENCES clients(id)"))
-    _conn.commit()
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Schema changes run as a deploy step (python -m app.db.migrate); this is one version query
+    await asyncio.to_thread(ensure_schema)
+    # Build the S3 client and check the bucket now rather than on the first request
+    await storage_service.start()
+
+    # The in-memory queue only lives in this process, so it needs a worker loop here too
+    worker = None
+    worker_task = None
+    if settings.EMBEDDED_WORKER or settings.JOB_QUEUE_BACKEND == "memory":
+        from app.worker import Worker
+
+        worker = Worker()
+        worker_task = asyncio.create_task(worker.run())
+        logger.info("Embedded job worker started")
+
+    # Fan out progress events from workers to this replica's SSE subscribers
+    await job_events.start()
+
+    yield
+
+    await job_events.stop()
+    if worker:
+        worker.stop()
+        await worker_task
+    # Close pooled outbound connections cleanly
+    await http_clients.aclose()
+    render_pool.shutdown()
+
 
-app = FastAPI(title=settings.PROJECT_NAME)
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # CORS — tighten CORS_ALLOW_ORIGINS in production via env var
 app.add_middleware(
@@ -41,6 +67,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Next-Offset"],
 )
 
 
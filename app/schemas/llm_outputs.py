@@ -0,0 +1,92 @@
+"""
+Response models for LLM outputs (analysis, consensus, slides, brand audit, validation).
+
+Every field has a default so a response can be validated field by field: a
+malformed field falls back to its default instead of rejecting the whole
+response (see services/structured_output.py). The same models produce the JSON
+schemas sent to providers for native structured output.
+"""
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+def _as_text(value):
+    """Models sometimes wrap a string in an object ({"hook": "..."}) — unwrap it."""
+    if isinstance(value, dict):
+        for item in value.values():
+            if isinstance(item, str):
+                return item
+    return value
+
+
+class Angle(BaseModel):
+    title: str = ""
+    description: str = ""
+
+
+class BrandAwarenessStrategy(BaseModel):
+    summary: str = Field("", description="How the brand should build recognition (2-3 sentences)")
+    channel_tactics: List[str] = Field(default_factory=list, description="Channel-specific brand awareness tactics")
+    positioning_recommendation: str = Field("", description="How to own a clear position vs. competitors")
+    quick_wins: List[str] = Field(default_factory=list, description="Immediate actions to boost brand visibility")
+
+    @field_validator("channel_tactics", "quick_wins", mode="before")
+    @classmethod
+    def _unwrap_items(cls, value):
+        return [_as_text(item) for item in value] if isinstance(value, list) else value
+
+
+class AnalysisOutput(BaseModel):
+    hooks: List[str] = Field(default_factory=list, description="Powerful marketing hooks, 1 sentence each")
+    angles: List[Angle] = Field(default_factory=list, description="Creative angles")
+    creative_pivot: str = Field("", description="Strategic recommendation on differentiation")
+    brand_awareness_strategy: BrandAwarenessStrategy = Field(default_factory=BrandAwarenessStrategy)
+
+    @field_validator("hooks", mode="before")
+    @classmethod
+    def _unwrap_hooks(cls, value):
+        return [_as_text(item) for item in value] if isinstance(value, list) else value
+
+    @field_validator("angles", mode="before")
+    @classmethod
+    def _angle_from_text(cls, value):
+        if isinstance(value, list):
+            return [{"title": item, "description": ""} if isinstance(item, str) else item for item in value]
+        return value
+
+
+class ConsensusOutput(AnalysisOutput):
+    consensus_notes: str = Field("", description="Where the models agreed vs. disagreed")
+
+
+class BrandAudit(BaseModel):
+    headline: str = Field("", description="The main hero headline or primary message (1-2 sentences)")
+    tagline: Optional[str] = Field(None, description="The brand tagline or slogan if present")
+    positioning_statement: str = Field("", description="What the brand claims to stand for (1-2 sentences)")
+    tone_of_voice: str = Field("", description="The brand's current tone (e.g. professional, playful, bold, minimal)")
+    key_claims: List[str] = Field(default_factory=list, description="Up to 4 main value propositions or benefit claims")
+    gaps: str = Field("", description="What is missing, unclear, or inconsistent in the messaging")
+    brand_maturity: str = Field("", description='One of: "early-stage", "established", "mature"')
+
+
+class QuestionnaireValidation(BaseModel):
+    valid: bool = False
+    feedback: List[str] = Field(default_factory=list)
+
+    @field_validator("feedback", mode="before")
+    @classmethod
+    def _unwrap_feedback(cls, value):
+        return [_as_text(item) for item in value] if isinstance(value, list) else value
+
+
+class Slide(BaseModel):
+    """Common slide fields; type-specific fields (cards, columns, kvp…) pass through untouched."""
+    model_config = ConfigDict(extra="allow")
+
+    type: str = "content"
+    title: str = ""
+
+
+class SlidesOutput(BaseModel):
+    slides: List[Slide] = Field(default_factory=list)
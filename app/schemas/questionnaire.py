@@ -44,3 +44,4 @@ class CampaignCreateRequest(BaseModel):
     campaign_description: Optional[str] = None
     primary_objective: str = Field(..., description="e.g., Awareness, Rebranding, Lead gen")
     desired_tone_of_voice: str = Field(..., description="e.g., Bold, Professional, Humorous")
+    force_refresh: bool = Field(False, description="Re-run research even if cached results are still fresh")
@@ -1,12 +1,16 @@
 """
 Authentication service — JWT creation/validation + password hashing.
 """
+import asyncio
 import logging
 import secrets
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
-from typing import Optional
+from typing import Optional, Tuple
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -14,15 +18,27 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.db.models import User
 from app.db.session import SessionLocal
 from app.schemas.auth import TokenData
+from app.services.job_events import job_events
 
 logger = logging.getLogger(__name__)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing — min == max rounds makes needs_update() flag hashes made at any other cost
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small dedicated pool bounds concurrent hashing without
+# borrowing threads from the pool that serves sync endpoints (status polls, lists)
+_hash_executor = ThreadPoolExecutor(max_workers=settings.AUTH_HASH_WORKERS, thread_name_prefix="auth-hash")
 
 # OAuth2 token URL (used by FastAPI's Swagger UI "Authorize" button)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
@@ -42,6 +58,38 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+async def hash_password_async(plain: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, hash_password, plain)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, verify_password, plain, hashed)
+
+
+async def verify_and_update_async(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(valid, new_hash) — new_hash is set when the stored hash was made at another cost."""
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, pwd_context.verify_and_update, plain, hashed)
+
+
+# Session work for the async auth endpoints — run via asyncio.to_thread so a login
+# burst never blocks the event loop on database I/O.
+
+def email_taken(db: Session, email: str) -> bool:
+    return db.query(User.id).filter(User.email == email).first() is not None
+
+
+def is_first_user(db: Session) -> bool:
+    return db.query(User.id).first() is None
+
+
+def save_user(db: Session, user: User) -> User:
+    """Adds (if new) and commits `user`, then reloads it so no attribute is lazy-loaded later."""
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
 # ---------------------------------------------------------------------------
 # JWT helpers
 # ---------------------------------------------------------------------------
@@ -84,15 +132,23 @@ def get_db():
 # FastAPI dependencies
 # ---------------------------------------------------------------------------
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    credentials_exc = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    Loads the full User row. Only for endpoints that read or write profile / Canva
+    fields — authorization-only endpoints should depend on get_current_principal.
+    """
+    credentials_exc = _credentials_exception()
     try:
         token_data = decode_token(token)
     except ValueError:
@@ -104,7 +160,73 @@ def get_current_user(
     return user
 
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+# ---------------------------------------------------------------------------
+# Cached principal (authorization fast path)
+# ---------------------------------------------------------------------------
+
+PRINCIPAL_INVALIDATED_SIGNAL = "auth.principal_invalidated"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The subset of User that authorization checks need (`.id`, `.is_admin`)."""
+    id: UUID
+    email: str
+    is_admin: bool
+    is_active: bool
+
+
+# user_id (str) → Principal. A miss costs one indexed lookup on a short-lived session.
+_principal_cache = TTLCache(ttl=settings.AUTH_PRINCIPAL_CACHE_TTL, maxsize=4096)
+
+
+def _load_principal(user_id: str) -> Optional[Principal]:
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(User.id, User.email, User.is_admin, User.is_active)
+            .filter(User.id == user_id)
+            .first()
+        )
+    finally:
+        db.close()
+    if row is None:
+        return None
+    return Principal(id=row.id, email=row.email, is_admin=row.is_admin, is_active=row.is_active)
+
+
+def invalidate_principal(user_id) -> None:
+    """Evicts a user's cached principal here and, via NOTIFY, on every other API replica."""
+    _principal_cache.delete(str(user_id))
+    job_events.signal(PRINCIPAL_INVALIDATED_SIGNAL, {"user_id": str(user_id)})
+
+
+job_events.add_hook(PRINCIPAL_INVALIDATED_SIGNAL, lambda data: _principal_cache.delete(data["user_id"]))
+
+
+def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    Validates the JWT and returns the caller's principal, served from a short-TTL
+    in-process cache so status polls and list calls skip the DB round-trip.
+    """
+    credentials_exc = _credentials_exception()
+    try:
+        token_data = decode_token(token)
+    except ValueError:
+        raise credentials_exc
+
+    principal = _principal_cache.get(token_data.user_id)
+    if principal is None:
+        principal = _load_principal(token_data.user_id)
+        if principal is None:
+            raise credentials_exc
+        _principal_cache.set(token_data.user_id, principal)
+    if not principal.is_active:
+        raise credentials_exc
+    return principal
+
+
+def get_current_admin_user(current_user: Principal = Depends(get_current_principal)) -> Principal:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -153,10 +275,16 @@ def send_reset_email(to_email: str, reset_token: str) -> None:
         raise
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    user = db.query(User).filter(User.email == email).first()
+async def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    user = await asyncio.to_thread(lambda: db.query(User).filter(User.email == email).first())
     if not user or not user.hashed_password:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await verify_and_update_async(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made — upgrade it transparently
+        user.hashed_password = new_hash
+        await asyncio.to_thread(save_user, db, user)
+        logger.info(f"Rehashed password for {user.email} at cost {settings.BCRYPT_ROUNDS}")
     return user
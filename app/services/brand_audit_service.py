@@ -5,18 +5,18 @@ Fetches the brand's website and uses Gemini to extract current brand positioning
 messaging, and tone. This grounds the AI analysis in what the brand already communicates
 rather than working blind.
 """
-import json
 import logging
 import re
 
-import google.generativeai as genai
-import httpx
-
 from app.core.config import settings
+from app.schemas.llm_outputs import BrandAudit
+from app.services.http_clients import http_clients
+from app.services.llm_client import llm_client
+from app.services.structured_output import gemini_response_schema, parse_structured
 
 logger = logging.getLogger(__name__)
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
+_BRAND_AUDIT_SCHEMA = gemini_response_schema(BrandAudit)
 
 _HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; MarketingAI-Auditor/1.0)",
@@ -36,7 +36,7 @@ def _strip_html(html: str) -> str:
 
 class BrandAuditService:
     def __init__(self):
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+        self.model = settings.GEMINI_MODEL
 
     async def audit_brand_website(self, website_url: str, brand_name: str) -> dict:
         """
@@ -48,10 +48,9 @@ class BrandAuditService:
 
         # 1. Fetch homepage
         try:
-            async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-                response = await client.get(str(website_url), headers=_HEADERS)
-                response.raise_for_status()
-                raw_text = _strip_html(response.text)
+            response = await http_clients.get("web").get(str(website_url), headers=_HEADERS)
+            response.raise_for_status()
+            raw_text = _strip_html(response.text)
         except Exception as e:
             logger.warning(f"Brand audit fetch failed for {website_url}: {e} — skipping")
             return {}
@@ -77,11 +76,12 @@ class BrandAuditService:
         )
 
         try:
-            response = await self.model.generate_content_async(
+            text = await llm_client.gemini_generate(
                 prompt,
-                generation_config={"response_mime_type": "application/json"},
+                model=self.model,
+                generation_config={"response_mime_type": "application/json", "response_schema": _BRAND_AUDIT_SCHEMA},
             )
-            result = json.loads(response.text)
+            result = parse_structured(text, BrandAudit, "Brand audit")
             result["source_url"] = str(website_url)
             logger.info(f"Brand audit completed for {brand_name}: tone={result.get('tone_of_voice')}")
             return result
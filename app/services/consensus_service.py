@@ -1,14 +1,37 @@
-import json
 import logging
 
-import google.generativeai as genai
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from app.core.config import settings
+from app.schemas.llm_outputs import ConsensusOutput
+from app.services.context_packer import fit_json
+from app.services.llm_client import llm_client
+from app.services.structured_output import gemini_response_schema, parse_structured
 
 logger = logging.getLogger(__name__)
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
+# Role and task spec are static and sent as the system instruction, so every job shares
+# the same prompt prefix (provider prompt caching); only the proposals vary per job.
+_JUDGE_INSTRUCTION = (
+    "You are the Chief Strategy Officer. You have received strategic proposals from your team. "
+    "Your job is to synthesise these into a single FINAL strategy. "
+    "Identify where they agree (High Confidence) and where they disagree. "
+    "Pick the best ideas from each source. Output must be valid JSON only.\n\n"
+    "# Task\n"
+    "Create a Final Consensus Strategy JSON with:\n"
+    '1. "hooks": Select the top 5 hooks from ALL sources. Label each with its source.\n'
+    '2. "angles": Select the top 3 distinct angles. Prioritise angles appearing in multiple proposals.\n'
+    '3. "creative_pivot": Synthesise a single powerful pivot statement.\n'
+    '4. "brand_awareness_strategy": An object with:\n'
+    '   - "summary": How to build brand recognition (2-3 sentences)\n'
+    '   - "channel_tactics": List of 3-4 channel-specific awareness tactics (each a string mentioning the channel)\n'
+    '   - "positioning_recommendation": How to differentiate vs. competitors (1-2 sentences)\n'
+    '   - "quick_wins": List of 3 immediate actions to boost brand visibility\n'
+    '5. "consensus_notes": Brief text explaining where models agreed vs. disagreed.\n\n'
+    "Return ONLY valid JSON. No markdown."
+)
+
+_CONSENSUS_SCHEMA = gemini_response_schema(ConsensusOutput)
 
 
 class ConsensusService:
@@ -19,15 +42,7 @@ class ConsensusService:
 
     def __init__(self):
         # Gemini as judge — avoids GPT-4o grading its own output
-        self.model = genai.GenerativeModel(
-            settings.GEMINI_MODEL,
-            system_instruction=(
-                "You are the Chief Strategy Officer. You have received strategic proposals from your team. "
-                "Your job is to synthesise these into a single FINAL strategy. "
-                "Identify where they agree (High Confidence) and where they disagree. "
-                "Pick the best ideas from each source. Output must be valid JSON only."
-            ),
-        )
+        self.model = settings.GEMINI_MODEL
 
     @retry(
         retry=retry_if_exception_type(Exception),
@@ -35,7 +50,7 @@ class ConsensusService:
         stop=stop_after_attempt(3),
         reraise=True,
     )
-    def generate_consensus(self, analysis_results: dict) -> dict:
+    async def generate_consensus(self, analysis_results: dict) -> dict:
         logger.info("Starting Consensus Generation (Gemini judge)")
 
         gpt4o = analysis_results.get("gpt4o_analysis", {})
@@ -54,34 +69,27 @@ class ConsensusService:
                 "consensus_notes": "All three upstream analysis models returned errors.",
             }
 
-        def _compact(obj: dict, max_chars: int = 3000) -> str:
-            s = json.dumps(obj)
-            return s[:max_chars] + ("…" if len(s) > max_chars else "")
+        def _compact(obj: dict, max_tokens: int = 750) -> str:
+            return fit_json(obj, max_tokens)
 
         user_content = (
             f"# Proposal 1 (GPT-4o):\n{_compact(gpt4o)}\n\n"
             f"# Proposal 2 (Gemini):\n{_compact(gemini)}\n\n"
-            f"# Proposal 3 (Perplexity):\n{_compact(perplexity)}\n\n"
-            "# Task\n"
-            "Create a Final Consensus Strategy JSON with:\n"
-            '1. "hooks": Select the top 5 hooks from ALL sources. Label each with its source.\n'
-            '2. "angles": Select the top 3 distinct angles. Prioritise angles appearing in multiple proposals.\n'
-            '3. "creative_pivot": Synthesise a single powerful pivot statement.\n'
-            '4. "brand_awareness_strategy": An object with:\n'
-            '   - "summary": How to build brand recognition (2-3 sentences)\n'
-            '   - "channel_tactics": List of 3-4 channel-specific awareness tactics (each a string mentioning the channel)\n'
-            '   - "positioning_recommendation": How to differentiate vs. competitors (1-2 sentences)\n'
-            '   - "quick_wins": List of 3 immediate actions to boost brand visibility\n'
-            '5. "consensus_notes": Brief text explaining where models agreed vs. disagreed.\n\n'
-            "Return ONLY valid JSON. No markdown."
+            f"# Proposal 3 (Perplexity):\n{_compact(perplexity)}"
         )
 
         try:
-            response = self.model.generate_content(
+            text = await llm_client.gemini_generate(
                 user_content,
-                generation_config={"response_mime_type": "application/json", "temperature": 0.5},
+                model=self.model,
+                system_instruction=_JUDGE_INSTRUCTION,
+                generation_config={
+                    "response_mime_type": "application/json",
+                    "response_schema": _CONSENSUS_SCHEMA,
+                    "temperature": 0.5,
+                },
             )
-            result = json.loads(response.text)
+            result = parse_structured(text, ConsensusOutput, "Consensus")
             logger.info("Consensus generated successfully")
             return result
         except Exception as e:
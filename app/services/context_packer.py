@@ -0,0 +1,140 @@
+"""
+context_packer.py
+
+Fits research and model output into prompt token budgets without breaking JSON.
+
+Instead of `json.dumps(obj, indent=2)[:N]` — which spends tokens on whitespace,
+can cut mid-key and silently drops whichever sources happen to serialise last —
+objects are serialised compactly and shrunk structurally: long strings are cut
+at a sentence boundary and long lists lose their tail until the result fits.
+The output is always valid JSON.
+
+`pack_research` splits one budget across research sources by weight
+(RESEARCH_PACK_WEIGHTS); budget a small source does not need flows to the others.
+"""
+import json
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+# Same heuristic as rate_limiter.estimate_tokens
+CHARS_PER_TOKEN = 4
+
+_MIN_STRING_CHARS = 40
+_SENTENCE_ENDS = (". ", "! ", "? ", "\n")
+
+
+def _compact(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def trim_text(text: str, max_chars: int) -> str:
+    """Cuts `text` to at most `max_chars`, preferring a sentence end, then a word break."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 1]
+    boundary = max(cut.rfind(end) for end in _SENTENCE_ENDS)
+    if boundary >= max_chars // 2:
+        return cut[:boundary + 1].rstrip() + "…"
+    space = cut.rfind(" ")
+    if space >= max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+def _shrink(obj: Any, str_limit: int, list_limit: int) -> Any:
+    if isinstance(obj, str):
+        return trim_text(obj, str_limit)
+    if isinstance(obj, list):
+        return [_shrink(item, str_limit, list_limit) for item in obj[:list_limit]]
+    if isinstance(obj, dict):
+        return {key: _shrink(value, str_limit, list_limit) for key, value in obj.items()}
+    return obj
+
+
+def _longest(obj: Any) -> tuple:
+    """(longest string, longest list) anywhere in obj — the starting shrink limits."""
+    if isinstance(obj, str):
+        return len(obj), 0
+    items = obj.values() if isinstance(obj, dict) else obj if isinstance(obj, list) else ()
+    longest_str = 0
+    longest_list = len(obj) if isinstance(obj, list) else 0
+    for item in items:
+        s, l = _longest(item)
+        longest_str, longest_list = max(longest_str, s), max(longest_list, l)
+    return longest_str, longest_list
+
+
+def fit_json(obj: Any, max_tokens: int) -> str:
+    """Compact JSON for `obj` that fits in `max_tokens`, shrunk structurally if needed."""
+    max_chars = max(max_tokens, 1) * CHARS_PER_TOKEN
+    text = _compact(obj)
+    if len(text) <= max_chars:
+        return text
+
+    str_limit, list_limit = _longest(obj)
+    str_limit = min(str_limit, max_chars)
+    while True:
+        # Strings give way first; lists start losing their tail once strings are short
+        str_limit = max(_MIN_STRING_CHARS, int(str_limit * 0.7))
+        if str_limit == _MIN_STRING_CHARS or len(text) > 2 * max_chars:
+            list_limit = max(1, list_limit - max(1, list_limit // 4))
+        shrunk = _shrink(obj, str_limit, list_limit)
+        text = _compact(shrunk)
+        if len(text) <= max_chars:
+            return text
+        if str_limit == _MIN_STRING_CHARS and list_limit == 1:
+            break
+
+    # Still too big (very many keys): drop trailing keys, keeping the JSON valid
+    if isinstance(shrunk, dict):
+        keys = list(shrunk)
+        while keys and len(text) > max_chars:
+            keys.pop()
+            text = _compact({key: shrunk[key] for key in keys})
+        if keys:
+            return text
+    return _compact(trim_text(_compact(obj), max_chars - 2))
+
+
+def _allocate(sizes: Dict[str, int], weights: Dict[str, float], budget: int) -> Dict[str, int]:
+    """Weighted split of `budget` (tokens); sources needing less than their share release the rest."""
+    allocation: Dict[str, int] = {}
+    remaining = dict(sizes)
+    while remaining:
+        total_weight = sum(weights[name] for name in remaining)
+        left = budget - sum(allocation.values())
+        share = {name: left * weights[name] / total_weight for name in remaining}
+        satisfied = [name for name in remaining if remaining[name] <= share[name]]
+        if not satisfied:
+            allocation.update({name: int(share[name]) for name in remaining})
+            break
+        for name in satisfied:
+            allocation[name] = remaining.pop(name)
+    return allocation
+
+
+def pack_research(research: dict, budget_tokens: Optional[int] = None) -> str:
+    """
+    Packs a consolidated research dict into one prompt section per source, within
+    `budget_tokens` (default ANALYSIS_RESEARCH_TOKEN_BUDGET). Empty sources are omitted.
+    """
+    budget = budget_tokens or settings.ANALYSIS_RESEARCH_TOKEN_BUDGET
+    sources = {name: value for name, value in (research or {}).items() if value}
+    if not sources:
+        return "{}"
+
+    serialised = {name: _compact(value) for name, value in sources.items()}
+    # Section headers cost a few tokens each — reserve them up front
+    budget = max(budget - 8 * len(sources), len(sources))
+    sizes = {name: len(text) // CHARS_PER_TOKEN + 1 for name, text in serialised.items()}
+    weights = {name: max(float(settings.RESEARCH_PACK_WEIGHTS.get(name, 1)), 0.1) for name in sources}
+    allocation = _allocate(sizes, weights, budget)
+
+    # Highest-weight sources first, so the most relevant material leads the prompt
+    order = sorted(sources, key=lambda name: -weights[name])
+    sections = []
+    for name in order:
+        text = serialised[name] if sizes[name] <= allocation[name] else fit_json(sources[name], allocation[name])
+        sections.append(f"## {name}\n{text}")
+    return "\n\n".join(sections)
@@ -1,20 +1,18 @@
 import asyncio
 import logging
 
-import google.generativeai as genai
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from app.core.config import settings
 from app.schemas.questionnaire import QuestionnaireRequest
+from app.services.llm_client import llm_client
 
 logger = logging.getLogger(__name__)
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
 
 class GeminiResearchService:
     def __init__(self):
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+        self.model = settings.GEMINI_MODEL
 
     def _generate_creative_queries(self, data: QuestionnaireRequest) -> dict:
         """
@@ -57,10 +55,10 @@ class GeminiResearchService:
         reraise=True,
     )
     async def _search_async(self, query: str, category: str) -> dict:
-        response = await self.model.generate_content_async(query)
+        text = await llm_client.gemini_generate(query, model=self.model)
         return {
             "query": query,
-            "content": response.text,
+            "content": text,
             "source": "gemini_search",
         }
 
@@ -1,12 +1,33 @@
-import json
-import google.generativeai as genai
+import logging
+from typing import Optional
+
+from app.core.cache import TTLCache, hash_key
 from app.core.config import settings
+from app.schemas.llm_outputs import QuestionnaireValidation
 from app.schemas.questionnaire import QuestionnaireRequest
+from app.services.llm_client import llm_client
+from app.services.structured_output import gemini_response_schema, parse_structured, repair_json
+
+logger = logging.getLogger(__name__)
+
+_MODEL = "gemini-2.0-flash"
+
+_CHANNELS_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {"type": "array", "items": {"type": "string"}},
+}
+_VALIDATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": gemini_response_schema(QuestionnaireValidation),
+}
+
+# Results keyed on a hash of the inputs, so re-submitting an unchanged client
+# profile skips the Gemini round-trip. System-error fallbacks are never cached.
+_channel_cache = TTLCache(ttl=settings.VALIDATION_CACHE_TTL)
+_validation_cache = TTLCache(ttl=settings.VALIDATION_CACHE_TTL)
 
-# Configure API Key (Best practice: Move this to a lifespan event or config init, but global here is fine for MVP)
-genai.configure(api_key=settings.GEMINI_API_KEY)
 
-def recommend_channels(
+async def recommend_channels(
     primary_objective: str,
     desired_tone_of_voice: str,
     industry: str,
@@ -19,7 +40,10 @@ def recommend_channels(
     Returns a list of channel names (e.g. ["TikTok", "Instagram"]).
     Falls back to sensible defaults on error.
     """
-    model = genai.GenerativeModel("gemini-2.0-flash")
+    cache_key = hash_key(primary_objective, desired_tone_of_voice, industry, demographics, psychographics)
+    cached = _channel_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     prompt = f"""You are a senior media strategist. Based on the campaign details below,
 recommend the 3-5 most effective marketing channels. Return ONLY a raw JSON array of
@@ -34,24 +58,32 @@ Target Psychographics: {psychographics}
 Example output: ["TikTok", "Instagram", "YouTube"]"""
 
     try:
-        response = model.generate_content(prompt)
-        clean_text = response.text.replace("```json", "").replace("```", "").strip()
-        channels = json.loads(clean_text)
+        text = await llm_client.gemini_generate(prompt, model=_MODEL, generation_config=_CHANNELS_CONFIG)
+        channels = repair_json(text)
+        if isinstance(channels, list):
+            channels = [channel for channel in channels if isinstance(channel, str) and channel.strip()]
         if isinstance(channels, list) and channels:
+            _channel_cache.set(cache_key, channels)
             return channels
     except Exception as e:
-        print(f"Gemini channel recommendation error: {e}")
+        logger.warning(f"Gemini channel recommendation error: {e}")
 
     # Sensible default fallback
     return ["Instagram", "LinkedIn", "YouTube"]
 
 
-def validate_questionnaire(data: QuestionnaireRequest) -> dict:
+async def validate_questionnaire(data: QuestionnaireRequest, exclude: Optional[dict] = None) -> dict:
     """
     Sends the questionnaire data to Gemini to validate coherence and depth.
+    `exclude` (pydantic dump syntax) leaves out fields the user did not write,
+    e.g. channels that are recommended by AI afterwards.
     Returns a dictionary: {"valid": bool, "feedback": list[str]}
     """
-    model = genai.GenerativeModel('gemini-2.0-flash') # Updated to available model version
+    payload = data.model_dump_json(exclude=exclude)
+    cache_key = hash_key(payload)
+    cached = _validation_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     system_instruction = """
     You are an expert Marketing Strategy Validator. Your role is to Gatekeep the quality of input data.
@@ -76,18 +108,16 @@ def validate_questionnaire(data: QuestionnaireRequest) -> dict:
     }
     """
     
-    prompt = f"{system_instruction}\n\nInput Data:\n{data.model_dump_json()}"
+    prompt = f"{system_instruction}\n\nInput Data:\n{payload}"
     
     try:
-        response = model.generate_content(prompt)
-        
-        # Clean potential markdown if Gemini adds it despite instructions
-        clean_text = response.text.replace("```json", "").replace("```", "").strip()
-        
-        return json.loads(clean_text)
+        text = await llm_client.gemini_generate(prompt, model=_MODEL, generation_config=_VALIDATION_CONFIG)
+        result = parse_structured(text, QuestionnaireValidation, "Questionnaire validation")
+        _validation_cache.set(cache_key, result)
+        return result
     except Exception as e:
         # Fallback in case of API error or JSON parse error
-        print(f"Gemini Validation Error: {e}")
+        logger.warning(f"Gemini Validation Error: {e}")
         return {
             "valid": False,
             "feedback": ["System error during validation. Please try again later or check your API key."]
@@ -0,0 +1,101 @@
+"""
+http_clients.py
+
+Registry of long-lived, pooled httpx.AsyncClient instances — one per outbound
+provider — so TLS handshakes and connections are reused across calls and jobs.
+
+Clients are created on first use with HTTP/2 (when `h2` is installed), keep-alive
+and a connection pool limit, and closed by the application lifespan hook
+(app/main.py) or the worker on shutdown.
+"""
+import asyncio
+import importlib.util
+import logging
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# httpx's HTTP/2 support needs the optional 'h2' package
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# name → client options. httpx limits apply to a client's whole pool: for the
+# single-host provider clients that is a per-host limit, for "web" it is a total
+# across every site it fetches.
+_PROFILES = {
+    "perplexity": {
+        "base_url": "https://api.perplexity.ai",
+        "timeout": 60.0,
+        "auth_header": lambda: f"Bearer {settings.PERPLEXITY_API_KEY}",
+    },
+    "openai": {
+        "timeout": 120.0,
+    },
+    # Arbitrary brand homepages — many hosts sharing one pool, short timeout
+    "web": {
+        "timeout": 15.0,
+        "follow_redirects": True,
+    },
+}
+
+
+class HTTPClientRegistry:
+    def __init__(self):
+        self._clients: dict = {}
+        self._warned_http2 = False
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """
+        Returns the shared client for `name`, creating it on first use.
+        A client is bound to the event loop that created it, so a new one is
+        built if called from a different loop (e.g. successive asyncio.run calls).
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(name)
+        if entry is not None:
+            client, owner_loop = entry
+            if owner_loop is loop and not client.is_closed:
+                return client
+
+        client = self._build(name)
+        self._clients[name] = (client, loop)
+        return client
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        if name not in _PROFILES:
+            raise KeyError(f"Unknown HTTP client profile '{name}'")
+        profile = _PROFILES[name]
+
+        headers = {}
+        if "auth_header" in profile:
+            headers["Authorization"] = profile["auth_header"]()
+
+        http2 = settings.HTTP2_ENABLED and _HTTP2_AVAILABLE
+        if settings.HTTP2_ENABLED and not _HTTP2_AVAILABLE and not self._warned_http2:
+            logger.warning("HTTP2_ENABLED is set but the 'h2' package is missing — using HTTP/1.1")
+            self._warned_http2 = True
+
+        return httpx.AsyncClient(
+            base_url=profile.get("base_url", ""),
+            timeout=profile["timeout"],
+            follow_redirects=profile.get("follow_redirects", False),
+            headers=headers,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    async def aclose(self) -> None:
+        """Closes every client created by the current event loop."""
+        loop = asyncio.get_running_loop()
+        for name, (client, owner_loop) in list(self._clients.items()):
+            if owner_loop is loop:
+                await client.aclose()
+            self._clients.pop(name, None)
+
+
+http_clients = HTTPClientRegistry()
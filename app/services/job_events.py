@@ -0,0 +1,208 @@
+"""
+job_events.py
+
+Pub/sub for fine-grained job progress (each research source, each analysis model,
+consensus, slides, PPTX) consumed by the `GET /jobs/{id}/events` SSE endpoint.
+
+Backends (JOB_EVENTS_BACKEND):
+  - "postgres": publishers `pg_notify` on the job_events channel; every API replica
+    LISTENs on a dedicated connection and fans events out to its local subscribers.
+    Works across worker processes and API replicas.
+  - "memory":   events are delivered in-process only (tests / embedded worker).
+
+Process-wide signals that are not job progress use `signal(name, data)` and
+`add_hook(name, callback)` instead. They travel on their own app_signals channel and
+never reach job subscribers — e.g. auth_service evicts cached principals on every
+replica when an admin changes a user.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "job_events"
+SIGNAL_CHANNEL = "app_signals"
+TERMINAL_EVENTS = ("completed", "failed")
+
+# NOTIFY payloads are capped at 8000 bytes by Postgres
+_MAX_PAYLOAD_BYTES = 7500
+
+
+class JobEventBus:
+    def __init__(self):
+        self._subscribers: dict = {}  # job_id → set of (loop, asyncio.Queue)
+        self._listen_conn = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._hooks: dict = {}  # signal name → list of callbacks(data), run on every process
+
+    # ------------------------------------------------------------------ #
+    # Subscribers
+    # ------------------------------------------------------------------ #
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        self._subscribers.setdefault(str(job_id), set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        subs = self._subscribers.get(str(job_id))
+        if not subs:
+            return
+        for entry in [e for e in subs if e[1] is queue]:
+            subs.discard(entry)
+        if not subs:
+            self._subscribers.pop(str(job_id), None)
+
+    def add_hook(self, signal: str, callback: Callable[[dict], None]) -> None:
+        """Runs `callback(data)` in every process whenever `signal(signal, data)` is sent."""
+        self._hooks.setdefault(signal, []).append(callback)
+
+    def _run_hooks(self, message: dict) -> None:
+        for callback in self._hooks.get(message.get("signal"), ()):
+            try:
+                callback(message.get("data") or {})
+            except Exception as e:
+                logger.warning(f"Hook for signal '{message.get('signal')}' failed: {e}")
+
+    def _dispatch(self, message: dict) -> None:
+        for loop, queue in list(self._subscribers.get(message.get("job_id"), ())):
+            loop.call_soon_threadsafe(self._offer, queue, message)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, message: dict) -> None:
+        if queue.full():
+            queue.get_nowait()  # slow consumer — drop the oldest event
+        queue.put_nowait(message)
+
+    # ------------------------------------------------------------------ #
+    # Publishing
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _message(job_id: str, event: str, data: Optional[dict]) -> dict:
+        return {
+            "job_id": str(job_id),
+            "event": event,
+            "data": data or {},
+            "ts": datetime.utcnow().isoformat(),
+        }
+
+    async def publish(self, job_id: str, event: str, data: Optional[dict] = None) -> None:
+        """Publishes a progress event. Never raises — progress must not fail a job."""
+        message = self._message(job_id, event, data)
+        try:
+            if settings.JOB_EVENTS_BACKEND == "postgres":
+                await asyncio.to_thread(self._notify, message)
+            else:
+                self._dispatch(message)
+        except Exception as e:
+            logger.warning(f"[Job {job_id}] Could not publish '{event}' event: {e}")
+
+    def signal(self, name: str, data: Optional[dict] = None) -> None:
+        """Sends a process-wide signal to the `add_hook` callbacks (sync callers). Never raises."""
+        message = {"signal": name, "data": data or {}}
+        try:
+            if settings.JOB_EVENTS_BACKEND == "postgres":
+                self._notify(message, SIGNAL_CHANNEL)
+            else:
+                self._run_hooks(message)
+        except Exception as e:
+            logger.warning(f"Could not send '{name}' signal: {e}")
+
+    @staticmethod
+    def _notify(message: dict, channel: str = CHANNEL) -> None:
+        payload = json.dumps(message, default=str)
+        if len(payload.encode("utf-8")) > _MAX_PAYLOAD_BYTES:
+            message = {**message, "data": {"truncated": True}}
+            payload = json.dumps(message, default=str)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+            conn.commit()
+
+    # ------------------------------------------------------------------ #
+    # Postgres listener (API processes only)
+    # ------------------------------------------------------------------ #
+    async def start(self) -> None:
+        if settings.JOB_EVENTS_BACKEND != "postgres":
+            return
+        self._loop = asyncio.get_running_loop()
+        try:
+            await asyncio.to_thread(self._connect)
+        except Exception as e:
+            logger.warning(f"Job event listener could not connect, retrying: {e}")
+            self._schedule_reconnect()
+
+    def _connect(self) -> None:
+        # A dedicated connection outside the pool — it LISTENs for the process lifetime
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        url = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        conn = psycopg2.connect(url)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {CHANNEL}")
+            cur.execute(f"LISTEN {SIGNAL_CHANNEL}")
+        self._listen_conn = conn
+        self._loop.call_soon_threadsafe(self._loop.add_reader, conn.fileno(), self._on_readable)
+        logger.info("Job event listener connected")
+
+    def _on_readable(self) -> None:
+        try:
+            self._listen_conn.poll()
+        except Exception as e:
+            logger.warning(f"Job event listener connection lost: {e}")
+            self._drop_connection()
+            self._schedule_reconnect()
+            return
+        while self._listen_conn.notifies:
+            notify = self._listen_conn.notifies.pop(0)
+            try:
+                message = json.loads(notify.payload)
+            except ValueError:
+                logger.warning("Ignoring malformed job event payload")
+                continue
+            if notify.channel == SIGNAL_CHANNEL:
+                self._run_hooks(message)
+            else:
+                self._dispatch(message)
+
+    def _drop_connection(self) -> None:
+        if self._listen_conn is None:
+            return
+        try:
+            self._loop.remove_reader(self._listen_conn.fileno())
+        except Exception:
+            pass
+        try:
+            self._listen_conn.close()
+        except Exception:
+            pass
+        self._listen_conn = None
+
+    def _schedule_reconnect(self) -> None:
+        async def _retry():
+            while self._listen_conn is None:
+                await asyncio.sleep(5)
+                try:
+                    await asyncio.to_thread(self._connect)
+                except Exception as e:
+                    logger.warning(f"Job event listener reconnect failed: {e}")
+
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = self._loop.create_task(_retry())
+
+    async def stop(self) -> None:
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        self._drop_connection()
+
+
+job_events = JobEventBus()
@@ -0,0 +1,365 @@
+"""
+job_queue.py
+
+Durable queue for long-running job work (research → analysis → PPTX).
+
+The API only enqueues; `python -m app.worker` processes claim entries, heartbeat
+them while they run and requeue entries whose worker went silent. Two backends:
+
+  - PostgresJobQueue: `job_queue` table claimed with SELECT … FOR UPDATE SKIP LOCKED
+  - InMemoryJobQueue: process-local stand-in for tests and single-process dev runs
+"""
+import logging
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import JobQueueEntry, QueueStatus
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Task names understood by app.worker
+RESEARCH_WORKFLOW_TASK = "research_workflow"
+
+
+@dataclass
+class QueuedTask:
+    id: str
+    job_id: str
+    task: str
+    payload: dict = field(default_factory=dict)
+    attempts: int = 0
+    max_attempts: int = 3
+
+
+class JobQueueBackend:
+    """Interface shared by all queue backends. All methods are synchronous."""
+
+    def enqueue(self, job_id: str, task: str, payload: dict, db: Optional[Session] = None) -> str:
+        raise NotImplementedError
+
+    def claim(self, worker_id: str) -> Optional[QueuedTask]:
+        raise NotImplementedError
+
+    def heartbeat(self, task_id: str, worker_id: str) -> bool:
+        """Refreshes the lease. Returns False if the worker no longer owns the task."""
+        raise NotImplementedError
+
+    def complete(self, task_id: str) -> None:
+        raise NotImplementedError
+
+    def fail(self, task_id: str, error: str, retry: bool = True) -> None:
+        raise NotImplementedError
+
+    def requeue_stalled(self, stall_timeout: int) -> List[QueuedTask]:
+        """
+        Requeues running tasks whose heartbeat is older than stall_timeout seconds.
+        Returns the tasks that were abandoned because they ran out of attempts.
+        """
+        raise NotImplementedError
+
+    def has_pending(self, job_id: str, db: Optional[Session] = None) -> bool:
+        """True while the job has a queued (incl. waiting out a retry backoff) or running entry."""
+        raise NotImplementedError
+
+    def last_payload(self, job_id: str, db: Optional[Session] = None) -> Optional[dict]:
+        """Payload of the job's most recently enqueued entry, or None if it was never queued."""
+        raise NotImplementedError
+
+
+# ---------------------------------------------------------------------------
+# Postgres (default)
+# ---------------------------------------------------------------------------
+
+class PostgresJobQueue(JobQueueBackend):
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+
+    @staticmethod
+    def _to_task(entry: JobQueueEntry) -> QueuedTask:
+        return QueuedTask(
+            id=str(entry.id),
+            job_id=str(entry.job_id),
+            task=entry.task,
+            payload=entry.payload or {},
+            attempts=entry.attempts,
+            max_attempts=entry.max_attempts,
+        )
+
+    def enqueue(self, job_id: str, task: str, payload: dict, db: Optional[Session] = None) -> str:
+        """Adds a queue entry. When `db` is given the entry commits with the caller's transaction."""
+        entry = JobQueueEntry(
+            job_id=job_id,
+            task=task,
+            payload=payload,
+            status=QueueStatus.QUEUED,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+        )
+        if db is not None:
+            db.add(entry)
+            db.flush()
+            return str(entry.id)
+
+        session = self._session_factory()
+        try:
+            session.add(entry)
+            session.commit()
+            return str(entry.id)
+        finally:
+            session.close()
+
+    def claim(self, worker_id: str) -> Optional[QueuedTask]:
+        session = self._session_factory()
+        try:
+            now = datetime.utcnow()
+            entry = (
+                session.query(JobQueueEntry)
+                .filter(JobQueueEntry.status == QueueStatus.QUEUED, JobQueueEntry.run_after <= now)
+                .order_by(JobQueueEntry.run_after, JobQueueEntry.created_at)
+                .with_for_update(skip_locked=True)
+                .limit(1)
+                .first()
+            )
+            if not entry:
+                session.rollback()
+                return None
+
+            entry.status = QueueStatus.RUNNING
+            entry.attempts += 1
+            entry.locked_by = worker_id
+            entry.locked_at = now
+            entry.heartbeat_at = now
+            session.commit()
+            return self._to_task(entry)
+        finally:
+            session.close()
+
+    def heartbeat(self, task_id: str, worker_id: str) -> bool:
+        session = self._session_factory()
+        try:
+            updated = (
+                session.query(JobQueueEntry)
+                .filter(
+                    JobQueueEntry.id == task_id,
+                    JobQueueEntry.locked_by == worker_id,
+                    JobQueueEntry.status == QueueStatus.RUNNING,
+                )
+                .update({JobQueueEntry.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+            )
+            session.commit()
+            return updated == 1
+        finally:
+            session.close()
+
+    def complete(self, task_id: str) -> None:
+        session = self._session_factory()
+        try:
+            session.query(JobQueueEntry).filter(JobQueueEntry.id == task_id).update(
+                {JobQueueEntry.status: QueueStatus.DONE, JobQueueEntry.locked_by: None},
+                synchronize_session=False,
+            )
+            session.commit()
+        finally:
+            session.close()
+
+    def fail(self, task_id: str, error: str, retry: bool = True) -> None:
+        session = self._session_factory()
+        try:
+            entry = session.query(JobQueueEntry).filter(JobQueueEntry.id == task_id).with_for_update().first()
+            if not entry:
+                return
+            entry.last_error = error[:1000]
+            entry.locked_by = None
+            if retry and entry.attempts < entry.max_attempts:
+                entry.status = QueueStatus.QUEUED
+                entry.run_after = datetime.utcnow() + timedelta(seconds=_retry_delay(entry.attempts))
+            else:
+                entry.status = QueueStatus.FAILED
+            session.commit()
+        finally:
+            session.close()
+
+    def requeue_stalled(self, stall_timeout: int) -> List[QueuedTask]:
+        session = self._session_factory()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=stall_timeout)
+            stalled = (
+                session.query(JobQueueEntry)
+                .filter(JobQueueEntry.status == QueueStatus.RUNNING, JobQueueEntry.heartbeat_at < cutoff)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            abandoned = []
+            for entry in stalled:
+                logger.warning(
+                    f"[Queue] Task {entry.id} (job {entry.job_id}) stalled on worker {entry.locked_by}"
+                )
+                entry.locked_by = None
+                entry.last_error = "Worker heartbeat lost"
+                if entry.attempts < entry.max_attempts:
+                    entry.status = QueueStatus.QUEUED
+                    entry.run_after = datetime.utcnow()
+                else:
+                    entry.status = QueueStatus.FAILED
+                    abandoned.append(self._to_task(entry))
+            session.commit()
+            return abandoned
+        finally:
+            session.close()
+
+    def _query_entries(self, job_id: str, db: Optional[Session], query):
+        session = db if db is not None else self._session_factory()
+        try:
+            return query(session.query(JobQueueEntry).filter(JobQueueEntry.job_id == job_id))
+        finally:
+            if db is None:
+                session.close()
+
+    def has_pending(self, job_id: str, db: Optional[Session] = None) -> bool:
+        return self._query_entries(job_id, db, lambda q: q.filter(
+            JobQueueEntry.status.in_((QueueStatus.QUEUED, QueueStatus.RUNNING))
+        ).first() is not None)
+
+    def last_payload(self, job_id: str, db: Optional[Session] = None) -> Optional[dict]:
+        entry = self._query_entries(job_id, db, lambda q: q.order_by(JobQueueEntry.created_at.desc()).first())
+        return (entry.payload or {}) if entry else None
+
+
+# ---------------------------------------------------------------------------
+# In-memory (tests / single process)
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _MemoryEntry:
+    task: QueuedTask
+    status: str = QueueStatus.QUEUED
+    run_after: datetime = field(default_factory=datetime.utcnow)
+    locked_by: Optional[str] = None
+    heartbeat_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+
+class InMemoryJobQueue(JobQueueBackend):
+    def __init__(self):
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, job_id: str, task: str, payload: dict, db: Optional[Session] = None) -> str:
+        task_id = str(uuid.uuid4())
+        with self._lock:
+            self._entries[task_id] = _MemoryEntry(
+                task=QueuedTask(
+                    id=task_id,
+                    job_id=str(job_id),
+                    task=task,
+                    payload=payload,
+                    max_attempts=settings.JOB_MAX_ATTEMPTS,
+                )
+            )
+        return task_id
+
+    def claim(self, worker_id: str) -> Optional[QueuedTask]:
+        now = datetime.utcnow()
+        with self._lock:
+            ready = [
+                e for e in self._entries.values()
+                if e.status == QueueStatus.QUEUED and e.run_after <= now
+            ]
+            if not ready:
+                return None
+            entry = min(ready, key=lambda e: e.run_after)
+            entry.status = QueueStatus.RUNNING
+            entry.task.attempts += 1
+            entry.locked_by = worker_id
+            entry.heartbeat_at = now
+            return QueuedTask(**vars(entry.task))
+
+    def heartbeat(self, task_id: str, worker_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(task_id)
+            if not entry or entry.locked_by != worker_id or entry.status != QueueStatus.RUNNING:
+                return False
+            entry.heartbeat_at = datetime.utcnow()
+            return True
+
+    def complete(self, task_id: str) -> None:
+        with self._lock:
+            entry = self._entries.get(task_id)
+            if entry:
+                entry.status = QueueStatus.DONE
+                entry.locked_by = None
+
+    def fail(self, task_id: str, error: str, retry: bool = True) -> None:
+        with self._lock:
+            entry = self._entries.get(task_id)
+            if not entry:
+                return
+            entry.last_error = error[:1000]
+            entry.locked_by = None
+            if retry and entry.task.attempts < entry.task.max_attempts:
+                entry.status = QueueStatus.QUEUED
+                entry.run_after = datetime.utcnow() + timedelta(seconds=_retry_delay(entry.task.attempts))
+            else:
+                entry.status = QueueStatus.FAILED
+
+    def requeue_stalled(self, stall_timeout: int) -> List[QueuedTask]:
+        cutoff = datetime.utcnow() - timedelta(seconds=stall_timeout)
+        abandoned = []
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.status != QueueStatus.RUNNING or entry.heartbeat_at >= cutoff:
+                    continue
+                entry.locked_by = None
+                entry.last_error = "Worker heartbeat lost"
+                if entry.task.attempts < entry.task.max_attempts:
+                    entry.status = QueueStatus.QUEUED
+                    entry.run_after = datetime.utcnow()
+                else:
+                    entry.status = QueueStatus.FAILED
+                    abandoned.append(QueuedTask(**vars(entry.task)))
+        return abandoned
+
+    def has_pending(self, job_id: str, db: Optional[Session] = None) -> bool:
+        with self._lock:
+            return any(
+                e.task.job_id == str(job_id) and e.status in (QueueStatus.QUEUED, QueueStatus.RUNNING)
+                for e in self._entries.values()
+            )
+
+    def last_payload(self, job_id: str, db: Optional[Session] = None) -> Optional[dict]:
+        with self._lock:
+            # dicts keep insertion order, so the last match is the latest entry
+            payloads = [e.task.payload for e in self._entries.values() if e.task.job_id == str(job_id)]
+        return payloads[-1] if payloads else None
+
+    def status_of(self, task_id: str) -> Optional[str]:
+        """Test helper — returns the current status of a task."""
+        entry = self._entries.get(task_id)
+        return entry.status if entry else None
+
+
+def _retry_delay(attempts: int) -> int:
+    """Exponential backoff between attempts: 30s, 60s, 120s… capped at 10 minutes."""
+    return min(30 * 2 ** max(attempts - 1, 0), 600)
+
+
+_job_queue: Optional[JobQueueBackend] = None
+
+
+def get_job_queue() -> JobQueueBackend:
+    """Returns the process-wide queue backend selected by JOB_QUEUE_BACKEND."""
+    global _job_queue
+    if _job_queue is None:
+        if settings.JOB_QUEUE_BACKEND == "memory":
+            _job_queue = InMemoryJobQueue()
+        elif settings.JOB_QUEUE_BACKEND == "postgres":
+            _job_queue = PostgresJobQueue()
+        else:
+            raise ValueError(f"Unknown JOB_QUEUE_BACKEND '{settings.JOB_QUEUE_BACKEND}'")
+    return _job_queue
@@ -0,0 +1,227 @@
+"""
+llm_client.py
+
+Shared async provider layer for every LLM call in the pipeline:
+
+  - OpenAI    → AsyncOpenAI chat completions (whole or streamed)
+  - Gemini    → google-generativeai `generate_content_async`
+  - Perplexity → OpenAI-compatible chat API over the shared "perplexity" client
+
+OpenAI and Perplexity traffic reuses the pooled connections in http_clients.py,
+and every call is admitted by the shared rate limiter (rate_limiter.py).
+Services call `llm_client` instead of holding their own SDK clients, so no call
+blocks the event loop and one worker can drive many jobs concurrently.
+
+Every call records prompt and provider-cached prompt tokens — per process
+(`usage_snapshot`) and per job (`track_usage`) — so the effect of stable prompt
+prefixes on provider prompt caching is visible.
+
+The SDKs are imported on first use — together they cost over a second of import
+time, which web workers that never call a model should not pay.
+"""
+import logging
+import threading
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+from app.core.config import settings
+from app.services.http_clients import http_clients
+from app.services.rate_limiter import estimate_tokens, rate_limiter
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Usage dict of the job running in the current asyncio task (see `track_usage`)
+_task_usage: ContextVar[Optional[dict]] = ContextVar("llm_task_usage", default=None)
+
+
+class LLMClient:
+    def __init__(self):
+        self._openai: Optional["AsyncOpenAI"] = None
+        self._openai_http = None
+        self._gemini_models: dict = {}
+        self._gemini_configured = False
+        self._usage: dict = {}  # (provider, model) → {"calls", "prompt_tokens", "cached_tokens"}
+        self._usage_lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Clients (created on first use)
+    # ------------------------------------------------------------------ #
+    @property
+    def openai(self) -> "AsyncOpenAI":
+        http = http_clients.get("openai")
+        if self._openai is None or self._openai_http is not http:
+            from openai import AsyncOpenAI
+
+            self._openai = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=http)
+            self._openai_http = http
+        return self._openai
+
+    def gemini_model(self, model: Optional[str] = None, system_instruction: Optional[str] = None):
+        """Returns a cached GenerativeModel for the (model, system_instruction) pair."""
+        import google.generativeai as genai
+
+        if not self._gemini_configured:
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+            self._gemini_configured = True
+
+        key = (model or settings.GEMINI_MODEL, system_instruction)
+        if key not in self._gemini_models:
+            self._gemini_models[key] = genai.GenerativeModel(key[0], system_instruction=system_instruction)
+        return self._gemini_models[key]
+
+    # ------------------------------------------------------------------ #
+    # Usage accounting
+    # ------------------------------------------------------------------ #
+    def _record_usage(self, provider: str, model: str, prompt_tokens: Optional[int], cached_tokens: Optional[int]) -> None:
+        prompt_tokens, cached_tokens = prompt_tokens or 0, cached_tokens or 0
+        with self._usage_lock:
+            totals = self._usage.setdefault((provider, model), {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["cached_tokens"] += cached_tokens
+            scoped = _task_usage.get()
+            if scoped is not None:
+                totals = scoped.setdefault(f"{provider}/{model}", {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+                totals["calls"] += 1
+                totals["prompt_tokens"] += prompt_tokens
+                totals["cached_tokens"] += cached_tokens
+        logger.debug(f"{provider}/{model}: {prompt_tokens} prompt tokens, {cached_tokens} served from prompt cache")
+
+    def usage_snapshot(self) -> dict:
+        """Per "provider/model" totals of calls, prompt tokens and cached prompt tokens in this process."""
+        with self._usage_lock:
+            return {f"{provider}/{model}": dict(totals) for (provider, model), totals in self._usage.items()}
+
+    def track_usage(self) -> dict:
+        """
+        Starts tallying calls made by the current asyncio task — and the tasks it
+        spawns — into the returned dict, keyed like `usage_snapshot`. The worker runs
+        every job in its own task, so concurrent jobs are counted separately.
+        """
+        usage: dict = {}
+        _task_usage.set(usage)
+        return usage
+
+    # ------------------------------------------------------------------ #
+    # Calls
+    # ------------------------------------------------------------------ #
+    async def openai_chat(
+        self,
+        messages: list,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        json_mode: bool = True,
+        response_format: Optional[dict] = None,
+    ) -> str:
+        """
+        Runs a chat completion and returns the message content. `response_format`
+        (e.g. a strict JSON schema) takes precedence over plain `json_mode`.
+        """
+        kwargs = {}
+        if response_format is not None:
+            kwargs["response_format"] = response_format
+        elif json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        model = model or settings.GPT_MODEL
+        estimate = estimate_tokens(*(m.get("content") for m in messages))
+        async with rate_limiter.limit("openai", model, estimated_tokens=estimate) as lease:
+            response = await self.openai.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                **kwargs,
+            )
+            if response.usage:
+                lease.actual_tokens = response.usage.total_tokens
+                details = getattr(response.usage, "prompt_tokens_details", None)
+                self._record_usage(
+                    "openai", model, response.usage.prompt_tokens, getattr(details, "cached_tokens", None),
+                )
+        return response.choices[0].message.content
+
+    async def openai_chat_stream(
+        self,
+        messages: list,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        json_mode: bool = True,
+    ) -> AsyncIterator[str]:
+        """Runs a streamed chat completion, yielding content deltas as they arrive."""
+        kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+        model = model or settings.GPT_MODEL
+        estimate = estimate_tokens(*(m.get("content") for m in messages))
+        async with rate_limiter.limit("openai", model, estimated_tokens=estimate) as lease:
+            stream = await self.openai.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+                **kwargs,
+            )
+            async for chunk in stream:
+                if chunk.usage:  # sent once, on the final chunk
+                    lease.actual_tokens = chunk.usage.total_tokens
+                    details = getattr(chunk.usage, "prompt_tokens_details", None)
+                    self._record_usage(
+                        "openai", model, chunk.usage.prompt_tokens, getattr(details, "cached_tokens", None),
+                    )
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def gemini_generate(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        system_instruction: Optional[str] = None,
+        generation_config: Optional[dict] = None,
+    ) -> str:
+        """Runs a Gemini generation and returns the response text."""
+        model = model or settings.GEMINI_MODEL
+        gemini = self.gemini_model(model, system_instruction)
+        estimate = estimate_tokens(prompt, system_instruction)
+        async with rate_limiter.limit("gemini", model, estimated_tokens=estimate) as lease:
+            response = await gemini.generate_content_async(prompt, generation_config=generation_config)
+            usage = getattr(response, "usage_metadata", None)
+            if usage:
+                lease.actual_tokens = usage.total_token_count
+                self._record_usage(
+                    "gemini", model, usage.prompt_token_count, getattr(usage, "cached_content_token_count", None),
+                )
+        return response.text
+
+    async def perplexity_chat(
+        self,
+        messages: list,
+        model: Optional[str] = None,
+        temperature: float = 0.2,
+        json_schema: Optional[dict] = None,
+    ) -> str:
+        """Runs a Perplexity chat completion and returns the message content, constrained to `json_schema` if given."""
+        model = model or settings.PERPLEXITY_MODEL
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+        }
+        if json_schema is not None:
+            payload["response_format"] = {"type": "json_schema", "json_schema": {"schema": json_schema}}
+        estimate = estimate_tokens(*(m.get("content") for m in messages))
+        async with rate_limiter.limit("perplexity", model, estimated_tokens=estimate) as lease:
+            response = await http_clients.get("perplexity").post("/chat/completions", json=payload)
+            response.raise_for_status()
+            data = response.json()
+            usage = data.get("usage")
+            if usage:
+                lease.actual_tokens = usage.get("total_tokens")
+                self._record_usage(
+                    "perplexity", model, usage.get("prompt_tokens"),
+                    (usage.get("prompt_tokens_details") or {}).get("cached_tokens"),
+                )
+        return data["choices"][0]["message"]["content"]
+
+
+llm_client = LLMClient()
@@ -1,16 +1,29 @@
 import asyncio
-import json
 import logging
+from typing import Awaitable, Callable, Optional
 
-import google.generativeai as genai
 import httpx
-from openai import OpenAI
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from app.core.config import settings
+from app.schemas.llm_outputs import AnalysisOutput
+from app.services.context_packer import pack_research
+from app.services.llm_client import llm_client
+from app.services.pipeline_scheduler import gather_quorum, hedged
+from app.services.structured_output import (
+    gemini_response_schema,
+    json_schema,
+    openai_response_format,
+    parse_structured,
+)
 
 logger = logging.getLogger(__name__)
 
+# Provider-native output schemas, built once from the shared response model
+_OPENAI_ANALYSIS_FORMAT = openai_response_format(AnalysisOutput, "marketing_analysis")
+_GEMINI_ANALYSIS_SCHEMA = gemini_response_schema(AnalysisOutput)
+_PERPLEXITY_ANALYSIS_SCHEMA = json_schema(AnalysisOutput)
+
 
 def _format_questionnaire_context(questionnaire: dict) -> str:
     """Formats the full questionnaire into a concise context string for analysis prompts."""
@@ -41,7 +54,7 @@ def _format_questionnaire_context(questionnaire: dict) -> str:
 
 _ANALYSIS_OUTPUT_SCHEMA = (
     "Return a JSON object with:\n"
-    '1. "hooks": List of 3 powerful marketing hooks (1 sentence each, specific to the channels and tone above).\n'
+    '1. "hooks": List of 3 powerful marketing hooks (1 sentence each, specific to the brand\'s channels and tone).\n'
     '2. "angles": List of 2 creative angles (title + description).\n'
     '3. "creative_pivot": Strategic recommendation on differentiation.\n'
     '4. "brand_awareness_strategy": An object with:\n'
@@ -52,6 +65,35 @@ _ANALYSIS_OUTPUT_SCHEMA = (
     "Return ONLY valid JSON."
 )
 
+# Static instructions go in the system slot, ahead of anything job-specific, so every
+# job sends a byte-identical prefix per provider and hits provider prompt caching.
+# The brand context and packed research follow in the user turn.
+_GPT_SYSTEM_PROMPT = (
+    "You are a world-class Marketing Strategist. "
+    "Analyse the research data and propose a creative marketing strategy tailored to the brand's "
+    "specific audience, channels, and objectives. Output must be valid JSON.\n\n"
+    + _ANALYSIS_OUTPUT_SCHEMA
+)
+
+_GEMINI_SYSTEM_PROMPT = (
+    "You are a world-class Marketing Strategist specialising in creative and visual brand building.\n\n"
+    + _ANALYSIS_OUTPUT_SCHEMA
+    + "\nNo markdown formatting."
+)
+
+_PERPLEXITY_SYSTEM_PROMPT = (
+    "You are a data-driven marketing strategist. Analyse the research provided and propose creative "
+    "marketing hooks, angles, and a brand awareness strategy in JSON format.\n\n"
+    + _ANALYSIS_OUTPUT_SCHEMA
+)
+
+
+def _analysis_user_content(questionnaire: dict, research_summary: str) -> str:
+    return (
+        f"# Brand Context\n{_format_questionnaire_context(questionnaire)}\n\n"
+        f"# Research Data\n{research_summary}"
+    )
+
 
 class MultiAnalysisService:
     """
@@ -60,14 +102,8 @@ class MultiAnalysisService:
     """
 
     def __init__(self):
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
         self.gpt_model = settings.GPT_MODEL
-
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.gemini_model = genai.GenerativeModel(settings.GEMINI_MODEL)
-
-        self.perplexity_api_key = settings.PERPLEXITY_API_KEY
-        self.perplexity_base_url = "https://api.perplexity.ai/chat/completions"
+        self.gemini_model = settings.GEMINI_MODEL
         self.perplexity_model = settings.PERPLEXITY_MODEL
 
     # ------------------------------------------------------------------ #
@@ -79,32 +115,18 @@ class MultiAnalysisService:
         stop=stop_after_attempt(3),
         reraise=True,
     )
-    async def _gpt4o_analysis(self, questionnaire: dict, research: dict) -> dict:
-        questionnaire_context = _format_questionnaire_context(questionnaire)
-        research_summary = json.dumps(research, indent=2)[:6000]
-
-        system_prompt = (
-            "You are a world-class Marketing Strategist. "
-            "Analyse the research data and propose a creative marketing strategy tailored to the brand's "
-            "specific audience, channels, and objectives. Output must be valid JSON."
-        )
-        user_content = (
-            f"# Brand Context\n{questionnaire_context}\n\n"
-            f"# Research Data\n{research_summary}\n\n"
-            + _ANALYSIS_OUTPUT_SCHEMA
-        )
-
+    async def _gpt4o_analysis(self, user_content: str) -> dict:
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.gpt_model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
+            content = await hedged(f"analysis:openai:{self.gpt_model}", lambda: llm_client.openai_chat(
+                [
+                    {"role": "system", "content": _GPT_SYSTEM_PROMPT},
                     {"role": "user", "content": user_content},
                 ],
-                response_format={"type": "json_object"},
+                model=self.gpt_model,
                 temperature=0.7,
-            )
-            return json.loads(response.choices[0].message.content)
+                response_format=_OPENAI_ANALYSIS_FORMAT,
+            ))
+            return parse_structured(content, AnalysisOutput, "GPT-4o analysis")
         except Exception as e:
             logger.error(f"GPT-4o Analysis error: {e}")
             raise
@@ -118,24 +140,18 @@ class MultiAnalysisService:
         stop=stop_after_attempt(3),
         reraise=True,
     )
-    async def _gemini_analysis(self, questionnaire: dict, research: dict) -> dict:
-        questionnaire_context = _format_questionnaire_context(questionnaire)
-        research_summary = json.dumps(research, indent=2)[:6000]
-
-        prompt = (
-            "You are a world-class Marketing Strategist specialising in creative and visual brand building.\n\n"
-            f"# Brand Context\n{questionnaire_context}\n\n"
-            f"# Research Data\n{research_summary}\n\n"
-            + _ANALYSIS_OUTPUT_SCHEMA
-            + "\nNo markdown formatting."
-        )
-
+    async def _gemini_analysis(self, user_content: str) -> dict:
         try:
-            response = await self.gemini_model.generate_content_async(
-                prompt,
-                generation_config={"response_mime_type": "application/json"},
-            )
-            result = json.loads(response.text)
+            text = await hedged(f"analysis:gemini:{self.gemini_model}", lambda: llm_client.gemini_generate(
+                user_content,
+                model=self.gemini_model,
+                system_instruction=_GEMINI_SYSTEM_PROMPT,
+                generation_config={
+                    "response_mime_type": "application/json",
+                    "response_schema": _GEMINI_ANALYSIS_SCHEMA,
+                },
+            ))
+            result = parse_structured(text, AnalysisOutput, "Gemini analysis")
             result["source"] = "gemini"
             return result
         except Exception as e:
@@ -151,52 +167,25 @@ class MultiAnalysisService:
         stop=stop_after_attempt(3),
         reraise=True,
     )
-    async def _perplexity_analysis(self, questionnaire: dict, research: dict) -> dict:
-        questionnaire_context = _format_questionnaire_context(questionnaire)
-        research_summary = json.dumps(research, indent=2)[:6000]  # Fixed: was 1000
-
-        query = (
-            "As a data-driven marketing strategist, analyse the following research and propose creative "
-            "marketing hooks, angles, and a brand awareness strategy.\n\n"
-            f"# Brand Context\n{questionnaire_context}\n\n"
-            f"# Research Summary\n{research_summary}\n\n"
-            + _ANALYSIS_OUTPUT_SCHEMA
-        )
-
-        payload = {
-            "model": self.perplexity_model,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are a marketing strategist. Provide analysis in JSON format.",
-                },
-                {"role": "user", "content": query},
-            ],
-            "temperature": 0.7,
-        }
-        headers = {
-            "Authorization": f"Bearer {self.perplexity_api_key}",
-            "Content-Type": "application/json",
-        }
+    async def _perplexity_analysis(self, user_content: str) -> dict:
+        messages = [
+            {"role": "system", "content": _PERPLEXITY_SYSTEM_PROMPT},
+            {"role": "user", "content": user_content},
+        ]
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(self.perplexity_base_url, headers=headers, json=payload)
-                response.raise_for_status()
-                content = response.json()["choices"][0]["message"]["content"]
-
-                try:
-                    parsed = json.loads(content)
-                    parsed["source"] = "perplexity"
-                    return parsed
-                except json.JSONDecodeError:
-                    return {
-                        "hooks": [content[:150]] if content else [],
-                        "angles": [],
-                        "creative_pivot": content[:300] if content else "",
-                        "brand_awareness_strategy": {},
-                        "source": "perplexity",
-                    }
+            content = await hedged(
+                f"analysis:perplexity:{self.perplexity_model}",
+                lambda: llm_client.perplexity_chat(
+                    messages,
+                    model=self.perplexity_model,
+                    temperature=0.7,
+                    json_schema=_PERPLEXITY_ANALYSIS_SCHEMA,
+                ),
+            )
+            result = parse_structured(content, AnalysisOutput, "Perplexity analysis")
+            result["source"] = "perplexity"
+            return result
         except Exception as e:
             logger.error(f"Perplexity Analysis error: {e}")
             raise
@@ -204,34 +193,73 @@ class MultiAnalysisService:
     # ------------------------------------------------------------------ #
     # Orchestrator
     # ------------------------------------------------------------------ #
-    async def run_triple_analysis(self, questionnaire: dict, research: dict) -> dict:
+    async def run_triple_analysis(
+        self,
+        questionnaire: dict,
+        research: dict,
+        on_result: Optional[Callable[[str, dict], Awaitable[None]]] = None,
+        timeout: Optional[float] = None,
+    ) -> dict:
+        """
+        Runs the three analyses concurrently. `on_result(source, result)` is awaited
+        as each model finishes, so callers can report per-model progress.
+
+        With ANALYSIS_QUORUM=2 this returns once two models succeeded (plus
+        ANALYSIS_QUORUM_GRACE); a model still running then — or at `timeout`
+        (default ANALYSIS_TIMEOUT) — is recorded as an error result, which the
+        consensus step already tolerates. Raises asyncio.TimeoutError only if no
+        model finished in time.
+        """
         logger.info("Starting Triple Analysis (GPT-4o, Gemini, Perplexity)")
+        timeout = settings.ANALYSIS_TIMEOUT if timeout is None else timeout
+
+        # Built once and shared by all three models (and their retries / hedges)
+        user_content = _analysis_user_content(questionnaire, pack_research(research))
+
+        def failed(source: str, error: str) -> dict:
+            return {
+                "error": error,
+                "source": source,
+                "hooks": [],
+                "angles": [],
+                "creative_pivot": "",
+                "brand_awareness_strategy": {},
+            }
 
         async def safe(coro, source: str):
             try:
-                return await coro
+                result = await coro
             except Exception as e:
                 logger.error(f"{source} analysis ultimately failed after retries: {e}")
-                return {
-                    "error": str(e),
-                    "source": source,
-                    "hooks": [],
-                    "angles": [],
-                    "creative_pivot": "",
-                    "brand_awareness_strategy": {},
-                }
-
-        gpt4o_result, gemini_result, perplexity_result = await asyncio.gather(
-            safe(self._gpt4o_analysis(questionnaire, research), "gpt4o"),
-            safe(self._gemini_analysis(questionnaire, research), "gemini"),
-            safe(self._perplexity_analysis(questionnaire, research), "perplexity"),
+                result = failed(source, str(e))
+            if on_result is not None:
+                await on_result(source, result)
+            return result
+
+        outcome = await gather_quorum(
+            {
+                "gpt4o": safe(self._gpt4o_analysis(user_content), "gpt4o"),
+                "gemini": safe(self._gemini_analysis(user_content), "gemini"),
+                "perplexity": safe(self._perplexity_analysis(user_content), "perplexity"),
+            },
+            quorum=min(max(settings.ANALYSIS_QUORUM, 1), 3),
+            timeout=timeout,
+            grace=settings.ANALYSIS_QUORUM_GRACE,
+            is_useful=lambda result: bool(result) and not result.get("error"),
         )
+        if len(outcome.dropped) == 3:
+            raise asyncio.TimeoutError(f"No analysis model finished within {timeout}s")
+
+        results = dict(outcome.results)
+        for source in outcome.dropped:
+            results[source] = failed(source, "Dropped: did not finish before the analysis quorum cut-off")
+            if on_result is not None:
+                await on_result(source, results[source])
 
         return {
-            "gpt4o_analysis": gpt4o_result,
-            "gemini_analysis": gemini_result,
-            "perplexity_analysis": perplexity_result,
+            "gpt4o_analysis": results["gpt4o"],
+            "gemini_analysis": results["gemini"],
+            "perplexity_analysis": results["perplexity"],
         }
 
-
 multi_analysis_service = MultiAnalysisService()
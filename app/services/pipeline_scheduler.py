@@ -0,0 +1,183 @@
+"""
+pipeline_scheduler.py
+
+Dataflow helpers for running pipeline stages as their inputs arrive instead of
+waiting on a single all-or-nothing `asyncio.gather`, plus hedged requests that
+cut the tail latency of individual provider calls.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QuorumResult:
+    results: Dict[str, Any]
+    dropped: List[str] = field(default_factory=list)  # cancelled after the deadline / grace period
+
+
+async def gather_quorum(
+    sources: Dict[str, Awaitable],
+    quorum: int,
+    timeout: float,
+    grace: float = 0.0,
+    required: Iterable[str] = (),
+    on_result: Optional[Callable[[str, Any], Awaitable[None]]] = None,
+    is_useful: Callable[[Any], bool] = bool,
+) -> QuorumResult:
+    """
+    Runs every awaitable in `sources` concurrently and returns as soon as either:
+
+      - all of them have finished, or
+      - `quorum` sources returned a useful result (including every `required`
+        one) and a further `grace` seconds have passed, or
+      - `timeout` seconds have passed.
+
+    A result is useful when `is_useful(result)` is true (default: non-empty).
+    `on_result(name, result)` is awaited as each source finishes, so results can be
+    persisted immediately. Sources still running at the cut-off are cancelled and
+    listed in `dropped` — one slow source no longer discards the others.
+
+    Raises asyncio.TimeoutError if a required source is dropped, and re-raises
+    the exception of a required source that fails. Failures of optional sources
+    are logged and recorded as an empty result.
+    """
+    required = set(required)
+    loop = asyncio.get_running_loop()
+    tasks = {asyncio.ensure_future(aw): name for name, aw in sources.items()}
+    pending = set(tasks)
+    results: Dict[str, Any] = {}
+    deadline = loop.time() + timeout
+    quorum_at: Optional[float] = None
+
+    try:
+        while pending:
+            now = loop.time()
+            if quorum_at is None:
+                useful = [name for name, value in results.items() if is_useful(value)]
+                if len(useful) >= quorum and required.issubset(useful):
+                    quorum_at = now
+                    logger.info(f"Quorum reached ({', '.join(sorted(useful))}) — waiting {grace}s for stragglers")
+            cutoff = deadline if quorum_at is None else min(deadline, quorum_at + grace)
+            if now >= cutoff:
+                break
+
+            done, pending = await asyncio.wait(pending, timeout=cutoff - now, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                try:
+                    results[name] = task.result()
+                except Exception as e:
+                    if name in required:
+                        raise
+                    logger.warning(f"Source '{name}' failed, continuing without it: {e}")
+                    results[name] = {}
+                if on_result is not None:
+                    await on_result(name, results[name])
+    finally:
+        for task in pending:
+            task.cancel()
+
+    dropped = sorted(tasks[task] for task in pending)
+    if dropped:
+        logger.warning(f"Dropped late source(s): {', '.join(dropped)}")
+    missing_required = required.intersection(dropped)
+    if missing_required:
+        raise asyncio.TimeoutError(f"Required source(s) did not finish in {timeout}s: {', '.join(sorted(missing_required))}")
+    return QuorumResult(results=results, dropped=dropped)
+
+
+# ---------------------------------------------------------------------------
+# Hedged requests
+# ---------------------------------------------------------------------------
+
+class LatencyTracker:
+    """
+    Rolling window of call latencies per key (e.g. "analysis:openai:gpt-4o"), plus
+    which of those calls were hedged, for the per-key hedge budget.
+    """
+
+    def __init__(self, window: int = 50):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._hedges: Dict[str, deque] = {}
+
+    def record(self, key: str, seconds: float, hedged: bool = False) -> None:
+        self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+        self._hedges.setdefault(key, deque(maxlen=self.window)).append(hedged)
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        """The q-quantile (0-1) of recent latencies, or None with fewer than HEDGE_MIN_SAMPLES."""
+        samples = self._samples.get(key)
+        if not samples or len(samples) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def may_hedge(self, key: str) -> bool:
+        """True while hedged calls are under HEDGE_BUDGET of recent calls (counting this one)."""
+        recent = self._hedges.get(key, ())
+        return sum(recent) < settings.HEDGE_BUDGET * (len(recent) + 1)
+
+
+latency_tracker = LatencyTracker()
+
+
+def hedge_delay(key: str) -> float:
+    """Seconds to wait before hedging `key`: its HEDGE_PERCENTILE latency, or HEDGE_DEFAULT_DELAY until known."""
+    observed = latency_tracker.percentile(key, settings.HEDGE_PERCENTILE)
+    delay = settings.HEDGE_DEFAULT_DELAY if observed is None else observed
+    return max(settings.HEDGE_MIN_DELAY, delay)
+
+
+async def hedged(key: str, call: Callable[[], Awaitable[Any]], delay: Optional[float] = None) -> Any:
+    """
+    Awaits `call()`; if it has not finished after `delay` seconds (default
+    `hedge_delay(key)`), starts one duplicate — budget permitting — and returns
+    whichever succeeds first, cancelling the other. Raises only if every attempt
+    fails, so callers keep their own retry policy.
+
+    The tracker records the end-to-end latency from the first attempt's start, also
+    when the caller cancels us, so the slow calls that trigger hedges stay in the
+    sample instead of being replaced by the faster duplicate's time.
+    """
+    if not settings.HEDGING_ENABLED:
+        return await call()
+
+    delay = hedge_delay(key) if delay is None else delay
+    started = time.monotonic()
+    pending = {asyncio.ensure_future(call())}
+    sent_hedge = False
+    last_error: Optional[BaseException] = None
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if not done:
+            if latency_tracker.may_hedge(key):
+                logger.info(f"'{key}' slower than {delay:.1f}s — sending a hedged request")
+                pending.add(asyncio.ensure_future(call()))
+                sent_hedge = True
+            else:
+                logger.info(f"'{key}' slower than {delay:.1f}s — hedge budget spent, waiting")
+        while True:
+            for task in done:
+                if task.exception() is None:
+                    latency_tracker.record(key, time.monotonic() - started, sent_hedge)
+                    return task.result()
+                last_error = task.exception()
+            if not pending:
+                raise last_error
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        latency_tracker.record(key, time.monotonic() - started, sent_hedge)
+        raise
+    finally:
+        for task in pending:
+            task.cancel()
@@ -14,15 +14,25 @@ python-pptx 1.0.2: solid fills only (no native gradients).
 Canvas: 10" × 5.625" widescreen (9,144,000 × 5,143,500 EMU).
 """
 
+import io
 import json
 import logging
 import os
 import random
 import traceback
+from typing import AsyncIterator, Iterable
 
-from openai import OpenAI
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE
+from pptx.enum.text import MSO_ANCHOR
+from pptx.util import Emu, Pt
 
 from app.core.config import settings
+from app.schemas.llm_outputs import Slide, SlidesOutput
+from app.services.context_packer import fit_json
+from app.services.llm_client import llm_client
+from app.services.structured_output import JsonArrayStream, parse_structured, validate_partial
 
 logger = logging.getLogger(__name__)
 
@@ -92,92 +102,45 @@ _TEMPLATE_TONE: dict[str, str] = {
     "youthful": "creative", "vibrant": "creative", "creative": "creative",
 }
 
-from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE
-
 RECT       = MSO_AUTO_SHAPE_TYPE.RECTANGLE
 ROUND_RECT = MSO_AUTO_SHAPE_TYPE.ROUNDED_RECTANGLE
 
-
-class PresentationService:
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.model = settings.GPT_MODEL
-
-    # =========================================================================
-    # PUBLIC: structure_content
-    # =========================================================================
-    def structure_content(self, questionnaire: dict, analysis: dict) -> dict:
-        """
-        Generates text content for 12 slides. Returns {"slides": [...]} JSON.
-        """
-        meta      = questionnaire.get("project_metadata", {}) or {}
-        creative  = questionnaire.get("the_creative_goal", {}) or {}
-        market    = questionnaire.get("market_context", {}) or {}
-        product   = questionnaire.get("product_definition", {}) or {}
-        audience  = questionnaire.get("target_audience", {}) or {}
-
-        brand_name    = meta.get("brand_name", "Brand")
-        industry      = meta.get("industry", "")
-        country       = meta.get("target_country", "")
-        website       = meta.get("website_url", "")
-        channels      = ", ".join(creative.get("specific_channels", []) or [])
-        usp           = product.get("unique_selling_proposition", "")
-        competitors   = ", ".join(market.get("main_competitors", []) or [])
-        tone          = creative.get("desired_tone_of_voice", "")
-        objectives    = ", ".join(creative.get("marketing_objectives", []) or [])
-        audience_desc = audience.get("description", "") or audience.get("primary_segment", "")
-        objections    = ", ".join(market.get("main_objections", []) or [])
-
-        hooks       = analysis.get("hooks", [])
-        angles      = analysis.get("angles", [])
-        pivot       = analysis.get("creative_pivot", "")
-        awareness   = analysis.get("brand_awareness_strategy", {}) or {}
-        channel_tac = awareness.get("channel_tactics", [])
-        quick_wins  = awareness.get("quick_wins", [])
-        positioning = awareness.get("positioning_recommendation", "")
-
-        perplexity_snapshot  = json.dumps(analysis.get("perplexity_research_snapshot", {}), indent=2)[:3000]
-        brand_audit_snapshot = json.dumps(analysis.get("brand_audit_snapshot", {}), indent=2)[:1500]
-        news_snapshot        = json.dumps(analysis.get("news_snapshot", {}), indent=2)[:2000]
-
-        system_prompt = (
-            "You are a Senior Marketing Strategist at a top-tier creative agency. "
-            "You build board-ready pitch decks with deep strategic insight — "
-            "specific competitor names, real benchmarks, named techniques. "
-            "Output must be valid JSON only. No markdown, no explanations."
-        )
-
-        user_content = f"""
-# Brand Briefing
-Brand: {brand_name} | Industry: {industry} | Country: {country}
-Website: {website}
-USP: {usp}
-Target Audience: {audience_desc}
-Channels: {channels} | Tone: {tone}
-Objectives: {objectives}
-Competitors: {competitors}
-Objections: {objections}
-
-# Strategy Consensus
-Creative Pivot: {pivot}
-Top Angles: {json.dumps(angles)}
-Top Hooks: {json.dumps(hooks[:7])}
-Channel Tactics: {json.dumps(channel_tac)}
-Quick Wins: {json.dumps(quick_wins)}
-Positioning: {positioning}
-
-# Research Data
-## Competitor & Brand Awareness (Perplexity):
-{perplexity_snapshot}
-
-## Brand Website Audit:
-{brand_audit_snapshot}
-
-## Press & News Coverage (NewsAPI):
-{news_snapshot}
-
-# TASK
-Create exactly 16 slides. Return a JSON object with a "slides" array.
+# Process-level cache of slide-stripped templates: path → (mtime, .pptx bytes).
+# The stripped package keeps only masters/layouts/theme, so each render opens a
+# small package instead of re-parsing the full example deck and dropping its slides.
+_TEMPLATE_CACHE: dict = {}
+
+
+def _load_template(template_path: str):
+    """Returns a fresh Presentation of the template with its content slides removed."""
+    mtime = os.path.getmtime(template_path)
+    cached = _TEMPLATE_CACHE.get(template_path)
+    if cached is None or cached[0] != mtime:
+        prs = Presentation(template_path)
+        # Remove the template's existing content slides (keep slide master/layouts)
+        _NS_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+        xml_slide_list = prs.slides._sldIdLst
+        for sld_id_el in list(xml_slide_list):
+            rId = sld_id_el.get(_NS_R + "id")
+            if rId:
+                prs.part.drop_rel(rId)
+            xml_slide_list.remove(sld_id_el)
+        buf = io.BytesIO()
+        prs.save(buf)
+        cached = (mtime, buf.getvalue())
+        _TEMPLATE_CACHE[template_path] = cached
+        logger.info(f"Cached stripped template: {os.path.basename(template_path)}")
+
+    return Presentation(io.BytesIO(cached[1]))
+
+
+# Number of slides _SLIDE_SPEC asks for — streamed decks number their slides against it
+SLIDE_COUNT = 16
+
+# Static 16-slide spec — kept out of the per-job prompt and sent as part of the
+# system message, so every job shares the same ~2k-token prefix for provider prompt caching.
+_SLIDE_SPEC = """# TASK
+For the brand described in the user message, create exactly 16 slides. Return a JSON object with a "slides" array.
 Be SPECIFIC — cite real competitor names, research findings, real benchmarks.
 Use news coverage and competitor press activity to ground claims in real evidence.
 
@@ -186,15 +149,15 @@ Use news coverage and competitor press activity to ground claims in real evidenc
 - subtitle: One crisp brand promise ≤15 words
 
 ## SLIDE 2 — type: "company_intro"  (CONCISE company overview)
-- title: "About {brand_name}"
+- title: "About {brand name}"
 - headline: Bold strategic statement ≤10 words (the core value in one line)
-- description: Exactly 2 sentences describing what {brand_name} does and for whom
-- kvp: Array of 3 objects: {{"label": "Short Label ≤3 words", "description": "≤8 words"}}
+- description: Exactly 2 sentences describing what the brand does and for whom
+- kvp: Array of 3 objects: {"label": "Short Label ≤3 words", "description": "≤8 words"}
   Cover the 3 core value pillars (product strength, user benefit, market edge)
 
 ## SLIDE 3 — type: "two_by_two"  (Market overview)
 - title: "The Market"
-- cards: Array of exactly 4 objects: {{"label": "LABEL", "header": "Short bold title", "body": "1-2 sentences"}}
+- cards: Array of exactly 4 objects: {"label": "LABEL", "header": "Short bold title", "body": "1-2 sentences"}
   Cards: VALIDATION (funding/backing/traction), TRACTION (current user/revenue state),
          CHALLENGE (the main market problem with stat from research), OPPORTUNITY (the gap to fill)
 
@@ -202,7 +165,7 @@ Use news coverage and competitor press activity to ground claims in real evidenc
 - title: "The Main Challenge"
 - label: Context label (e.g. "Expansion Phase", "Growth Barrier")
 - headline: Bold challenge name ≤6 words
-- body: 2 sentences MAX — specific to {brand_name}'s situation. Reference real data from research.
+- body: 2 sentences MAX — specific to the brand's situation. Reference real data from research.
 
 ## SLIDE 5 — type: "persona_detail"  (Primary Persona — named profile)
 - title: "Target Audience"
@@ -213,10 +176,10 @@ Use news coverage and competitor press activity to ground claims in real evidenc
 - tags: Array of 2-3 short role-descriptor tags (e.g. ["Strategic", "B2B"])
 - quote: First-person quote ≤25 words capturing their core frustration, in their voice
 - cards: Array of exactly 4 objects:
-  [{{"label": "Scope of Responsibility", "body": "1-2 sentences specific to this persona"}},
-   {{"label": "Primary Concerns", "body": "1-2 sentences specific to this persona"}},
-   {{"label": "Core Challenge", "body": "1-2 sentences specific to this persona"}},
-   {{"label": "Critical Need", "body": "1-2 sentences specific to this persona"}}]
+  [{"label": "Scope of Responsibility", "body": "1-2 sentences specific to this persona"},
+   {"label": "Primary Concerns", "body": "1-2 sentences specific to this persona"},
+   {"label": "Core Challenge", "body": "1-2 sentences specific to this persona"},
+   {"label": "Critical Need", "body": "1-2 sentences specific to this persona"}]
 
 ## SLIDE 6 — type: "persona_detail"  (Secondary Persona — named profile)
 - Same structure as Slide 5 but DIFFERENT persona (different role/seniority/demographic)
@@ -224,49 +187,49 @@ Use news coverage and competitor press activity to ground claims in real evidenc
 ## SLIDE 7 — type: "three_col"  (Audience deep-dive)
 - title: "Audience Deep-Dive"
 - columns: Array of exactly 3 objects:
-  [{{"label": "DEMOGRAPHICS", "header": "Who They Are", "items": ["age range", "location", "income/role", "education"]}},
-   {{"label": "PSYCHOGRAPHICS", "header": "How They Think", "items": ["core value 1", "core value 2", "media habits", "buying trigger"]}},
-   {{"label": "KEY BUYERS", "header": "Decision Makers", "items": ["Title 1", "Title 2", "Title 3", "Title 4"]}}]
+  [{"label": "DEMOGRAPHICS", "header": "Who They Are", "items": ["age range", "location", "income/role", "education"]},
+   {"label": "PSYCHOGRAPHICS", "header": "How They Think", "items": ["core value 1", "core value 2", "media habits", "buying trigger"]},
+   {"label": "KEY BUYERS", "header": "Decision Makers", "items": ["Title 1", "Title 2", "Title 3", "Title 4"]}]
 
 ## SLIDE 8 — type: "two_col"  (Competitive landscape)
 - title: "Competitive Landscape"
-- left: {{"label": "COMPETITOR GAPS", "header": "What They Miss", "items": ["gap 1 (name the competitor)", "gap 2 (name the competitor)", "gap 3"]}}
-- right: {{"label": "OUR EDGE", "header": "{brand_name}'s Advantage", "items": ["advantage 1", "advantage 2", "advantage 3"]}}
+- left: {"label": "COMPETITOR GAPS", "header": "What They Miss", "items": ["gap 1 (name the competitor)", "gap 2 (name the competitor)", "gap 3"]}
+- right: {"label": "OUR EDGE", "header": "{brand name}'s Advantage", "items": ["advantage 1", "advantage 2", "advantage 3"]}
 
 ## SLIDE 9 — type: "three_col"  (3V's of Brand Identity)
 - title: "Brand Identity — The 3 V's"
 - columns: exactly 3 objects:
-  [{{"label": "VISION", "header": "Where we're going", "items": ["The world we're building toward", "The change we want to create", "Our north star metric"]}},
-   {{"label": "VALUES", "header": "What we stand for", "items": ["Core value 1", "Core value 2", "Core value 3"]}},
-   {{"label": "VOICE", "header": "How we sound", "items": ["Tone descriptor 1", "Tone descriptor 2", "What we never say", "Platform where voice shines"]}}]
+  [{"label": "VISION", "header": "Where we're going", "items": ["The world we're building toward", "The change we want to create", "Our north star metric"]},
+   {"label": "VALUES", "header": "What we stand for", "items": ["Core value 1", "Core value 2", "Core value 3"]},
+   {"label": "VOICE", "header": "How we sound", "items": ["Tone descriptor 1", "Tone descriptor 2", "What we never say", "Platform where voice shines"]}]
 
 ## SLIDE 10 — type: "three_col"  (Campaign barriers)
 - title: "Barriers to Success"
 - columns: exactly 3 objects, one per barrier type:
-  [{{"label": "MARKET BARRIER", "header": "Adoption & Trust Gap",
+  [{"label": "MARKET BARRIER", "header": "Adoption & Trust Gap",
     "items": [
       "Specific adoption or trust challenge drawn from news/community research — name the root cause",
       "A real data point or user sentiment that proves this barrier exists",
-      "Why standard marketing approaches fail to overcome it for {brand_name}"
-    ]}},
-   {{"label": "COMPETITIVE BARRIER", "header": "Competitor Inertia",
+      "Why standard marketing approaches fail to overcome it for the brand"
+    ]},
+   {"label": "COMPETITIVE BARRIER", "header": "Competitor Inertia",
     "items": [
       "Name the specific competitor(s) creating this inertia and what advantage they hold",
-      "The switching cost or lock-in mechanism that keeps users from moving to {brand_name}",
-      "What {brand_name} must do differently to overcome this competitor advantage"
-    ]}},
-   {{"label": "EXECUTION BARRIER", "header": "Internal Challenge",
+      "The switching cost or lock-in mechanism that keeps users from moving to the brand",
+      "What the brand must do differently to overcome this competitor advantage"
+    ]},
+   {"label": "EXECUTION BARRIER", "header": "Internal Challenge",
     "items": [
-      "The internal capability or perception gap {brand_name} must close",
-      "Why this is specifically hard given {brand_name}'s current market position or brand history",
-      "The one lever {brand_name} can pull to address this from the inside out"
-    ]}}]
+      "The internal capability or perception gap the brand must close",
+      "Why this is specifically hard given the brand's current market position or brand history",
+      "The one lever the brand can pull to address this from the inside out"
+    ]}]
 
 ## SLIDE 11 — type: "campaign"
 - title: "Campaign: [TECHNIQUE]" — pick from: Viral Referral Loop / UGC Flywheel / Micro-Influencer Tier / Community-Led Growth / Social Proof Cascade / Challenge Campaign / Waitlist Launch / Paid-Organic Flywheel / Content-Led SEO / Partnership Co-Marketing
 - subtitle: One-line campaign concept name (e.g. "The Trust Engine")
 - content: 3 bullets:
-  (a) How this technique works specifically for {brand_name}
+  (a) How this technique works specifically for the brand
   (b) The trigger or hook that activates it — reference a real pain point from competitor research or news
   (c) Specific success metric with a number (e.g. "Target 25% referral-driven signups in 60 days")
 
@@ -276,9 +239,9 @@ Use news coverage and competitor press activity to ground claims in real evidenc
 ## SLIDE 13 — type: "campaign_examples"
 - title: "Campaign Inspiration"
 - examples: Array of exactly 2 objects — REAL companies with analogous campaigns:
-  {{"company": "Real Company Name", "technique": "Short Technique Label", "strategy": "Strategy Theme Name", "items": ["point 1", "point 2", "point 3"]}}
+  {"company": "Real Company Name", "technique": "Short Technique Label", "strategy": "Strategy Theme Name", "items": ["point 1", "point 2", "point 3"]}
   Pick companies like Canva, Gong, Notion, Figma, HubSpot, Slack, Drift, Airbnb, Duolingo, Dropbox
-  whose campaigns are directly analogous to what we're recommending for {brand_name}.
+  whose campaigns are directly analogous to what we're recommending for the brand.
 
 ## SLIDE 14 — type: "hooks"
 - title: "Marketing Hooks"
@@ -294,37 +257,159 @@ Use news coverage and competitor press activity to ground claims in real evidenc
 ## SLIDE 16 — type: "kpis"
 - title: "KPI's"
 - columns: Array of exactly 3 objects:
-  [{{"label": "AWARENESS", "subtitle": "Reach & Visibility", "metrics": [{{"number": "X", "desc": "metric name (source)"}}]}},
-   {{"label": "ENGAGEMENT", "subtitle": "Interaction & Interest", "metrics": [...]}},
-   {{"label": "CONVERSION", "subtitle": "Leads & Action", "metrics": [...]}}]
+  [{"label": "AWARENESS", "subtitle": "Reach & Visibility", "metrics": [{"number": "X", "desc": "metric name (source)"}]},
+   {"label": "ENGAGEMENT", "subtitle": "Interaction & Interest", "metrics": [...]},
+   {"label": "CONVERSION", "subtitle": "Leads & Action", "metrics": [...]}]
   Each column has 2-3 metrics. Numbers must be SPECIFIC with industry benchmark sources.
   Example: "8.5%" with desc "Avg engagement rate (HubSpot 2024 benchmark: 3.2%)"
 
 RULES:
 - Slide 2: description MUST be exactly 2 sentences. No more.
-- Slide 4: body MUST be ≤2 sentences, specific to {brand_name}.
+- Slide 4: body MUST be ≤2 sentences, specific to the brand.
 - Slides 5 & 6: names MUST be real first names; quote MUST be in their voice; cards must be role-specific, not generic.
-- Slide 9: 3V's content must be specific to {brand_name}, not generic platitudes.
+- Slide 9: 3V's content must be specific to the brand, not generic platitudes.
 - Slide 13: companies must be REAL. Technique must be analogous to slides 11-12.
 - All text: concise, specific. No filler phrases like "leverage synergies".
 - Return ONLY the JSON object. No markdown wrapping.
 """
 
+
+class PresentationService:
+    def __init__(self):
+        self._client = None
+        self.model = settings.GPT_MODEL
+
+    @property
+    def client(self):
+        """Sync OpenAI client — only used for DALL·E persona portraits inside generate_pptx."""
+        if self._client is None:
+            from openai import OpenAI
+
+            self._client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        return self._client
+
+    # =========================================================================
+    # PUBLIC: structure_content
+    # =========================================================================
+    def _structure_messages(self, questionnaire: dict, analysis: dict) -> list:
+        """Chat messages asking the model for the deck's slides as {"slides": [...]} JSON."""
+        meta      = questionnaire.get("project_metadata", {}) or {}
+        creative  = questionnaire.get("the_creative_goal", {}) or {}
+        market    = questionnaire.get("market_context", {}) or {}
+        product   = questionnaire.get("product_definition", {}) or {}
+        audience  = questionnaire.get("target_audience", {}) or {}
+
+        brand_name    = meta.get("brand_name", "Brand")
+        industry      = meta.get("industry", "")
+        country       = meta.get("target_country", "")
+        website       = meta.get("website_url", "")
+        channels      = ", ".join(creative.get("specific_channels", []) or [])
+        usp           = product.get("unique_selling_proposition", "")
+        competitors   = ", ".join(market.get("main_competitors", []) or [])
+        tone          = creative.get("desired_tone_of_voice", "")
+        objectives    = ", ".join(creative.get("marketing_objectives", []) or [])
+        audience_desc = audience.get("description", "") or audience.get("primary_segment", "")
+        objections    = ", ".join(market.get("main_objections", []) or [])
+
+        hooks       = analysis.get("hooks", [])
+        angles      = analysis.get("angles", [])
+        pivot       = analysis.get("creative_pivot", "")
+        awareness   = analysis.get("brand_awareness_strategy", {}) or {}
+        channel_tac = awareness.get("channel_tactics", [])
+        quick_wins  = awareness.get("quick_wins", [])
+        positioning = awareness.get("positioning_recommendation", "")
+
+        perplexity_snapshot  = fit_json(analysis.get("perplexity_research_snapshot", {}), 750)
+        brand_audit_snapshot = fit_json(analysis.get("brand_audit_snapshot", {}), 375)
+        news_snapshot        = fit_json(analysis.get("news_snapshot", {}), 500)
+
+        system_prompt = (
+            "You are a Senior Marketing Strategist at a top-tier creative agency. "
+            "You build board-ready pitch decks with deep strategic insight — "
+            "specific competitor names, real benchmarks, named techniques. "
+            "Output must be valid JSON only. No markdown, no explanations.\n\n"
+            + _SLIDE_SPEC
+        )
+
+        user_content = f"""
+# Brand Briefing
+Brand: {brand_name} | Industry: {industry} | Country: {country}
+Website: {website}
+USP: {usp}
+Target Audience: {audience_desc}
+Channels: {channels} | Tone: {tone}
+Objectives: {objectives}
+Competitors: {competitors}
+Objections: {objections}
+
+# Strategy Consensus
+Creative Pivot: {pivot}
+Top Angles: {json.dumps(angles)}
+Top Hooks: {json.dumps(hooks[:7])}
+Channel Tactics: {json.dumps(channel_tac)}
+Quick Wins: {json.dumps(quick_wins)}
+Positioning: {positioning}
+
+# Research Data
+## Competitor & Brand Awareness (Perplexity):
+{perplexity_snapshot}
+
+## Brand Website Audit:
+{brand_audit_snapshot}
+
+## Press & News Coverage (NewsAPI):
+{news_snapshot}
+
+# TASK
+Create the 16 slides for {brand_name} following the slide specification.
+"""
+
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content},
+        ]
+
+    async def structure_content(self, questionnaire: dict, analysis: dict) -> dict:
+        """
+        Generates text content for the deck's slides. Returns {"slides": [...]} JSON.
+        """
         try:
-            response = self.client.chat.completions.create(
+            content = await llm_client.openai_chat(
+                self._structure_messages(questionnaire, analysis),
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_content},
-                ],
-                response_format={"type": "json_object"},
                 temperature=0.7,
             )
-            return json.loads(response.choices[0].message.content)
+            # Slide shapes vary by type, so the request stays in JSON mode and
+            # each slide is validated on its own (a bad slide is dropped, not the deck)
+            return parse_structured(content, SlidesOutput, "Presentation structuring")
         except Exception as e:
             logger.error(f"Presentation structuring error: {e}")
             return {"error": str(e), "slides": []}
 
+    async def stream_slides(self, questionnaire: dict, analysis: dict) -> AsyncIterator[dict]:
+        """
+        Streaming variant of structure_content: yields each slide as soon as the
+        model has finished writing it. Malformed slides are skipped; raises
+        ValueError if the response contained no slides at all.
+        """
+        parser = JsonArrayStream("slides")
+        produced = 0
+        stream = llm_client.openai_chat_stream(
+            self._structure_messages(questionnaire, analysis),
+            model=self.model,
+            temperature=0.7,
+        )
+        async for chunk in stream:
+            for item in parser.feed(chunk):
+                slide, invalid = validate_partial(Slide, item, f"slides[{produced}].")
+                if invalid:
+                    logger.warning(f"Presentation structuring: skipping malformed slide ({', '.join(invalid)})")
+                    continue
+                produced += 1
+                yield slide.model_dump()
+        if not produced:
+            raise ValueError("Streamed response contained no slides")
+
     # =========================================================================
     # PUBLIC: generate_pptx
     # =========================================================================
@@ -333,70 +418,22 @@ RULES:
         slides_data: dict,
         output_path: str,
         questionnaire: dict = None,
+        theme_spec: dict = None,
     ) -> str:
-        from pptx import Presentation
-        from pptx.util import Emu
-
+        """
+        Builds the deck and saves it to output_path. Pass a precomputed `theme_spec`
+        (see derive_theme_spec) to skip re-deriving it — used by the render pool.
+        """
         try:
-            theme = self._derive_theme(questionnaire or {})
-
-            template_path = theme.get("template_path")
-            if template_path and os.path.isfile(template_path):
-                prs = Presentation(template_path)
-                logger.info(f"Using template: {os.path.basename(template_path)}")
-                # Remove the template's existing content slides (keep slide master/layouts)
-                _NS_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
-                xml_slide_list = prs.slides._sldIdLst
-                for sld_id_el in list(xml_slide_list):
-                    rId = sld_id_el.get(_NS_R + "id")
-                    if rId:
-                        prs.part.drop_rel(rId)
-                    xml_slide_list.remove(sld_id_el)
-            else:
-                prs = Presentation()
-            prs.slide_width = Emu(SLIDE_W)
-            prs.slide_height = Emu(SLIDE_H)
-
-            blank_layout = (
-                prs.slide_layouts[6]
-                if len(prs.slide_layouts) > 6
-                else prs.slide_layouts[0]
-            )
+            if theme_spec is None:
+                theme_spec = self.derive_theme_spec(questionnaire or {})
+            theme = self._resolve_theme(theme_spec)
+            prs, layout = self._new_deck(theme)
 
             slides = slides_data.get("slides", [])
             total = len(slides)
             for idx, slide_info in enumerate(slides):
-                slide = prs.slides.add_slide(blank_layout)
-                stype = slide_info.get("type", "content")
-                num = idx + 1
-
-                if stype == "title":
-                    self._build_slide_title(slide, slide_info, theme, num, total)
-                elif stype == "company_intro":
-                    self._build_slide_company_intro(slide, slide_info, theme, num, total)
-                elif stype == "two_by_two":
-                    self._build_slide_two_by_two(slide, slide_info, theme, num, total)
-                elif stype == "single_card":
-                    self._build_slide_single_card(slide, slide_info, theme, num, total)
-                elif stype == "three_col":
-                    self._build_slide_three_col(slide, slide_info, theme, num, total)
-                elif stype == "two_col":
-                    self._build_slide_two_col(slide, slide_info, theme, num, total)
-                elif stype == "persona_detail":
-                    self._build_slide_persona_detail(slide, slide_info, theme, num, total)
-                elif stype == "campaign":
-                    self._build_slide_campaign(slide, slide_info, theme, num, total)
-                elif stype == "campaign_examples":
-                    self._build_slide_campaign_examples(slide, slide_info, theme, num, total)
-                elif stype == "hooks":
-                    self._build_slide_hooks(slide, slide_info, theme, num, total)
-                elif stype == "kpis":
-                    self._build_slide_kpis(slide, slide_info, theme, num, total)
-                elif stype in ("roadmap", "next_steps"):
-                    self._build_slide_roadmap(slide, slide_info, theme, num, total)
-                else:
-                    # "content", "social", and fallback
-                    self._build_slide_content(slide, slide_info, theme, num, total)
+                self._add_slide(prs, layout, slide_info, theme, idx + 1, total)
 
             prs.save(output_path)
             logger.info(f"PPTX saved to {output_path}")
@@ -406,12 +443,116 @@ RULES:
             logger.exception("PPTX generation error")
             raise RuntimeError(f"PPTX generation failed: {e}") from e
 
+    def generate_pptx_stream(
+        self,
+        slides: Iterable[dict],
+        output_path: str,
+        theme_spec: dict,
+        expected_total: int = SLIDE_COUNT,
+    ) -> str:
+        """
+        Builds the deck slide by slide while `slides` is still being produced
+        (see render_pool.render_stream) and saves it to output_path. Slides are
+        numbered against `expected_total`; if the count turns out different the
+        deck is rebuilt so the counters stay right.
+        """
+        try:
+            theme = self._resolve_theme(theme_spec)
+            prs, layout = self._new_deck(theme)
+            received = []
+            for slide_info in slides:
+                received.append(slide_info)
+                self._add_slide(prs, layout, slide_info, theme, len(received), expected_total)
+        except Exception as e:
+            logger.exception("PPTX generation error")
+            raise RuntimeError(f"PPTX generation failed: {e}") from e
+
+        if len(received) != expected_total:
+            logger.info(f"Streamed {len(received)} slides, expected {expected_total} — rebuilding deck")
+            return self.generate_pptx({"slides": received}, output_path, theme_spec=theme_spec)
+        prs.save(output_path)
+        logger.info(f"PPTX saved to {output_path}")
+        return output_path
+
+    def _new_deck(self, theme: dict):
+        """Returns an empty presentation (from the theme's template if any) and its blank layout."""
+        template_path = theme.get("template_path")
+        if template_path and os.path.isfile(template_path):
+            prs = _load_template(template_path)
+            logger.info(f"Using template: {os.path.basename(template_path)}")
+        else:
+            prs = Presentation()
+        prs.slide_width = Emu(SLIDE_W)
+        prs.slide_height = Emu(SLIDE_H)
+
+        blank_layout = (
+            prs.slide_layouts[6]
+            if len(prs.slide_layouts) > 6
+            else prs.slide_layouts[0]
+        )
+        return prs, blank_layout
+
+    def _add_slide(self, prs, layout, slide_info: dict, theme: dict, num: int, total: int) -> None:
+        """Appends one slide, drawn by the builder for its type."""
+        slide = prs.slides.add_slide(layout)
+        stype = slide_info.get("type", "content")
+
+        if stype == "title":
+            self._build_slide_title(slide, slide_info, theme, num, total)
+        elif stype == "company_intro":
+            self._build_slide_company_intro(slide, slide_info, theme, num, total)
+        elif stype == "two_by_two":
+            self._build_slide_two_by_two(slide, slide_info, theme, num, total)
+        elif stype == "single_card":
+            self._build_slide_single_card(slide, slide_info, theme, num, total)
+        elif stype == "three_col":
+            self._build_slide_three_col(slide, slide_info, theme, num, total)
+        elif stype == "two_col":
+            self._build_slide_two_col(slide, slide_info, theme, num, total)
+        elif stype == "persona_detail":
+            self._build_slide_persona_detail(slide, slide_info, theme, num, total)
+        elif stype == "campaign":
+            self._build_slide_campaign(slide, slide_info, theme, num, total)
+        elif stype == "campaign_examples":
+            self._build_slide_campaign_examples(slide, slide_info, theme, num, total)
+        elif stype == "hooks":
+            self._build_slide_hooks(slide, slide_info, theme, num, total)
+        elif stype == "kpis":
+            self._build_slide_kpis(slide, slide_info, theme, num, total)
+        elif stype in ("roadmap", "next_steps"):
+            self._build_slide_roadmap(slide, slide_info, theme, num, total)
+        else:
+            # "content", "social", and fallback
+            self._build_slide_content(slide, slide_info, theme, num, total)
+
     # =========================================================================
-    # PRIVATE: _derive_theme
+    # Theme derivation
     # =========================================================================
+    # Theme keys holding colours — hex strings in a theme spec, RGBColor once resolved
+    _THEME_COLOR_KEYS = (
+        "primary", "secondary", "accent", "bg", "card_bg",
+        "text_main", "text_light", "text_dark", "muted",
+    )
+
     def _derive_theme(self, questionnaire: dict) -> dict:
-        from pptx.dml.color import RGBColor
+        return self._resolve_theme(self.derive_theme_spec(questionnaire))
+
+    def _resolve_theme(self, spec: dict) -> dict:
+        """Turns a theme spec's hex colours into RGBColor values for drawing."""
+        def h(hex_str: str):
+            s = hex_str.lstrip("#")
+            return RGBColor(int(s[0:2], 16), int(s[2:4], 16), int(s[4:6], 16))
+
+        return {
+            **spec,
+            **{key: h(spec[key]) for key in self._THEME_COLOR_KEYS},
+        }
 
+    def derive_theme_spec(self, questionnaire: dict) -> dict:
+        """
+        Picks palette, template and design variant from the questionnaire.
+        Returns plain, picklable values (colours as hex strings).
+        """
         meta     = questionnaire.get("project_metadata", {}) or {}
         creative = questionnaire.get("the_creative_goal", {}) or {}
 
@@ -494,10 +635,6 @@ RULES:
         else:
             card_bg_hex = "dbd5cd"
 
-        def h(hex_str: str):
-            s = hex_str.lstrip("#")
-            return RGBColor(int(s[0:2], 16), int(s[2:4], 16), int(s[4:6], 16))
-
         # ── Template + design_variant: selected deterministically from input ──
         # Industry keyword takes priority; tone can override.
         template_key = "digital"  # default
@@ -521,15 +658,15 @@ RULES:
             muted = "94a3b8" if not is_light_bg else "64748b"
 
         return {
-            "primary":          h(primary_hex),
-            "secondary":        h(secondary_hex),
-            "accent":           h(accent_hex),
-            "bg":               h(bg_hex),
-            "card_bg":          h(card_bg_hex),
-            "text_main":        h(text_main),
-            "text_light":       h(text_light),
-            "text_dark":        h(text_dark),
-            "muted":            h(muted),
+            "primary":          primary_hex,
+            "secondary":        secondary_hex,
+            "accent":           accent_hex,
+            "bg":               bg_hex,
+            "card_bg":          card_bg_hex,
+            "text_main":        text_main,
+            "text_light":       text_light,
+            "text_dark":        text_dark,
+            "muted":            muted,
             "dark_theme":       not is_light_bg,
             "design_variant":   design_variant,
             "brand_name":       brand_name,
@@ -560,7 +697,6 @@ RULES:
         """
         if theme.get("use_template_bg"):
             return  # template has its own decorative background elements
-        from pptx.dml.color import RGBColor
         bg = theme["bg"]
         r, g, b = bg[0], bg[1], bg[2]
         if theme["dark_theme"]:
@@ -598,7 +734,6 @@ RULES:
 
     def _add_slide_counter(self, slide, num: int, total: int, theme: dict) -> None:
         """Full-width footer bar: brand name (left), website (center), slide counter (right)."""
-        from pptx.dml.color import RGBColor
         footer_h = int(SLIDE_H * 0.060)
         footer_t = SLIDE_H - footer_h
 
@@ -643,7 +778,6 @@ RULES:
         )
 
     def _add_rect(self, slide, left, top, width, height, fill_color):
-        from pptx.util import Emu
         shape = slide.shapes.add_shape(
             RECT,
             Emu(int(left)), Emu(int(top)),
@@ -655,7 +789,6 @@ RULES:
         return shape
 
     def _add_rounded_rect(self, slide, left, top, width, height, fill_color, corner=0.08):
-        from pptx.util import Emu
         shape = slide.shapes.add_shape(
             ROUND_RECT,
             Emu(int(left)), Emu(int(top)),
@@ -677,7 +810,6 @@ RULES:
         word_wrap: bool = True,
         vertical_anchor=None,
     ):
-        from pptx.util import Emu, Pt
         txBox = slide.shapes.add_textbox(
             Emu(int(left)), Emu(int(top)),
             Emu(int(width)), Emu(int(height)),
@@ -824,9 +956,6 @@ RULES:
           - "top_band"      : Wide top band + centered content
           - "minimal"       : Clean split with geometric accent + oversized typography
         """
-        from pptx.util import Emu
-        from pptx.dml.color import RGBColor
-
         self._set_background(slide, theme["bg"], theme)
         variant = theme.get("design_variant", "diagonal")
 
@@ -1229,8 +1358,6 @@ RULES:
           Left panel  (~30 % width): circular photo · name · role · company · tags · quote
           Right panel (~65 % width): 2×2 grid of attribute cards with icon + title + body
         """
-        from pptx.util import Emu
-
         self._set_background(slide, theme["bg"], theme)
         self._add_bg_accent(slide, theme)
         self._add_slide_header(slide, slide_info.get("title", "Target Audience"), theme, "AUDIENCE")
@@ -1350,7 +1477,6 @@ RULES:
             self._add_rounded_rect(slide, icon_l, icon_t, icon_sz, icon_sz, ac, corner=0.2)
 
             # Card title (right of icon) — vertically centred with the icon square
-            from pptx.enum.text import MSO_ANCHOR
             title_l = icon_l + icon_sz + int(SLIDE_W * 0.012)
             title_w = card_w - icon_sz - int(SLIDE_W * 0.035)
             self._add_textbox(slide, title_l, icon_t, title_w, icon_sz,
@@ -1374,7 +1500,6 @@ RULES:
         Generate a realistic portrait photo for a persona using DALL-E 3.
         Returns a BytesIO stream ready for add_picture(), or None on failure.
         """
-        import io
         import urllib.request
 
         try:
@@ -1405,7 +1530,6 @@ RULES:
         name + bullet items below. Both images are generated in parallel.
         """
         import concurrent.futures
-        from pptx.util import Emu
 
         self._set_background(slide, theme["bg"], theme)
         self._add_bg_accent(slide, theme)
@@ -0,0 +1,198 @@
+"""
+rate_limiter.py
+
+Central governor for outbound LLM traffic, shared by every job in a process
+(and, with the Postgres backend, by every worker process).
+
+Each (provider, model) pair has:
+  - an RPM token bucket and a TPM token bucket, and
+  - a concurrency cap on in-flight calls per process.
+
+Buckets are reservation-based: a caller always takes its cost and, if the bucket
+goes negative, sleeps for the deficit. Queued callers are therefore released at
+the provider's sustained rate in arrival order instead of all retrying on 429s.
+
+Backends (RATE_LIMIT_BACKEND):
+  - "postgres": buckets live in the rate_limit_buckets table, updated with one
+                atomic upsert per reservation — limits hold across processes.
+  - "memory":   buckets live in this process only.
+"""
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Lease:
+    """Handed to the caller; set `actual_tokens` after the call to settle the TPM bucket."""
+    estimated_tokens: int
+    actual_tokens: Optional[int] = None
+
+
+class BucketBackend:
+    def reserve(self, key: str, rate: float, capacity: float, cost: float) -> float:
+        """Takes `cost` from the bucket and returns how long the caller must wait (seconds)."""
+        raise NotImplementedError
+
+    def adjust(self, key: str, delta: float) -> None:
+        """Takes `delta` more (or gives back, if negative) from the bucket."""
+        raise NotImplementedError
+
+
+class InMemoryBuckets(BucketBackend):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: dict = {}  # key → [tokens, updated_at]
+
+    def reserve(self, key: str, rate: float, capacity: float, cost: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate) - cost
+            self._buckets[key] = (tokens, now)
+        return max(0.0, -tokens) / rate
+
+    def adjust(self, key: str, delta: float) -> None:
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated = self._buckets[key]
+                self._buckets[key] = (tokens - delta, updated)
+
+
+class PostgresBuckets(BucketBackend):
+    _RESERVE = text("""
+        INSERT INTO rate_limit_buckets (key, tokens, updated_at)
+        VALUES (:key, :capacity - :cost, clock_timestamp())
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = LEAST(
+                :capacity,
+                rate_limit_buckets.tokens
+                + EXTRACT(EPOCH FROM clock_timestamp() - rate_limit_buckets.updated_at) * :rate
+            ) - :cost,
+            updated_at = clock_timestamp()
+        RETURNING tokens
+    """)
+    _ADJUST = text("UPDATE rate_limit_buckets SET tokens = tokens - :delta WHERE key = :key")
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+
+    def reserve(self, key: str, rate: float, capacity: float, cost: float) -> float:
+        session = self._session_factory()
+        try:
+            tokens = session.execute(
+                self._RESERVE, {"key": key, "rate": rate, "capacity": capacity, "cost": cost},
+            ).scalar_one()
+            session.commit()
+        finally:
+            session.close()
+        return max(0.0, -tokens) / rate
+
+    def adjust(self, key: str, delta: float) -> None:
+        session = self._session_factory()
+        try:
+            session.execute(self._ADJUST, {"key": key, "delta": delta})
+            session.commit()
+        finally:
+            session.close()
+
+
+def estimate_tokens(*texts: str, completion: int = 1024) -> int:
+    """Rough prompt size (≈4 characters per token) plus an expected completion budget."""
+    return sum(len(t or "") for t in texts) // 4 + completion
+
+
+class RateLimiter:
+    def __init__(self, backend: Optional[BucketBackend] = None):
+        self._backend = backend
+        self._fallback = InMemoryBuckets()
+        self._semaphores: dict = {}  # key → (loop, asyncio.Semaphore)
+
+    @property
+    def backend(self) -> BucketBackend:
+        if self._backend is None:
+            if settings.RATE_LIMIT_BACKEND == "postgres":
+                self._backend = PostgresBuckets()
+            elif settings.RATE_LIMIT_BACKEND == "memory":
+                self._backend = InMemoryBuckets()
+            else:
+                raise ValueError(f"Unknown RATE_LIMIT_BACKEND '{settings.RATE_LIMIT_BACKEND}'")
+        return self._backend
+
+    @staticmethod
+    def limits_for(provider: str, model: str) -> dict:
+        """Per-model limits override per-provider limits."""
+        limits = settings.PROVIDER_RATE_LIMITS
+        return limits.get(f"{provider}:{model}") or limits.get(provider) or {}
+
+    def _semaphore(self, key: str, concurrency: int) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop that first waits on them
+        loop = asyncio.get_running_loop()
+        entry = self._semaphores.get(key)
+        if entry is None or entry[0] is not loop:
+            entry = (loop, asyncio.Semaphore(concurrency))
+            self._semaphores[key] = entry
+        return entry[1]
+
+    async def _reserve(self, key: str, per_minute: int, cost: float) -> float:
+        rate = per_minute / 60.0
+        capacity = max(cost, rate * settings.RATE_LIMIT_BURST_SECONDS)
+        try:
+            return await asyncio.to_thread(self.backend.reserve, key, rate, capacity, cost)
+        except Exception as e:
+            # Never fail a call because the shared bucket is unreachable — govern locally
+            logger.warning(f"Rate limit backend unavailable for {key}, using local bucket: {e}")
+            return self._fallback.reserve(key, rate, capacity, cost)
+
+    async def _adjust(self, key: str, delta: float) -> None:
+        try:
+            await asyncio.to_thread(self.backend.adjust, key, delta)
+        except Exception as e:
+            logger.warning(f"Could not settle token usage for {key}: {e}")
+
+    @asynccontextmanager
+    async def limit(self, provider: str, model: str, estimated_tokens: int = 0):
+        """
+        Waits for RPM/TPM budget and a concurrency slot for (provider, model).
+
+            async with rate_limiter.limit("openai", "gpt-4o", estimated_tokens=n) as lease:
+                response = await ...
+                lease.actual_tokens = response.usage.total_tokens
+        """
+        limits = self.limits_for(provider, model)
+        key = f"{provider}:{model}"
+        lease = Lease(estimated_tokens=estimated_tokens)
+
+        waits = []
+        if limits.get("rpm"):
+            waits.append(await self._reserve(f"{key}:rpm", limits["rpm"], 1))
+        if limits.get("tpm") and estimated_tokens:
+            waits.append(await self._reserve(f"{key}:tpm", limits["tpm"], estimated_tokens))
+        wait = max(waits, default=0.0)
+        if wait > 0:
+            logger.info(f"Rate limit: delaying {key} call by {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+        concurrency = limits.get("concurrency")
+        if concurrency:
+            async with self._semaphore(key, concurrency):
+                yield lease
+        else:
+            yield lease
+
+        if limits.get("tpm") and lease.actual_tokens is not None and lease.actual_tokens != estimated_tokens:
+            await self._adjust(f"{key}:tpm", lease.actual_tokens - estimated_tokens)
+
+
+rate_limiter = RateLimiter()
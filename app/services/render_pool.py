@@ -0,0 +1,232 @@
+"""
+render_pool.py
+
+Runs python-pptx deck rendering in a bounded pool of worker processes so the
+CPU-bound XML building (and the blocking DALL·E persona fetches inside it) never
+blocks the event loop and scales with cores.
+
+Inputs cross the process boundary as plain data — the slides JSON, the
+questionnaire and a theme spec with hex colours — and the finished deck comes
+back as bytes. `render_stream` instead feeds slides through a queue while the
+model is still writing them, so the deck is built as they arrive — on separate
+processes, so waiting on the model never occupies a regular render slot.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Iterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _render(slides_data: dict, questionnaire: dict, theme_spec: dict) -> bytes:
+    """Executed in a pool process; returns the rendered .pptx as bytes."""
+    from app.services.presentation_service import presentation_service
+
+    with tempfile.NamedTemporaryFile(suffix=".pptx", delete=False) as tmp:
+        temp_pptx = tmp.name
+    try:
+        generated_path = presentation_service.generate_pptx(
+            slides_data, temp_pptx, questionnaire=questionnaire, theme_spec=theme_spec,
+        )
+        if not generated_path:
+            raise RuntimeError("presentation_service.generate_pptx returned None")
+        with open(generated_path, "rb") as f:
+            return f.read()
+    finally:
+        if os.path.exists(temp_pptx):
+            os.remove(temp_pptx)
+
+
+# Queue markers sent after the last slide; slides themselves are dicts
+_STREAM_END = "__end__"
+_STREAM_ABORTED = "__aborted__"
+
+
+def _queued_slides(slide_queue) -> Iterator[dict]:
+    while True:
+        item = slide_queue.get()
+        if item == _STREAM_END:
+            return
+        if item == _STREAM_ABORTED:
+            raise RuntimeError("Slide stream aborted")
+        yield item
+
+
+def _render_stream(slide_queue, questionnaire: dict, theme_spec: dict, expected_total: int) -> bytes:
+    """Executed in a pool process; builds each slide as it comes off `slide_queue`."""
+    from app.services.presentation_service import presentation_service
+
+    with tempfile.NamedTemporaryFile(suffix=".pptx", delete=False) as tmp:
+        temp_pptx = tmp.name
+    try:
+        presentation_service.generate_pptx_stream(
+            _queued_slides(slide_queue), temp_pptx, theme_spec, expected_total,
+        )
+        with open(temp_pptx, "rb") as f:
+            return f.read()
+    finally:
+        if os.path.exists(temp_pptx):
+            os.remove(temp_pptx)
+
+
+class RenderPool:
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Streamed renders run on their own processes: they sit waiting on the model
+        # for most of their life and must not hold up regular renders.
+        self._stream_executor: Optional[ProcessPoolExecutor] = None
+        self._streams_active = 0
+        self._manager = None  # serves the cross-process slide queues for render_stream
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = self._start_executor(settings.PPTX_RENDER_WORKERS, "PPTX render pool")
+        return self._executor
+
+    def _get_stream_executor(self) -> ProcessPoolExecutor:
+        if self._stream_executor is None:
+            self._stream_executor = self._start_executor(settings.PPTX_STREAM_RENDER_WORKERS, "PPTX stream render pool")
+        return self._stream_executor
+
+    @staticmethod
+    def _start_executor(workers: int, name: str) -> ProcessPoolExecutor:
+        # spawn: forking a process that holds DB/HTTP connections and an event loop is unsafe
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"{name} started ({workers} process(es))")
+        return executor
+
+    async def render(self, slides_data: dict, questionnaire: dict) -> bytes:
+        """Renders a deck and returns its bytes. PPTX_RENDER_WORKERS=0 renders in a thread instead."""
+        from app.services.presentation_service import presentation_service
+
+        # Theme derivation is cheap and done here so the pool only receives picklable data
+        theme_spec = presentation_service.derive_theme_spec(questionnaire or {})
+
+        if settings.PPTX_RENDER_WORKERS <= 0:
+            return await asyncio.to_thread(_render, slides_data, questionnaire, theme_spec)
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(executor, _render, slides_data, questionnaire, theme_spec)
+        except BrokenProcessPool:
+            # A render process died (e.g. OOM) — rebuild the pool so later jobs still work
+            logger.error("PPTX render pool broken — restarting it")
+            self._discard_broken("_executor", executor)
+            raise
+
+    async def render_stream(
+        self,
+        slides: AsyncIterator[dict],
+        questionnaire: dict,
+        expected_total: int,
+    ) -> bytes:
+        """
+        Renders a deck while `slides` is still producing it: each slide is built
+        as soon as it arrives by one of PPTX_STREAM_RENDER_WORKERS dedicated
+        processes (threads when PPTX_RENDER_WORKERS=0). While every stream slot is
+        taken, slides are buffered and handed over once one frees up; if none does
+        before the last slide, the deck goes through `render` like any other.
+        If the iterator raises, the render is abandoned and the error propagates.
+        """
+        from app.services.presentation_service import presentation_service
+
+        theme_spec = presentation_service.derive_theme_spec(questionnaire or {})
+        buffered: list = []
+        slide_queue = render = stream_executor = None
+        try:
+            async for slide in slides:
+                if render is None and self._streams_active < settings.PPTX_STREAM_RENDER_WORKERS:
+                    self._streams_active += 1
+                    try:
+                        slide_queue, render = await self._start_stream(questionnaire, theme_spec, expected_total)
+                    except BaseException:
+                        self._streams_active -= 1
+                        raise
+                    stream_executor = self._stream_executor
+                    render.add_done_callback(self._stream_finished)
+                if render is None:
+                    buffered.append(slide)
+                    continue
+                for item in (*buffered, slide):
+                    # Manager queue puts are an IPC round trip — keep them off the event loop
+                    await asyncio.to_thread(slide_queue.put, item)
+                buffered.clear()
+            if render is not None:
+                await asyncio.to_thread(slide_queue.put, _STREAM_END)
+        except BaseException as e:
+            if render is not None:
+                if isinstance(e, Exception):
+                    # Let the worker see the abort and free its slot; the producer's error wins
+                    await asyncio.to_thread(slide_queue.put, _STREAM_ABORTED)
+                    await asyncio.gather(render, return_exceptions=True)
+                else:
+                    slide_queue.put(_STREAM_ABORTED)  # cancelled: nothing left to await on
+                    render.add_done_callback(lambda f: f.cancelled() or f.exception())
+            raise
+
+        if render is None:
+            logger.info("No stream render slot was free — rendering the buffered deck")
+            return await self.render({"slides": buffered}, questionnaire)
+        try:
+            return await render
+        except BrokenProcessPool:
+            logger.error("PPTX stream render pool broken — restarting it")
+            self._discard_broken("_stream_executor", stream_executor)
+            raise
+
+    async def _start_stream(self, questionnaire: dict, theme_spec: dict, expected_total: int):
+        """Submits a streaming render; returns (slide queue, render future)."""
+        if settings.PPTX_RENDER_WORKERS <= 0:
+            slide_queue = queue.Queue()
+            render = asyncio.ensure_future(asyncio.to_thread(
+                _render_stream, slide_queue, questionnaire, theme_spec, expected_total,
+            ))
+        else:
+            slide_queue = await asyncio.to_thread(lambda: self._get_manager().Queue())
+            render = asyncio.get_running_loop().run_in_executor(
+                self._get_stream_executor(), _render_stream, slide_queue, questionnaire, theme_spec, expected_total,
+            )
+        return slide_queue, render
+
+    def _stream_finished(self, _future) -> None:
+        self._streams_active -= 1
+
+    def _get_manager(self):
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context("spawn").Manager()
+            return self._manager
+
+    def _discard_broken(self, attr: str, executor: Optional[ProcessPoolExecutor]) -> None:
+        """
+        Drops the broken executor held in `attr` so the next call builds a fresh one.
+        The other pool and the queue manager are left alone — their in-flight renders
+        are unaffected — and a pool already rebuilt by a concurrent failure is kept.
+        """
+        if executor is None or getattr(self, attr) is not executor:
+            return
+        setattr(self, attr, None)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        for executor in (self._executor, self._stream_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._stream_executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+render_pool = RenderPool()
@@ -0,0 +1,140 @@
+"""
+research_cache.py
+
+Content-addressed cache for research results, shared by every job.
+
+Each research source (Perplexity, Gemini, brand audit, news) is keyed on a hash
+of its normalized query inputs plus provider/model, so a new campaign for a client
+whose research inputs have not changed reuses the previous results instead of
+re-running the slowest and most expensive stage. Entries live in MinIO under
+cache/research/{source}/{hash}.json and expire after a per-source TTL.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+from app.schemas.questionnaire import QuestionnaireRequest
+from app.services.storage_service import storage_service
+
+logger = logging.getLogger(__name__)
+
+# Bump when research prompts change so stale entries are never served
+_CACHE_VERSION = 1
+
+# source → (provider, model setting) — part of the key so a model swap misses the cache
+_SOURCE_PROVIDERS = {
+    "perplexity": ("perplexity", lambda: settings.PERPLEXITY_MODEL),
+    "gemini": ("gemini", lambda: settings.GEMINI_MODEL),
+    "brand_audit": ("gemini", lambda: settings.GEMINI_MODEL),
+    "news": ("newsapi", lambda: "everything"),
+}
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, (list, tuple)):
+        return sorted(_normalize(v) for v in value)
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+
+def research_inputs(questionnaire: QuestionnaireRequest) -> dict:
+    """The questionnaire fields each research source actually depends on."""
+    meta = questionnaire.project_metadata
+    competitors = questionnaire.market_context.main_competitors or []
+    return {
+        "perplexity": {
+            "brand": meta.brand_name,
+            "industry": meta.industry,
+            "country": meta.target_country,
+            "competitors": competitors,
+            "usp": questionnaire.product_definition.unique_selling_proposition,
+        },
+        "gemini": {
+            "brand": meta.brand_name,
+            "industry": meta.industry,
+            "country": meta.target_country,
+        },
+        "brand_audit": {
+            "brand": meta.brand_name,
+            "website_url": str(meta.website_url),
+        },
+        "news": {
+            "brand": meta.brand_name,
+            "industry": meta.industry,
+            "competitors": competitors,
+        },
+    }
+
+
+def _is_cacheable(data) -> bool:
+    """Only cache complete results — empty dicts and partial failures are retried next time."""
+    if not data or not isinstance(data, dict):
+        return False
+    return not any(isinstance(v, dict) and v.get("error") for v in data.values())
+
+
+class ResearchCache:
+    def cache_key(self, source: str, inputs: dict) -> str:
+        provider, model = _SOURCE_PROVIDERS[source]
+        normalized = {
+            "v": _CACHE_VERSION,
+            "source": source,
+            "provider": provider,
+            "model": model(),
+            "inputs": _normalize(inputs),
+        }
+        digest = hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"cache/research/{source}/{digest}.json"
+
+    async def _lookup(self, key: str, ttl: int):
+        if not await storage_service.exists_async(key):
+            return None
+        entry = await storage_service.get_json_async(key)
+        if not entry or "cached_at" not in entry:
+            return None
+        age = (datetime.utcnow() - datetime.fromisoformat(entry["cached_at"])).total_seconds()
+        if age > ttl:
+            return None
+        return entry.get("data")
+
+    async def get_or_fetch(
+        self,
+        source: str,
+        inputs: dict,
+        fetch: Callable[[], Awaitable[dict]],
+        force_refresh: bool = False,
+    ) -> dict:
+        """
+        Returns the cached result for (source, inputs) if it is younger than the
+        source's TTL, otherwise awaits fetch() and stores its result.
+        """
+        if not settings.RESEARCH_CACHE_ENABLED:
+            return await fetch()
+
+        key = self.cache_key(source, inputs)
+        ttl = settings.RESEARCH_CACHE_TTLS.get(source, 0)
+
+        if not force_refresh and ttl > 0:
+            try:
+                cached = await self._lookup(key, ttl)
+            except Exception as e:
+                logger.warning(f"Research cache lookup failed for {source}: {e}")
+                cached = None
+            if cached is not None:
+                logger.info(f"Research cache hit: {source}")
+                return cached
+
+        data = await fetch()
+        if ttl > 0 and _is_cacheable(data):
+            entry = {"cached_at": datetime.utcnow().isoformat(), "source": source, "data": data}
+            await storage_service.upload_json_async(key, entry)
+        return data
+
+
+research_cache = ResearchCache()
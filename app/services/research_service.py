@@ -6,18 +6,13 @@ from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_excep
 
 from app.core.config import settings
 from app.schemas.questionnaire import QuestionnaireRequest
+from app.services.llm_client import llm_client
 
 logger = logging.getLogger(__name__)
 
 
 class ResearchService:
     def __init__(self):
-        self.api_key = settings.PERPLEXITY_API_KEY
-        self.base_url = "https://api.perplexity.ai/chat/completions"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
         self.model = settings.PERPLEXITY_MODEL
 
     @retry(
@@ -27,27 +22,18 @@ class ResearchService:
         reraise=True,
     )
     async def _search(self, query: str) -> str:
-        payload = {
-            "model": self.model,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a professional market researcher. "
-                        "Provide detailed, factual, and cited summaries based on the search query. "
-                        "Focus on recent data (last 6 months)."
-                    ),
-                },
-                {"role": "user", "content": query},
-            ],
-            "temperature": 0.2,
-        }
-
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(self.base_url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
+        messages = [
+            {
+                "role": "system",
+                "content": (
+                    "You are a professional market researcher. "
+                    "Provide detailed, factual, and cited summaries based on the search query. "
+                    "Focus on recent data (last 6 months)."
+                ),
+            },
+            {"role": "user", "content": query},
+        ]
+        return await llm_client.perplexity_chat(messages, model=self.model, temperature=0.2)
 
     def _generate_queries(self, data: QuestionnaireRequest) -> dict:
         brand = data.project_metadata.brand_name
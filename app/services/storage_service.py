@@ -1,47 +1,144 @@
+import asyncio
+import gzip
 import json
 import logging
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Optional
 
-import boto3
 from botocore.exceptions import ClientError
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # optional — "zstd" falls back to gzip without it
+    zstandard = None
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_warned_zstd = False
+
+
+def _dumps(data) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. a type orjson does not know — let json try (and raise if it cannot)
+    return json.dumps(data).encode("utf-8")
+
+
+def _loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw.decode("utf-8"))
+
+
+def encode_json(data, encoding: Optional[str] = None):
+    """
+    Serialises `data` and compresses it with `encoding` ("gzip", "zstd" or "none";
+    default STORAGE_JSON_ENCODING). Returns (body, content_encoding or None).
+    Payloads under STORAGE_COMPRESS_MIN_BYTES are stored uncompressed.
+    """
+    global _warned_zstd
+    body = _dumps(data)
+    encoding = encoding or settings.STORAGE_JSON_ENCODING
+    if encoding == "none" or len(body) < settings.STORAGE_COMPRESS_MIN_BYTES:
+        return body, None
+    if encoding == "zstd":
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=3).compress(body), "zstd"
+        if not _warned_zstd:
+            logger.warning("STORAGE_JSON_ENCODING=zstd but 'zstandard' is not installed — using gzip")
+            _warned_zstd = True
+    return gzip.compress(body, compresslevel=6), "gzip"
+
+
+def decode_body(raw: bytes) -> bytes:
+    """Decompresses a stored body, detected by magic bytes so legacy plain objects still load."""
+    if raw[:2] == _GZIP_MAGIC:
+        return gzip.decompress(raw)
+    if raw[:4] == _ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("Object is zstd-compressed but 'zstandard' is not installed")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    return raw
+
 
 class StorageService:
     def __init__(self):
-        self.s3_client = boto3.client(
-            "s3",
-            endpoint_url=f"http://{settings.MINIO_ENDPOINT}",
-            aws_access_key_id=settings.MINIO_ACCESS_KEY,
-            aws_secret_access_key=settings.MINIO_SECRET_KEY,
-        )
+        # Nothing here touches the network or imports boto3 — the client (and the
+        # bucket check) are created on first use, so importing the app needs no MinIO
         self.bucket_name = settings.MINIO_BUCKET
-        self._ensure_bucket_exists()
+        self._s3_client = None
+        self._presign_client = None
+        self._client_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.STORAGE_MAX_CONCURRENCY, thread_name_prefix="storage",
+        )
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            with self._client_lock:
+                if self._s3_client is None:
+                    import boto3
+                    from botocore.config import Config
 
-    def _ensure_bucket_exists(self):
+                    client = boto3.client(
+                        "s3",
+                        endpoint_url=f"http://{settings.MINIO_ENDPOINT}",
+                        aws_access_key_id=settings.MINIO_ACCESS_KEY,
+                        aws_secret_access_key=settings.MINIO_SECRET_KEY,
+                        # One pooled client shared by every thread of the async executor below
+                        config=Config(max_pool_connections=settings.STORAGE_MAX_CONCURRENCY),
+                    )
+                    self._ensure_bucket_exists(client)
+                    self._s3_client = client
+        return self._s3_client
+
+    async def start(self) -> None:
+        """Optional warm-up from a lifespan hook: builds the client and checks the bucket off the loop."""
         try:
-            self.s3_client.head_bucket(Bucket=self.bucket_name)
+            await self._run(lambda: self.s3_client)
+        except Exception as e:
+            logger.error(f"Storage warm-up failed (will retry on first use): {e}")
+        if settings.DOWNLOAD_MODE != "stream" and not self.presigned_downloads_enabled:
+            logger.warning(
+                f"DOWNLOAD_MODE={settings.DOWNLOAD_MODE} needs MINIO_PUBLIC_ENDPOINT — downloads are proxied instead"
+            )
+
+    def _ensure_bucket_exists(self, client):
+        try:
+            client.head_bucket(Bucket=self.bucket_name)
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
             if error_code in ("404", "NoSuchBucket"):
                 try:
-                    self.s3_client.create_bucket(Bucket=self.bucket_name)
+                    client.create_bucket(Bucket=self.bucket_name)
                     logger.info(f"Created storage bucket '{self.bucket_name}'")
                 except ClientError as create_err:
                     logger.error(f"Could not create bucket '{self.bucket_name}': {create_err}")
             else:
                 logger.error(f"Unexpected error checking bucket '{self.bucket_name}': {e}")
 
-    def upload_json(self, key: str, data: dict) -> bool:
+    def upload_json(self, key: str, data: dict, encoding: Optional[str] = None) -> bool:
+        body, content_encoding = encode_json(data, encoding)
+        extra = {"ContentEncoding": content_encoding} if content_encoding else {}
         try:
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=key,
-                Body=json.dumps(data),
+                Body=body,
                 ContentType="application/json",
+                **extra,
             )
             return True
         except ClientError as e:
@@ -61,14 +158,90 @@ class StorageService:
             logger.error(f"File upload failed for key '{key}': {e}")
             return False
 
+    def upload_bytes(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> bool:
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=data,
+                ContentType=content_type,
+            )
+            return True
+        except ClientError as e:
+            logger.error(f"Upload failed for key '{key}': {e}")
+            return False
+
     def get_json(self, key: str) -> Optional[dict]:
         try:
             response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-            return json.loads(response["Body"].read().decode("utf-8"))
+            return _loads(decode_body(response["Body"].read()))
         except ClientError as e:
             logger.error(f"JSON download failed for key '{key}': {e}")
             return None
 
+    def exists(self, key: str) -> bool:
+        """Cheap existence check (HEAD) — does not download the object."""
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("404", "NoSuchKey", "NotFound"):
+                logger.error(f"Existence check failed for key '{key}': {e}")
+            return False
+
+    @property
+    def presigned_downloads_enabled(self) -> bool:
+        """Presigned URLs need MINIO_PUBLIC_ENDPOINT — browsers cannot reach the internal MINIO_ENDPOINT."""
+        return bool(settings.MINIO_PUBLIC_ENDPOINT)
+
+    def presigned_download_url(
+        self,
+        key: str,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        expires_in: Optional[int] = None,
+    ) -> str:
+        """
+        Returns a short-lived GET URL for `key` on the public MinIO endpoint, so the
+        browser downloads straight from storage. `filename` sets the response's
+        Content-Disposition to an attachment with that name. Raises RuntimeError
+        when no public endpoint is configured.
+        """
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        if content_type:
+            params["ResponseContentType"] = content_type
+        return self._get_presign_client().generate_presigned_url(
+            "get_object",
+            Params=params,
+            ExpiresIn=expires_in or settings.PRESIGNED_URL_EXPIRY,
+        )
+
+    def _get_presign_client(self):
+        # Separate client: the signature covers the host, so URLs must be signed for
+        # the endpoint the browser will use, not the internal one
+        if self._presign_client is None:
+            import boto3
+            from botocore.config import Config
+
+            if not self.presigned_downloads_enabled:
+                raise RuntimeError(
+                    "MINIO_PUBLIC_ENDPOINT is not set — a presigned URL would name the internal MinIO host"
+                )
+            endpoint = settings.MINIO_PUBLIC_ENDPOINT
+            if "://" not in endpoint:
+                endpoint = f"http://{endpoint}"
+            self._presign_client = boto3.client(
+                "s3",
+                endpoint_url=endpoint,
+                aws_access_key_id=settings.MINIO_ACCESS_KEY,
+                aws_secret_access_key=settings.MINIO_SECRET_KEY,
+                region_name="us-east-1",
+                config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+            )
+        return self._presign_client
+
     def get_file_stream(self, key: str):
         """Returns a streaming body for the given key, or None if not found."""
         try:
@@ -78,5 +251,31 @@ class StorageService:
             logger.error(f"File stream download failed for key '{key}': {e}")
             return None
 
+    # ------------------------------------------------------------------ #
+    # Async interface — boto3 calls run on the storage thread pool so they
+    # never block the event loop and independent writes overlap.
+    # ------------------------------------------------------------------ #
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def upload_json_async(self, key: str, data: dict) -> bool:
+        return await self._run(self.upload_json, key, data)
+
+    async def upload_bytes_async(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> bool:
+        return await self._run(self.upload_bytes, key, data, content_type)
+
+    async def get_json_async(self, key: str) -> Optional[dict]:
+        return await self._run(self.get_json, key)
+
+    async def exists_async(self, key: str) -> bool:
+        return await self._run(self.exists, key)
+
+    async def upload_many(self, items: Dict[str, dict]) -> Dict[str, bool]:
+        """Uploads several JSON artifacts concurrently; returns key → success."""
+        keys = list(items)
+        results = await asyncio.gather(*(self.upload_json_async(key, items[key]) for key in keys))
+        return dict(zip(keys, results))
+
 
 storage_service = StorageService()
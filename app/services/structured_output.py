@@ -0,0 +1,289 @@
+"""
+structured_output.py
+
+Parsing and validation of JSON responses from the LLM providers.
+
+  - `repair_json` recovers JSON from the usual failure modes — markdown fences,
+    prose around the object, trailing commas, Python literals and output cut off
+    mid-object — so a near-miss does not cost a full re-generation.
+  - `validate_partial` validates against a response model (schemas/llm_outputs.py)
+    field by field: a malformed field falls back to its default, and for lists
+    only the bad items are dropped.
+  - `JsonArrayStream` pulls complete items out of a streamed response one by
+    one, so consumers can act on each slide before the whole deck has arrived.
+  - `openai_response_format`, `gemini_response_schema` and `json_schema` turn the
+    same models into each provider's native structured-output schema.
+"""
+import json
+import logging
+import re
+import typing
+from typing import Any, List, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+# ---------------------------------------------------------------------------
+# Repair parser
+# ---------------------------------------------------------------------------
+
+def _truncation_candidates(text: str) -> List[str]:
+    """
+    Completions for output that was cut off mid-object: first keep everything
+    (closing an open string), then cut back to the last complete value.
+    """
+    stack: List[str] = []
+    safe_stack: List[str] = []
+    in_string = escaped = False
+    last_safe = 0  # end of the last complete value or container opener
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            last_safe, safe_stack = i + 1, list(stack)
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            last_safe, safe_stack = i + 1, list(stack)
+        elif ch == ",":
+            last_safe, safe_stack = i, list(stack)
+    if not stack and not in_string:
+        return []
+
+    def close(body: str, open_containers: List[str]) -> str:
+        return body.rstrip().rstrip(",") + "".join(reversed(open_containers))
+
+    return [
+        close(text + ('"' if in_string else ""), stack),
+        close(text[:last_safe], safe_stack),
+    ]
+
+
+def repair_json(text: str) -> Any:
+    """Parses `text` as JSON, repairing common LLM formatting faults. Raises ValueError if nothing is recoverable."""
+    if not text or not text.strip():
+        raise ValueError("Empty response")
+    cleaned = _FENCE_RE.sub("", text.strip())
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        pass
+
+    starts = [i for i in (cleaned.find("{"), cleaned.find("[")) if i != -1]
+    if not starts:
+        raise ValueError("No JSON object in response")
+    candidate = cleaned[min(starts):]
+    end = max(candidate.rfind("}"), candidate.rfind("]"))
+
+    attempts = [candidate]
+    if end != -1:
+        attempts.append(candidate[:end + 1])  # prose after the object
+    fixed = []
+    for attempt in attempts:
+        attempt = _TRAILING_COMMA_RE.sub(r"\1", attempt)
+        fixed.append(re.sub(r"\b(True|False|None)\b", lambda m: _PY_LITERALS[m.group(1)], attempt))
+    # Complete parses first; only then close up output that was cut off, longest first
+    for variant in (*fixed, *(closed for attempt in fixed for closed in _truncation_candidates(attempt))):
+        try:
+            return json.loads(variant)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Response is not repairable JSON")
+
+
+# ---------------------------------------------------------------------------
+# Field-level validation
+# ---------------------------------------------------------------------------
+
+def validate_partial(model_cls: Type[BaseModel], data: Any, path: str = "") -> Tuple[BaseModel, List[str]]:
+    """
+    Validates `data` against `model_cls`, keeping every field that is valid.
+    Returns (instance, invalid field paths); invalid fields take their defaults.
+    """
+    if not isinstance(data, dict):
+        return model_cls(), [path or "<root>"]
+
+    values: dict = {}
+    invalid: List[str] = []
+    for name, field in model_cls.model_fields.items():
+        if name not in data:
+            continue
+        value, where = data[name], f"{path}{name}"
+        annotation = field.annotation
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            values[name], nested_invalid = validate_partial(annotation, value, f"{where}.")
+            invalid.extend(nested_invalid)
+            continue
+        try:
+            # Run the model's own validators (e.g. unwrapping) by validating this one field
+            values[name] = getattr(model_cls.model_validate({name: value}), name)
+        except ValidationError:
+            if not (isinstance(value, list) and typing.get_origin(field.annotation) is list):
+                invalid.append(where)
+                continue
+            items = []
+            for index, item in enumerate(value):
+                try:
+                    items.extend(getattr(model_cls.model_validate({name: [item]}), name))
+                except ValidationError:
+                    invalid.append(f"{where}[{index}]")
+            values[name] = items
+
+    if model_cls.model_config.get("extra") == "allow":
+        values.update({k: v for k, v in data.items() if k not in model_cls.model_fields})
+    return model_cls.model_construct(**{**model_cls().__dict__, **values}), invalid
+
+
+def parse_structured(text: str, model_cls: Type[BaseModel], label: str) -> dict:
+    """
+    Repairs, validates and dumps an LLM response. Raises ValueError only when no
+    JSON object can be recovered at all; field-level problems are logged and defaulted.
+    """
+    data = repair_json(text)
+    if not isinstance(data, dict):
+        raise ValueError(f"{label}: expected a JSON object, got {type(data).__name__}")
+    instance, invalid = validate_partial(model_cls, data)
+    if invalid:
+        logger.warning(f"{label}: defaulted invalid field(s) {', '.join(invalid)}")
+    return instance.model_dump()
+
+
+# ---------------------------------------------------------------------------
+# Incremental parsing
+# ---------------------------------------------------------------------------
+
+class JsonArrayStream:
+    """
+    Incremental parser for streamed output shaped like {"<key>": [ {...}, {...} ]}.
+    `feed(chunk)` returns the array items completed by that chunk; the rest of
+    the document is ignored. Items that fail to parse are skipped.
+    """
+
+    def __init__(self, key: str):
+        self._key_re = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self.text = ""  # everything received so far
+        self._pos = -1  # scan position; -1 until the array has opened
+        self._depth = 0
+        self._item_start = 0
+        self._in_string = self._escaped = self.closed = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        self.text += chunk
+        items: List[Any] = []
+        if self.closed:
+            return items
+        if self._pos < 0:
+            match = self._key_re.search(self.text)
+            if match is None:
+                return items
+            self._pos = match.end()
+
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if self._depth == 0:
+                    self._item_start = i
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0:  # the array itself closed
+                    self.closed = True
+                    break
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        items.append(json.loads(text[self._item_start:i + 1]))
+                    except json.JSONDecodeError:
+                        logger.warning("Skipping malformed streamed item")
+        self._pos = len(text)
+        return items
+
+
+# ---------------------------------------------------------------------------
+# Provider schemas
+# ---------------------------------------------------------------------------
+
+def _inline_refs(schema: dict) -> dict:
+    defs = schema.get("$defs", {})
+
+    def resolve(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return resolve(defs[node["$ref"].split("/")[-1]])
+            return {key: resolve(value) for key, value in node.items() if key != "$defs"}
+        if isinstance(node, list):
+            return [resolve(item) for item in node]
+        return node
+
+    return resolve(schema)
+
+
+def _prune(node, keep: frozenset, strict: bool):
+    if isinstance(node, list):
+        return [_prune(item, keep, strict) for item in node]
+    if not isinstance(node, dict):
+        return node
+    options = [option for option in node.get("anyOf", ()) if option.get("type") != "null"]
+    if len(options) == 1:
+        # Optional[X]: Gemini marks it nullable, JSON schema allows a null type
+        merged = {**{k: v for k, v in node.items() if k != "anyOf"}, **options[0]}
+        if len(node["anyOf"]) > 1:
+            if "nullable" in keep:
+                merged["nullable"] = True
+            else:
+                merged["type"] = [merged["type"], "null"]
+        node = merged
+    out = {key: _prune(value, keep, strict) if key == "items" else value
+           for key, value in node.items() if key in keep and key != "properties"}
+    if "properties" in node:
+        out["properties"] = {name: _prune(prop, keep, strict) for name, prop in node["properties"].items()}
+        if strict:
+            out["required"] = list(out["properties"])
+            out["additionalProperties"] = False
+    return out
+
+
+_JSON_SCHEMA_KEYS = frozenset({"type", "properties", "items", "required", "description", "enum", "additionalProperties"})
+_GEMINI_SCHEMA_KEYS = frozenset({"type", "properties", "items", "required", "description", "enum", "nullable", "format"})
+
+
+def json_schema(model_cls: Type[BaseModel], strict: bool = False) -> dict:
+    """Plain JSON schema (refs inlined, titles/defaults dropped); `strict` marks every field required."""
+    return _prune(_inline_refs(model_cls.model_json_schema()), _JSON_SCHEMA_KEYS, strict)
+
+
+def openai_response_format(model_cls: Type[BaseModel], name: str) -> dict:
+    """`response_format` for OpenAI structured outputs (strict JSON schema)."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "strict": True, "schema": json_schema(model_cls, strict=True)},
+    }
+
+
+def gemini_response_schema(model_cls: Type[BaseModel]) -> dict:
+    """`response_schema` for Gemini — the OpenAPI subset google-generativeai accepts."""
+    return _prune(_inline_refs(model_cls.model_json_schema()), _GEMINI_SCHEMA_KEYS, False)
@@ -1,8 +1,8 @@
 import asyncio
 import logging
-import os
-import tempfile
 import traceback
+from datetime import datetime, timedelta
+from typing import Optional
 
 from sqlalchemy.orm import Session
 
@@ -13,8 +13,14 @@ from app.schemas.questionnaire import QuestionnaireRequest
 from app.services.brand_audit_service import brand_audit_service
 from app.services.consensus_service import consensus_service
 from app.services.gemini_research_service import gemini_research_service
+from app.services.job_events import job_events
+from app.services.job_queue import _retry_delay
+from app.services.llm_client import llm_client
 from app.services.multi_analysis_service import multi_analysis_service
-from app.services.presentation_service import presentation_service
+from app.services.pipeline_scheduler import gather_quorum
+from app.services.presentation_service import SLIDE_COUNT, presentation_service
+from app.services.render_pool import render_pool
+from app.services.research_cache import research_cache, research_inputs
 from app.services.research_consolidator import research_consolidator
 from app.services.research_service import research_service
 from app.services.storage_service import storage_service
@@ -22,6 +28,68 @@ from app.services.news_research_service import news_research_service
 
 logger = logging.getLogger(__name__)
 
+# Ordered workflow checkpoints: step name → artifacts (under jobs/{job_id}/) it produces.
+# A resumed job restarts at the first step whose artifacts are not all in storage.
+WORKFLOW_CHECKPOINTS = [
+    ("quad_research", [
+        "research_perplexity.json",
+        "research_gemini.json",
+        "research_brand_audit.json",
+        "research_news.json",
+        "research_consolidated.json",
+    ]),
+    ("triple_analysis", ["analysis_raw_triple.json"]),
+    ("consensus", ["analysis.json"]),
+    ("slide_structure", ["slides.json"]),
+    ("pptx_generation", ["presentation.pptx"]),
+]
+
+
+def _artifact_key(job_id: str, name: str) -> str:
+    return f"jobs/{job_id}/{name}"
+
+
+def find_resume_step(job_id: str) -> Optional[str]:
+    """Returns the first workflow step with missing artifacts, or None if every step is done."""
+    for step, artifacts in WORKFLOW_CHECKPOINTS:
+        if not all(storage_service.exists(_artifact_key(job_id, name)) for name in artifacts):
+            return step
+    return None
+
+
+async def _load_checkpoint(job_id: str, name: str):
+    """Returns a stored step artifact, or None if it is missing or recorded a failure."""
+    key = _artifact_key(job_id, name)
+    if not await storage_service.exists_async(key):
+        return None
+    data = await storage_service.get_json_async(key)
+    if isinstance(data, dict) and data.get("error"):
+        return None  # the step produced an error payload last time — redo it
+    return data
+
+
+def _save_usage(db: Session, job_id: str, usage: dict) -> None:
+    """Adds this run's LLM token usage to project_metadata["llm_usage"], summed across retries."""
+    if not usage:
+        return
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            return
+        totals = dict((job.project_metadata or {}).get("llm_usage") or {})
+        for model, counts in usage.items():
+            previous = totals.get(model) or {}
+            totals[model] = {name: previous.get(name, 0) + value for name, value in counts.items()}
+        # Reassigned, not mutated in place, so the JSON column is flagged dirty
+        job.project_metadata = {**(job.project_metadata or {}), "llm_usage": totals}
+        db.commit()
+        prompt = sum(counts["prompt_tokens"] for counts in usage.values())
+        cached = sum(counts["cached_tokens"] for counts in usage.values())
+        logger.info(f"[Job {job_id}] LLM usage: {cached}/{prompt} prompt tokens served from provider caches")
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"[Job {job_id}] Could not save LLM usage: {e}")
+
 
 def _fail_job(db: Session, job_id: str, step: str, error: Exception) -> None:
     """Mark a job as failed with diagnostic info."""
@@ -36,15 +104,84 @@ def _fail_job(db: Session, job_id: str, step: str, error: Exception) -> None:
         logger.exception(f"[Job {job_id}] Could not update failed status in DB")
 
 
-async def perform_research_workflow(job_id: str, request_data: dict):
+async def _report_failure(
+    db: Session, job_id: str, step: str, error: Exception, detail: str, attempt: int, max_attempts: int,
+) -> None:
+    """
+    Publishes a failed attempt. Only the last attempt marks the job FAILED and ends
+    its event streams; earlier ones leave the status alone and announce the retry.
+    """
+    if attempt < max_attempts:
+        next_run_at = datetime.utcnow() + timedelta(seconds=_retry_delay(attempt))
+        await job_events.publish(job_id, "retrying", {
+            "step": step,
+            "error": detail,
+            "attempt": attempt,
+            "max_attempts": max_attempts,
+            "next_run_at": next_run_at.isoformat() + "Z",
+        })
+        return
+    _fail_job(db, job_id, step, error)
+    await job_events.publish(job_id, "failed", {"step": step, "error": detail})
+
+
+class _SlideStreamFailed(Exception):
+    """Raised when the slide stream itself (not the render) fails."""
+
+
+async def _stream_slides_and_render(job_id: str, questionnaire: dict, analysis: dict):
+    """
+    Streams slide structuring straight into the render pool, publishing each slide
+    as it arrives. Returns (slides_data, pptx_bytes), or (None, None) if the slide
+    stream failed and the caller should fall back to a single structuring request.
+    Render failures propagate — re-running the LLM would not fix them.
+    """
+    slides = []
+
+    async def arriving():
+        try:
+            async for slide in presentation_service.stream_slides(questionnaire, analysis):
+                slides.append(slide)
+                await job_events.publish(
+                    job_id, "slides.slide", {"index": len(slides), "type": slide.get("type"), "title": slide.get("title")},
+                )
+                yield slide
+        except Exception as e:
+            raise _SlideStreamFailed(str(e)) from e
+
+    try:
+        pptx_bytes = await render_pool.render_stream(arriving(), questionnaire, SLIDE_COUNT)
+    except _SlideStreamFailed as e:
+        logger.warning(f"[Job {job_id}] Streamed slide structuring failed, retrying as one request: {e}")
+        return None, None
+    return {"slides": slides}, pptx_bytes
+
+
+async def perform_research_workflow(
+    job_id: str,
+    request_data: dict,
+    resume: bool = False,
+    force_refresh: bool = False,
+    attempt: int = 1,
+    max_attempts: int = 1,
+):
     """
     Background task to run deep research and persist results.
     A new DB session is created here since it runs outside the request lifecycle.
+
+    With resume=True, steps whose artifacts already exist in storage are loaded
+    instead of re-run, so a retry only pays for the steps that failed.
+    force_refresh=True bypasses the cross-job research cache.
+
+    A failure is re-raised so the job queue can retry it (the worker resumes retries
+    from the last checkpoint). attempt/max_attempts come from the queue entry: only
+    the last attempt marks the job FAILED, earlier ones publish a "retrying" event.
     """
     db: Session = SessionLocal()
     step = "init"
+    usage = llm_client.track_usage()
     try:
-        logger.info(f"[Job {job_id}] Starting Research Workflow")
+        logger.info(f"[Job {job_id}] Starting Research Workflow{' (resume)' if resume else ''}")
 
         # 1. Update status to RESEARCHING
         step = "status_update"
@@ -53,149 +190,219 @@ async def perform_research_workflow(job_id: str, request_data: dict):
             logger.error(f"[Job {job_id}] Job not found in DB — aborting")
             return
 
+        # Checkpoints are reused only until the first step that has to run again;
+        # everything after it is recomputed so no stale artifact leaks forward.
+        reusing = resume
+
+        async def checkpoint(name: str):
+            if not reusing:
+                return None
+            data = await _load_checkpoint(job_id, name)
+            if data is not None:
+                logger.info(f"[Job {job_id}] Reusing checkpoint {name}")
+            return data
+
         job.status = JobStatus.RESEARCHING
+        job.failed_step = None
+        job.error_message = None
         db.commit()
+        await job_events.publish(job_id, "status", {"status": JobStatus.RESEARCHING.value})
 
-        # 2. Run Quad Research in parallel with timeout:
-        #    - Perplexity: competitor data, USP validation, brand awareness, share of voice
-        #    - Gemini: visual trends, cultural insights, campaign examples, content formats
-        #    - Brand Audit: homepage scrape → current positioning, tone, gaps
-        #    - NewsAPI: press coverage, industry news, competitor announcements
-        #    All except Gemini are optional — failures degrade gracefully.
-        step = "quad_research"
         questionnaire = QuestionnaireRequest(**request_data)
-        competitors = questionnaire.market_context.main_competitors or []
-        logger.info(f"[Job {job_id}] Starting Quad Research (Perplexity + Gemini + Brand Audit + News)")
-
-        async def safe_perplexity():
-            try:
-                return await research_service.conduct_deep_research(questionnaire)
-            except Exception as e:
-                logger.warning(f"[Job {job_id}] Perplexity research failed, continuing without it: {e}")
-                return {}
-
-        async def safe_brand_audit():
-            try:
-                return await brand_audit_service.audit_brand_website(
+
+        consolidated_research = await checkpoint("research_consolidated.json")
+        if consolidated_research is None:
+            # 2. Run Quad Research as a dataflow stage:
+            #    - Perplexity: competitor data, USP validation, brand awareness, share of voice
+            #    - Gemini: visual trends, cultural insights, campaign examples, content formats
+            #    - Brand Audit: homepage scrape → current positioning, tone, gaps
+            #    - NewsAPI: press coverage, industry news, competitor announcements
+            #    All except Gemini are optional — failures degrade gracefully.
+            #    Each source is served from the research cache when its inputs are unchanged,
+            #    persisted the moment it arrives, and dropped on its own if it is still
+            #    running once the quorum is in and the grace period has passed.
+            step = "quad_research"
+            competitors = questionnaire.market_context.main_competitors or []
+            cache_inputs = research_inputs(questionnaire)
+            logger.info(f"[Job {job_id}] Starting Quad Research (Perplexity + Gemini + Brand Audit + News)")
+
+            fetchers = {
+                "perplexity": lambda: research_service.conduct_deep_research(questionnaire),
+                "gemini": lambda: gemini_research_service.conduct_creative_research(questionnaire),
+                "brand_audit": lambda: brand_audit_service.audit_brand_website(
                     str(questionnaire.project_metadata.website_url),
                     questionnaire.project_metadata.brand_name,
-                )
-            except Exception as e:
-                logger.warning(f"[Job {job_id}] Brand audit failed, continuing without it: {e}")
-                return {}
-
-        async def safe_news_research():
-            try:
-                return await asyncio.to_thread(
+                ),
+                "news": lambda: asyncio.to_thread(
                     news_research_service.conduct_news_research,
                     questionnaire.project_metadata.brand_name,
                     questionnaire.project_metadata.industry,
                     competitors,
-                )
-            except Exception as e:
-                logger.warning(f"[Job {job_id}] News research failed, continuing without it: {e}")
-                return {}
-
-        perplexity_results, gemini_results, brand_audit, news_results = await asyncio.wait_for(
-            asyncio.gather(
-                safe_perplexity(),
-                gemini_research_service.conduct_creative_research(questionnaire),
-                safe_brand_audit(),
-                safe_news_research(),
-            ),
-            timeout=settings.RESEARCH_TIMEOUT,
-        )
+                ),
+            }
 
-        if not perplexity_results:
-            logger.warning(f"[Job {job_id}] Running in Gemini-only research mode")
-        if not brand_audit:
-            logger.warning(f"[Job {job_id}] Brand audit unavailable — proceeding without homepage data")
-        if not news_results:
-            logger.info(f"[Job {job_id}] News research unavailable (NEWSAPI_KEY not set or failed)")
-
-        # 3. Consolidate Research
-        step = "consolidation"
-        logger.info(f"[Job {job_id}] Consolidating Research")
-        consolidated_research = research_consolidator.consolidate_research(
-            perplexity_results, gemini_results, brand_audit, news_results=news_results,
-        )
+            # Sources persisted before an interrupted run are reused on resume
+            stored_sources = await asyncio.gather(*(checkpoint(f"research_{s}.json") for s in fetchers))
+            research = {}
+            pending_sources = {}
+            for (source, fetch), stored in zip(fetchers.items(), stored_sources):
+                if stored:
+                    research[source] = stored
+                else:
+                    pending_sources[source] = research_cache.get_or_fetch(
+                        source, cache_inputs[source], fetch, force_refresh=force_refresh,
+                    )
+            reusing = False
+
+            async def persist_source(source: str, data):
+                await storage_service.upload_json_async(_artifact_key(job_id, f"research_{source}.json"), data)
+                await job_events.publish(job_id, "research.source", {"source": source, "ok": bool(data)})
+
+            outcome = await gather_quorum(
+                pending_sources,
+                quorum=max(0, settings.RESEARCH_QUORUM - len(research)),
+                timeout=settings.RESEARCH_TIMEOUT,
+                grace=settings.RESEARCH_GRACE_PERIOD,
+                required=[s for s in settings.RESEARCH_REQUIRED_SOURCES if s not in research],
+                on_result=persist_source,
+            )
+            research.update(outcome.results)
+            for source in outcome.dropped:
+                logger.warning(f"[Job {job_id}] {source} research too slow — dropped")
+                research[source] = {}
 
-        # 4. Persist Research artifacts
-        step = "persist_research"
-        storage_service.upload_json(f"jobs/{job_id}/research_perplexity.json", perplexity_results)
-        storage_service.upload_json(f"jobs/{job_id}/research_gemini.json", gemini_results)
-        storage_service.upload_json(f"jobs/{job_id}/research_brand_audit.json", brand_audit)
-        storage_service.upload_json(f"jobs/{job_id}/research_news.json", news_results)
-        storage_service.upload_json(f"jobs/{job_id}/research_consolidated.json", consolidated_research)
-        logger.info(f"[Job {job_id}] Research artifacts saved")
+            perplexity_results = research.get("perplexity") or {}
+            gemini_results = research.get("gemini") or {}
+            brand_audit = research.get("brand_audit") or {}
+            news_results = research.get("news") or {}
+
+            if not perplexity_results:
+                logger.warning(f"[Job {job_id}] Running in Gemini-only research mode")
+            if not brand_audit:
+                logger.warning(f"[Job {job_id}] Brand audit unavailable — proceeding without homepage data")
+            if not news_results:
+                logger.info(f"[Job {job_id}] News research unavailable (NEWSAPI_KEY not set or failed)")
+
+            # 3. Consolidate Research
+            step = "consolidation"
+            logger.info(f"[Job {job_id}] Consolidating Research")
+            consolidated_research = research_consolidator.consolidate_research(
+                perplexity_results, gemini_results, brand_audit, news_results=news_results,
+            )
+
+            # 4. Persist consolidated research plus empty artifacts for dropped sources in
+            #    one concurrent batch (finished sources were saved on arrival)
+            step = "persist_research"
+            await storage_service.upload_many({
+                **{_artifact_key(job_id, f"research_{source}.json"): {} for source in outcome.dropped},
+                _artifact_key(job_id, "research_consolidated.json"): consolidated_research,
+            })
+            for source in outcome.dropped:
+                await job_events.publish(job_id, "research.source", {"source": source, "ok": False, "dropped": True})
+            logger.info(f"[Job {job_id}] Research artifacts saved")
+            await job_events.publish(job_id, "research.completed")
+        else:
+            step = "load_research"
+            perplexity_results, brand_audit, news_results = [
+                data or {}
+                for data in await asyncio.gather(
+                    checkpoint("research_perplexity.json"),
+                    checkpoint("research_brand_audit.json"),
+                    checkpoint("research_news.json"),
+                )
+            ]
 
         # 5. Run Triple Analysis in parallel with timeout
-        step = "triple_analysis"
-        logger.info(f"[Job {job_id}] Starting Triple Analysis (GPT-4o, Gemini, Perplexity)")
         job.status = JobStatus.ANALYZING
         db.commit()
+        await job_events.publish(job_id, "status", {"status": JobStatus.ANALYZING.value})
+        triple_analysis_results = await checkpoint("analysis_raw_triple.json")
+        if triple_analysis_results is None:
+            reusing = False
+            step = "triple_analysis"
+            logger.info(f"[Job {job_id}] Starting Triple Analysis (GPT-4o, Gemini, Perplexity)")
 
-        triple_analysis_results = await asyncio.wait_for(
-            multi_analysis_service.run_triple_analysis(request_data, consolidated_research),
-            timeout=settings.ANALYSIS_TIMEOUT,
-        )
-        storage_service.upload_json(f"jobs/{job_id}/analysis_raw_triple.json", triple_analysis_results)
+            async def on_analysis(model: str, result: dict):
+                await job_events.publish(job_id, "analysis.model", {"model": model, "ok": not result.get("error")})
+
+            # ANALYSIS_TIMEOUT is enforced inside, per model, so one straggler is dropped
+            # instead of failing the whole step
+            triple_analysis_results = await multi_analysis_service.run_triple_analysis(
+                request_data, consolidated_research, on_result=on_analysis,
+            )
+            await storage_service.upload_json_async(f"jobs/{job_id}/analysis_raw_triple.json", triple_analysis_results)
 
         # 6. Generate Consensus
-        step = "consensus"
-        logger.info(f"[Job {job_id}] Generating Consensus")
-        consensus_result = consensus_service.generate_consensus(triple_analysis_results)
-        storage_service.upload_json(f"jobs/{job_id}/analysis.json", consensus_result)
-        logger.info(f"[Job {job_id}] Consensus saved")
-
-        # 7. Structure Slides
-        step = "slide_structure"
-        logger.info(f"[Job {job_id}] Structuring Slides")
-
-        # Enrich consensus result with research snapshots for richer slide copy
-        consensus_with_research = {
-            **consensus_result,
-            "perplexity_research_snapshot": perplexity_results,
-            "brand_audit_snapshot": brand_audit,
-            "news_snapshot": news_results,
-        }
-        slide_structure = presentation_service.structure_content(request_data, consensus_with_research)
-        storage_service.upload_json(f"jobs/{job_id}/slides.json", slide_structure)
-
-        # 8. Generate PPTX using a safe temp file
-        step = "pptx_generation"
-        logger.info(f"[Job {job_id}] Generating PowerPoint")
-        with tempfile.NamedTemporaryFile(suffix=".pptx", delete=False) as tmp:
-            temp_pptx = tmp.name
+        consensus_result = await checkpoint("analysis.json")
+        if consensus_result is None:
+            reusing = False
+            step = "consensus"
+            logger.info(f"[Job {job_id}] Generating Consensus")
+            consensus_result = await consensus_service.generate_consensus(triple_analysis_results)
+            await storage_service.upload_json_async(f"jobs/{job_id}/analysis.json", consensus_result)
+            logger.info(f"[Job {job_id}] Consensus saved")
+            await job_events.publish(job_id, "consensus.completed")
 
-        try:
-            generated_path = presentation_service.generate_pptx(slide_structure, temp_pptx, questionnaire=request_data)
-            if generated_path:
-                pptx_key = f"jobs/{job_id}/presentation.pptx"
-                storage_service.upload_file(
-                    pptx_key,
-                    generated_path,
-                    content_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        # 7. Structure Slides (streamed: the deck is rendered as slides arrive)
+        pptx_bytes = None
+        slide_structure = await checkpoint("slides.json")
+        if slide_structure is None:
+            reusing = False
+            step = "slide_structure"
+            logger.info(f"[Job {job_id}] Structuring Slides")
+
+            # Enrich consensus result with research snapshots for richer slide copy
+            consensus_with_research = {
+                **consensus_result,
+                "perplexity_research_snapshot": perplexity_results,
+                "brand_audit_snapshot": brand_audit,
+                "news_snapshot": news_results,
+            }
+            if settings.SLIDE_STREAMING:
+                slide_structure, pptx_bytes = await _stream_slides_and_render(
+                    job_id, request_data, consensus_with_research,
                 )
-                logger.info(f"[Job {job_id}] PPTX saved to {pptx_key}")
-            else:
-                raise RuntimeError("presentation_service.generate_pptx returned None")
-        finally:
-            if os.path.exists(temp_pptx):
-                os.remove(temp_pptx)
+            if slide_structure is None:
+                slide_structure = await presentation_service.structure_content(request_data, consensus_with_research)
+            await storage_service.upload_json_async(f"jobs/{job_id}/slides.json", slide_structure)
+            await job_events.publish(job_id, "slides.completed", {"slides": len(slide_structure.get("slides", []))})
+
+        # 8. Render the PPTX in the render process pool
+        step = "pptx_generation"
+        if reusing and await storage_service.exists_async(_artifact_key(job_id, "presentation.pptx")):
+            job.status = JobStatus.COMPLETED
+            db.commit()
+            logger.info(f"[Job {job_id}] All checkpoints present — nothing left to resume")
+            await job_events.publish(job_id, "completed", {"status": JobStatus.COMPLETED.value})
+            return
+        if pptx_bytes is None:
+            logger.info(f"[Job {job_id}] Generating PowerPoint")
+            pptx_bytes = await render_pool.render(slide_structure, request_data)
+        pptx_key = f"jobs/{job_id}/presentation.pptx"
+        await storage_service.upload_bytes_async(
+            pptx_key,
+            pptx_bytes,
+            "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        )
+        logger.info(f"[Job {job_id}] PPTX saved to {pptx_key}")
+        await job_events.publish(job_id, "pptx.completed")
 
         # 9. Done
         step = "complete"
         job.status = JobStatus.COMPLETED
         db.commit()
         logger.info(f"[Job {job_id}] Workflow complete")
+        await job_events.publish(job_id, "completed", {"status": JobStatus.COMPLETED.value})
 
     except asyncio.TimeoutError as e:
         logger.error(f"[Job {job_id}] Timeout at step '{step}': {e}")
-        _fail_job(db, job_id, step, e)
+        await _report_failure(db, job_id, step, e, "timeout", attempt, max_attempts)
+        raise
     except Exception as e:
         logger.error(f"[Job {job_id}] Workflow failed at step '{step}': {e}")
         traceback.print_exc()
-        _fail_job(db, job_id, step, e)
+        await _report_failure(db, job_id, step, e, str(e)[:500], attempt, max_attempts)
+        raise
     finally:
+        _save_usage(db, job_id, usage)
         db.close()
@@ -0,0 +1,105 @@
+"""
+Re-encode existing JSON artifacts with the current STORAGE_JSON_ENCODING.
+
+    python -m app.storage_migrate [--prefix jobs/ --prefix cache/] [--dry-run]
+
+Objects are rewritten in place with identical content, and StorageService.get_json
+reads both the plain and the compressed form. Objects that already carry a
+Content-Encoding are skipped.
+
+Each rewrite is a conditional PUT (If-Match on the ETag that was read), so a job or
+research-cache write landing between the read and the rewrite wins and the object
+is reported as "changed" instead of being overwritten with stale data. Objects
+modified after the scan started are left alone for the same reason. Conditional
+writes need S3 or MinIO RELEASE.2024-11 or newer; on older MinIO, which ignores
+If-Match, stop the API and workers before running this.
+"""
+import argparse
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+from app.core.config import settings
+from app.services.storage_service import _loads, decode_body, encode_json, storage_service
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFIXES = ["jobs/", "cache/"]
+
+
+def _iter_json_keys(prefix: str):
+    paginator = storage_service.s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=storage_service.bucket_name, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if obj["Key"].endswith(".json"):
+                yield obj["Key"]
+
+
+def _migrate_key(key: str, dry_run: bool, scan_started: datetime) -> str:
+    """Returns "migrated", "skipped", "changed" (written concurrently) or "failed"."""
+    client = storage_service.s3_client
+    try:
+        head = client.head_object(Bucket=storage_service.bucket_name, Key=key)
+        if head.get("ContentEncoding") or head["ContentLength"] < settings.STORAGE_COMPRESS_MIN_BYTES:
+            return "skipped"
+        if dry_run:
+            return "migrated"
+        obj = client.get_object(Bucket=storage_service.bucket_name, Key=key)
+        if obj["LastModified"] >= scan_started:
+            return "changed"  # written by a live job since the scan began — already current
+        data = _loads(decode_body(obj["Body"].read()))
+        body, content_encoding = encode_json(data)
+        client.put_object(
+            Bucket=storage_service.bucket_name,
+            Key=key,
+            Body=body,
+            ContentType="application/json",
+            IfMatch=obj["ETag"],
+            **({"ContentEncoding": content_encoding} if content_encoding else {}),
+        )
+        return "migrated"
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("PreconditionFailed", "412"):
+            return "changed"
+        logger.error(f"Could not migrate '{key}': {e}")
+        return "failed"
+    except Exception as e:
+        logger.error(f"Could not migrate '{key}': {e}")
+        return "failed"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compress existing JSON artifacts in MinIO.")
+    parser.add_argument("--prefix", action="append", help="Key prefix to scan (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Only count objects that would be rewritten")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+    if settings.STORAGE_JSON_ENCODING == "none":
+        parser.error("STORAGE_JSON_ENCODING is 'none' — nothing to migrate to")
+
+    counts = {"migrated": 0, "skipped": 0, "changed": 0, "failed": 0}
+    scan_started = datetime.now(timezone.utc)
+    with ThreadPoolExecutor(max_workers=settings.STORAGE_MAX_CONCURRENCY) as pool:
+        for prefix in args.prefix or DEFAULT_PREFIXES:
+            keys = list(_iter_json_keys(prefix))
+            logger.info(f"{prefix}: {len(keys)} JSON object(s)")
+            for outcome in pool.map(lambda k: _migrate_key(k, args.dry_run, scan_started), keys):
+                counts[outcome] += 1
+
+    verb = "Would migrate" if args.dry_run else "Migrated"
+    logger.info(
+        f"{verb} {counts['migrated']}, skipped {counts['skipped']}, "
+        f"changed concurrently {counts['changed']}, failed {counts['failed']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
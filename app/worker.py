@@ -0,0 +1,236 @@
+"""
+Background worker pool.
+
+    python -m app.worker [--processes N] [--concurrency M]
+
+Each process claims entries from the job queue, runs the matching task handler,
+heartbeats the lease while it runs and periodically requeues entries whose worker
+died. Workers scale independently of the API replicas.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import uuid
+from typing import Optional
+
+from app.core.config import settings
+from app.db.migrate import ensure_schema
+from app.services.http_clients import http_clients
+from app.services.job_events import job_events
+from app.services.job_queue import (
+    RESEARCH_WORKFLOW_TASK,
+    JobQueueBackend,
+    QueuedTask,
+    get_job_queue,
+)
+from app.services.render_pool import render_pool
+
+logger = logging.getLogger(__name__)
+
+
+def _task_handlers() -> dict:
+    # Handlers raise on failure (the queue retries) and accept resume=True, which the
+    # worker passes on retries so completed steps are not re-run, plus attempt and
+    # max_attempts so only the last attempt reports the job as failed.
+    # Imported lazily so the queue module stays cheap to import from the API
+    from app.services.workflow import perform_research_workflow
+
+    return {
+        RESEARCH_WORKFLOW_TASK: perform_research_workflow,
+    }
+
+
+def _fail_abandoned_job(task: QueuedTask) -> None:
+    """Marks the job as failed once its queue entry has exhausted every attempt."""
+    from app.db.session import SessionLocal
+    from app.services.workflow import _fail_job
+
+    db = SessionLocal()
+    try:
+        _fail_job(db, task.job_id, "worker", RuntimeError(
+            f"Job abandoned after {task.attempts} attempt(s) — worker heartbeat lost"
+        ))
+    finally:
+        db.close()
+
+
+class Worker:
+    """Claims and runs queued tasks inside a single event loop."""
+
+    def __init__(
+        self,
+        queue: Optional[JobQueueBackend] = None,
+        concurrency: Optional[int] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.queue = queue or get_job_queue()
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._stopping = asyncio.Event()
+        self._running: set = set()
+        self._handlers: Optional[dict] = None
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        logger.info(f"[Worker {self.worker_id}] Started (concurrency={self.concurrency})")
+        self._handlers = self._handlers or _task_handlers()
+        reaper = asyncio.create_task(self._reap_stalled())
+        try:
+            while not self._stopping.is_set():
+                if len(self._running) >= self.concurrency:
+                    await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                task = await asyncio.to_thread(self.queue.claim, self.worker_id)
+                if task is None:
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), timeout=settings.WORKER_POLL_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                runner = asyncio.create_task(self._execute(task))
+                self._running.add(runner)
+                runner.add_done_callback(self._running.discard)
+        finally:
+            reaper.cancel()
+            if self._running:
+                logger.info(f"[Worker {self.worker_id}] Waiting for {len(self._running)} running job(s)")
+                await asyncio.gather(*self._running, return_exceptions=True)
+            logger.info(f"[Worker {self.worker_id}] Stopped")
+
+    async def _execute(self, task: QueuedTask) -> None:
+        handler = self._handlers.get(task.task)
+        if handler is None:
+            logger.error(f"[Worker {self.worker_id}] Unknown task '{task.task}' — dropping {task.id}")
+            await asyncio.to_thread(self.queue.fail, task.id, f"Unknown task '{task.task}'", False)
+            return
+
+        logger.info(f"[Worker {self.worker_id}] Running {task.task} for job {task.job_id} (attempt {task.attempts})")
+        kwargs = dict(task.payload, attempt=task.attempts, max_attempts=task.max_attempts)
+        if task.attempts > 1:
+            kwargs["resume"] = True
+        work = asyncio.create_task(handler(task.job_id, **kwargs))
+        heartbeat = asyncio.create_task(self._heartbeat(task, work))
+        try:
+            await work
+        except asyncio.CancelledError:
+            logger.warning(f"[Worker {self.worker_id}] Job {task.job_id} cancelled — lease lost")
+            return
+        except Exception as e:
+            logger.exception(f"[Worker {self.worker_id}] Task {task.id} failed (attempt {task.attempts}/{task.max_attempts})")
+            await asyncio.to_thread(self.queue.fail, task.id, str(e), True)
+            return
+        finally:
+            heartbeat.cancel()
+
+        await asyncio.to_thread(self.queue.complete, task.id)
+
+    async def _heartbeat(self, task: QueuedTask, work: asyncio.Task) -> None:
+        while not work.done():
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            try:
+                owned = await asyncio.to_thread(self.queue.heartbeat, task.id, self.worker_id)
+            except Exception as e:
+                logger.warning(f"[Worker {self.worker_id}] Heartbeat failed for {task.id}: {e}")
+                continue
+            if not owned:
+                # Another worker has requeued the task — stop to avoid running it twice
+                work.cancel()
+                return
+
+    async def _reap_stalled(self) -> None:
+        while True:
+            try:
+                abandoned = await asyncio.to_thread(self.queue.requeue_stalled, settings.JOB_STALL_TIMEOUT)
+                for task in abandoned:
+                    await asyncio.to_thread(_fail_abandoned_job, task)
+                    await job_events.publish(task.job_id, "failed", {"step": "worker", "error": "heartbeat lost"})
+            except Exception as e:
+                logger.warning(f"[Worker {self.worker_id}] Stalled-job sweep failed: {e}")
+            await asyncio.sleep(settings.JOB_STALL_TIMEOUT / 2)
+
+
+# ---------------------------------------------------------------------------
+# Process pool entry point
+# ---------------------------------------------------------------------------
+
+def _configure_logging() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(processName)s %(name)s: %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+
+def _run_process(concurrency: int) -> None:
+    _configure_logging()
+
+    async def _main():
+        worker = Worker(concurrency=concurrency)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        try:
+            await worker.run()
+        finally:
+            await http_clients.aclose()
+            render_pool.shutdown()
+
+    asyncio.run(_main())
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run background job workers.")
+    parser.add_argument("--processes", type=int, default=settings.WORKER_PROCESSES)
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    _configure_logging()
+    if settings.JOB_QUEUE_BACKEND == "memory":
+        parser.error("JOB_QUEUE_BACKEND=memory is process-local; use EMBEDDED_WORKER in the API instead")
+    # Checked once in the supervisor rather than in every spawned process
+    ensure_schema()
+
+    ctx = multiprocessing.get_context("spawn")
+    stopping = False
+
+    def _spawn(i: int):
+        proc = ctx.Process(target=_run_process, args=(args.concurrency,), name=f"worker-{i}")
+        proc.start()
+        return proc
+
+    def _shutdown(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for proc in procs:
+            if proc.is_alive():
+                os.kill(proc.pid, signum)
+
+    procs = [_spawn(i) for i in range(args.processes)]
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+    logger.info(f"Worker pool started: {args.processes} process(es) × {args.concurrency} job(s)")
+
+    # Supervise: restart crashed processes until asked to stop
+    while True:
+        for i, proc in enumerate(procs):
+            proc.join(timeout=1)
+            if not proc.is_alive() and not stopping:
+                logger.warning(f"{proc.name} exited with code {proc.exitcode} — restarting")
+                procs[i] = _spawn(i)
+        if stopping and not any(p.is_alive() for p in procs):
+            break
+
+    logger.info("Worker pool stopped")
+
+
+if __name__ == "__main__":
+    main()
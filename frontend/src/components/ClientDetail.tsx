@@ -5,6 +5,7 @@ import {
     ShoppingBag, Swords,
 } from 'lucide-react';
 import api from '../lib/api';
+import { useJobList } from '../lib/useJobList';
 import type { Client, JobEntry } from '../types';
 
 interface ClientDetailProps {
@@ -63,14 +64,12 @@ export default function ClientDetail({ clientId, onBack, onNewCampaign, onViewJo
         queryFn: () => api.get<Client>(`/clients/${clientId}`).then(r => r.data),
     });
 
-    const { data: jobs, isLoading: jobsLoading } = useQuery<JobEntry[]>({
-        queryKey: ['jobs'],
-        queryFn: () => api.get<JobEntry[]>('/jobs').then(r => r.data),
-        refetchInterval: 15_000,
-        refetchOnWindowFocus: true,
-    });
+    const { jobs, isLoading: jobsLoading, hasMore, loadMore, isLoadingMore } = useJobList<JobEntry>(
+        ['jobs', { client: clientId }],
+        { client_id: clientId },
+    );
 
-    const campaigns = (jobs ?? []).filter(j => j.client_id === clientId);
+    const campaigns = jobs.filter(j => j.client_id === clientId);
 
     if (clientLoading) {
         return (
@@ -190,7 +189,7 @@ export default function ClientDetail({ clientId, onBack, onNewCampaign, onViewJo
                             <h2 className="text-base font-bold text-[#1C1917]">
                                 Campaigns
                                 {campaigns.length > 0 && (
-                                    <span className="ml-2 text-sm font-normal text-[#A8A29E]">({campaigns.length})</span>
+                                    <span className="ml-2 text-sm font-normal text-[#A8A29E]">({campaigns.length}{hasMore ? '+' : ''})</span>
                                 )}
                             </h2>
                         </div>
@@ -291,6 +290,19 @@ export default function ClientDetail({ clientId, onBack, onNewCampaign, onViewJo
                                 })}
                             </div>
                         )}
+
+                        {!jobsLoading && hasMore && (
+                            <div className="mt-4 text-center">
+                                <button
+                                    onClick={() => loadMore()}
+                                    disabled={isLoadingMore}
+                                    className="text-sm font-medium text-[#1E3A5F] hover:underline disabled:opacity-50 inline-flex items-center gap-1.5"
+                                >
+                                    {isLoadingMore && <Loader2 size={14} className="animate-spin" />}
+                                    Load older campaigns
+                                </button>
+                            </div>
+                        )}
                     </div>
                 </div>
             </div>
@@ -1,10 +1,10 @@
-import { useState, useMemo } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import { useState, useMemo, useEffect } from 'react';
+import { useInfiniteQuery, keepPreviousData } from '@tanstack/react-query';
 import {
-    Building2, Plus, AlertCircle, Search,
+    Building2, Plus, AlertCircle, Search, Loader2,
     ChevronRight, BarChart3, Globe, Layers,
 } from 'lucide-react';
-import api from '../lib/api';
+import { listClients } from '../lib/api';
 import type { Client } from '../types';
 
 interface ClientsDashboardProps {
@@ -26,23 +26,27 @@ function relativeTime(iso: string) {
 
 export default function ClientsDashboard({ onNewClient, onViewClient }: ClientsDashboardProps) {
     const [search, setSearch] = useState('');
-
-    const { data: clients, isLoading, isError, refetch } = useQuery<Client[]>({
-        queryKey: ['clients'],
-        queryFn: () => api.get<Client[]>('/clients').then(r => r.data),
+    const [query, setQuery] = useState('');
+
+    // Search runs server-side over every client, not just the loaded pages
+    useEffect(() => {
+        const t = setTimeout(() => setQuery(search.trim()), 300);
+        return () => clearTimeout(t);
+    }, [search]);
+
+    const { data, isLoading, isError, refetch, hasNextPage, fetchNextPage, isFetchingNextPage } = useInfiniteQuery({
+        // A new search term is a new query key, so paging restarts at offset 0
+        queryKey: ['clients', query],
+        queryFn: ({ pageParam }) => listClients(pageParam, query),
+        initialPageParam: 0,
+        getNextPageParam: last => last.nextOffset,
+        placeholderData: keepPreviousData,
         refetchOnWindowFocus: true,
     });
 
-    const all = clients ?? [];
-
-    const filtered = useMemo(() => {
-        const q = search.trim().toLowerCase();
-        if (!q) return all;
-        return all.filter(c =>
-            [c.brand_name, c.industry, c.target_country]
-                .filter(Boolean).join(' ').toLowerCase().includes(q)
-        );
-    }, [all, search]);
+    const all = useMemo<Client[]>(() => data?.pages.flatMap(p => p.clients) ?? [], [data]);
+    const total = data?.pages[data.pages.length - 1].total ?? all.length;
+    const searching = query !== '';
 
     const totalCampaigns = all.reduce((sum, c) => sum + c.campaign_count, 0);
 
@@ -63,11 +67,11 @@ export default function ClientsDashboard({ onNewClient, onViewClient }: ClientsD
                 </div>
 
                 {/* Stats strip */}
-                {!isLoading && !isError && all.length > 0 && (
+                {!isLoading && !isError && !searching && all.length > 0 && (
                     <div className="grid grid-cols-3 gap-4 mb-6">
                         {[
-                            { label: 'Clients', value: all.length },
-                            { label: 'Total Campaigns', value: totalCampaigns },
+                            { label: 'Clients', value: total },
+                            { label: 'Total Campaigns', value: hasNextPage ? `${totalCampaigns}+` : totalCampaigns },
                             { label: 'Industries', value: new Set(all.map(c => c.industry)).size },
                         ].map(s => (
                             <div key={s.label} className="bg-white border border-[#E7E5E4] rounded-xl px-6 py-5">
@@ -78,8 +82,8 @@ export default function ClientsDashboard({ onNewClient, onViewClient }: ClientsD
                     </div>
                 )}
 
-                {/* Search */}
-                {!isLoading && !isError && all.length > 0 && (
+                {/* Search — stays visible while a search has no matches */}
+                {!isLoading && !isError && (all.length > 0 || searching || search !== '') && (
                     <div className="bg-white border border-[#E7E5E4] rounded-xl p-4 mb-4">
                         <div className="relative">
                             <Search size={14} className="absolute left-3 top-1/2 -translate-y-1/2 text-[#A8A29E] pointer-events-none" />
@@ -87,7 +91,7 @@ export default function ClientsDashboard({ onNewClient, onViewClient }: ClientsD
                                 type="text"
                                 value={search}
                                 onChange={e => setSearch(e.target.value)}
-                                placeholder="Search by brand name, industry, or country…"
+                                placeholder="Search by brand name…"
                                 className="w-full pl-9 pr-8 py-2 text-sm bg-[#F5F5F5] border border-[#E7E5E4] rounded-lg outline-none focus:border-[#1E3A5F] transition-colors"
                             />
                             {search && (
@@ -132,7 +136,7 @@ export default function ClientsDashboard({ onNewClient, onViewClient }: ClientsD
                 )}
 
                 {/* Empty state */}
-                {!isLoading && !isError && all.length === 0 && (
+                {!isLoading && !isError && !searching && all.length === 0 && (
                     <div className="bg-white border border-[#E7E5E4] rounded-xl p-16 text-center">
                         <div className="w-14 h-14 rounded-2xl bg-stone-100 flex items-center justify-center mx-auto mb-4">
                             <BarChart3 size={28} className="text-stone-400" />
@@ -148,8 +152,8 @@ export default function ClientsDashboard({ onNewClient, onViewClient }: ClientsD
                     </div>
                 )}
 
-                {/* No filter results */}
-                {!isLoading && !isError && all.length > 0 && filtered.length === 0 && (
+                {/* No search results */}
+                {!isLoading && !isError && searching && all.length === 0 && (
                     <div className="bg-white border border-[#E7E5E4] rounded-xl p-12 text-center">
                         <Search size={24} className="mx-auto text-stone-300 mb-3" />
                         <p className="text-[#78716C] text-sm">No clients match your search.</p>
@@ -157,7 +161,7 @@ export default function ClientsDashboard({ onNewClient, onViewClient }: ClientsD
                 )}
 
                 {/* Table */}
-                {!isLoading && !isError && filtered.length > 0 && (
+                {!isLoading && !isError && all.length > 0 && (
                     <div className="bg-white border border-[#E7E5E4] rounded-xl overflow-hidden">
                         {/* Header */}
                         <div className="px-5 py-3 border-b border-[#F0EDEB] grid grid-cols-[1fr_130px_100px_90px_36px] gap-4 items-center">
@@ -167,11 +171,11 @@ export default function ClientsDashboard({ onNewClient, onViewClient }: ClientsD
                         </div>
 
                         {/* Rows */}
-                        {filtered.map((client, idx) => (
+                        {all.map((client, idx) => (
                             <button
                                 key={client.id}
                                 onClick={() => onViewClient(client.id)}
-                                className={`w-full text-left px-5 py-4 grid grid-cols-[1fr_130px_100px_90px_36px] gap-4 items-center hover:bg-[#F5F4F2] transition-colors ${idx < filtered.length - 1 ? 'border-b border-[#F0EDEB]' : ''}`}
+                                className={`w-full text-left px-5 py-4 grid grid-cols-[1fr_130px_100px_90px_36px] gap-4 items-center hover:bg-[#F5F4F2] transition-colors ${idx < all.length - 1 ? 'border-b border-[#F0EDEB]' : ''}`}
                             >
                                 {/* Brand */}
                                 <div className="flex items-center gap-3 min-w-0">
@@ -212,6 +216,20 @@ export default function ClientsDashboard({ onNewClient, onViewClient }: ClientsD
                         ))}
                     </div>
                 )}
+
+                {/* Clients past the first page are fetched on demand */}
+                {!isLoading && !isError && hasNextPage && (
+                    <div className="mt-4 text-center">
+                        <button
+                            onClick={() => fetchNextPage()}
+                            disabled={isFetchingNextPage}
+                            className="text-sm font-medium text-[#1E3A5F] hover:underline disabled:opacity-50 inline-flex items-center gap-1.5"
+                        >
+                            {isFetchingNextPage && <Loader2 size={14} className="animate-spin" />}
+                            Load more clients ({all.length} of {total})
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );
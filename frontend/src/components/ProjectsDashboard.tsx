@@ -1,11 +1,10 @@
 import { useState, useMemo } from 'react';
-import { useQuery } from '@tanstack/react-query';
 import {
     Building2, Clock, Plus, Loader2, AlertCircle,
     CheckCircle2, XCircle, ChevronRight, BarChart3, Activity,
     CalendarDays, ChevronDown, Search, Pencil, Target,
 } from 'lucide-react';
-import api from '../lib/api';
+import { useJobList } from '../lib/useJobList';
 
 interface JobEntry {
     job_id: string;
@@ -195,14 +194,9 @@ export default function ProjectsDashboard({ onNewProject, onViewJob, onEditJob }
     const [dateRange, setDateRange] = useState<DateRange>('all');
     const [search, setSearch]       = useState<string>('');
 
-    const { data: jobs, isLoading, isError, refetch } = useQuery<JobEntry[]>({
-        queryKey: ['jobs'],
-        queryFn: () => api.get<JobEntry[]>('/jobs').then(r => r.data),
-        refetchInterval: 15_000,
-        refetchOnWindowFocus: true,
-    });
+    const { jobs: all, isLoading, isError, refetch, hasMore, loadMore, isLoadingMore } =
+        useJobList<JobEntry>(['jobs']);
 
-    const all       = jobs ?? [];
     const completed = all.filter(j => j.status === 'completed');
     const active    = all.filter(j => ['researching', 'analyzing', 'approved', 'pending'].includes(j.status));
 
@@ -249,7 +243,7 @@ export default function ProjectsDashboard({ onNewProject, onViewJob, onEditJob }
                 {!isLoading && !isError && all.length > 0 && (
                     <div className="grid grid-cols-3 gap-4 mb-6">
                         {[
-                            { label: 'Total',     value: all.length },
+                            { label: 'Total',     value: hasMore ? `${all.length}+` : all.length },
                             { label: 'Completed', value: completed.length },
                             { label: 'Active',    value: active.length },
                         ].map(s => (
@@ -400,6 +394,20 @@ export default function ProjectsDashboard({ onNewProject, onViewJob, onEditJob }
                         ))}
                     </div>
                 )}
+
+                {/* Older projects are fetched a page at a time */}
+                {!isLoading && !isError && hasMore && (
+                    <div className="mt-4 text-center">
+                        <button
+                            onClick={() => loadMore()}
+                            disabled={isLoadingMore}
+                            className="text-sm font-medium text-[#1E3A5F] hover:underline disabled:opacity-50 inline-flex items-center gap-1.5"
+                        >
+                            {isLoadingMore && <Loader2 size={14} className="animate-spin" />}
+                            Load older projects
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );
@@ -47,13 +47,25 @@ const ResultsView: React.FC<ResultsViewProps> = ({ jobId }) => {
     const handleDownload = async () => {
         setDownloading(true);
         try {
-            const res = await api.get(`/jobs/${jobId}/download`, { responseType: 'blob' });
-            const url = URL.createObjectURL(res.data);
+            // Presigned storage URL — the file downloads straight from storage. Servers
+            // without a public storage endpoint send the file itself instead.
+            const res = await api.get<Blob>(`/jobs/${jobId}/download`, {
+                params: { mode: 'url' },
+                responseType: 'blob',
+            });
             const a = document.createElement('a');
-            a.href = url;
-            a.download = `marketing_strategy_${jobId}.pptx`;
-            a.click();
-            URL.revokeObjectURL(url);
+            if (String(res.headers['content-type']).includes('application/json')) {
+                const { url, filename } = JSON.parse(await res.data.text()) as { url: string; filename: string };
+                a.href = url;
+                a.download = filename;
+                a.click();
+            } else {
+                const href = URL.createObjectURL(res.data);
+                a.href = href;
+                a.download = `marketing_strategy_${jobId}.pptx`;
+                a.click();
+                setTimeout(() => URL.revokeObjectURL(href), 0);
+            }
         } catch (err) {
             console.error('Download failed', err);
         } finally {
@@ -17,5 +17,44 @@ api.interceptors.request.use((config) => {
 export const authGoogle = (credential: string) =>
     api.post<{ access_token: string; user: import('../types').UserResponse }>('/auth/google', { credential });
 
+export interface JobPage<T = import('../types').JobEntry> {
+    jobs: T[];
+    nextCursor?: string;
+}
+
+/**
+ * Fetches one page of the job list (server default page size). Pass the previous
+ * page's `nextCursor` (from the X-Next-Cursor header) to load the next one.
+ */
+export async function listJobs<T = import('../types').JobEntry>(
+    params: Record<string, string> = {},
+    cursor?: string,
+): Promise<JobPage<T>> {
+    const res = await api.get<T[]>('/jobs', {
+        params: { ...params, ...(cursor ? { cursor } : {}) },
+    });
+    return { jobs: res.data, nextCursor: res.headers['x-next-cursor'] || undefined };
+}
+
+export interface ClientPage {
+    clients: import('../types').Client[];
+    total: number;
+    nextOffset?: number;
+}
+
+/**
+ * Fetches one page of clients, optionally filtered server-side by brand name (`q`);
+ * `nextOffset` (X-Next-Offset) is set while more remain.
+ */
+export async function listClients(offset = 0, q = ''): Promise<ClientPage> {
+    const res = await api.get<import('../types').Client[]>('/clients', { params: { offset, ...(q ? { q } : {}) } });
+    const next = res.headers['x-next-offset'];
+    return {
+        clients: res.data,
+        total: Number(res.headers['x-total-count'] ?? res.data.length),
+        nextOffset: next ? Number(next) : undefined,
+    };
+}
+
 export { TOKEN_KEY };
 export default api;
@@ -0,0 +1,31 @@
+import { useMemo } from 'react';
+import { useInfiniteQuery } from '@tanstack/react-query';
+import { listJobs } from './api';
+import type { JobEntry } from '../types';
+
+/**
+ * Paged job list: loads the first page only and more on `loadMore()`.
+ * Polling refetches just the pages already on screen, never the whole history.
+ */
+export function useJobList<T = JobEntry>(queryKey: unknown[], params: Record<string, string> = {}) {
+    const query = useInfiniteQuery({
+        queryKey,
+        queryFn: ({ pageParam }) => listJobs<T>(params, pageParam),
+        initialPageParam: undefined as string | undefined,
+        getNextPageParam: last => last.nextCursor,
+        refetchInterval: 15_000,
+        refetchOnWindowFocus: true,
+    });
+
+    const jobs = useMemo<T[]>(() => query.data?.pages.flatMap(p => p.jobs) ?? [], [query.data]);
+
+    return {
+        jobs,
+        isLoading: query.isLoading,
+        isError: query.isError,
+        refetch: query.refetch,
+        hasMore: query.hasNextPage,
+        loadMore: () => query.fetchNextPage(),
+        isLoadingMore: query.isFetchingNextPage,
+    };
+}
@@ -0,0 +1,78 @@
+"""
+Benchmarks bcrypt cost factors and shows that a login burst on the auth hash pool
+leaves the default threadpool (which serves sync endpoints) responsive.
+
+    python scripts/bench_auth_hashing.py [--rounds 10 11 12 13] [--burst 50]
+
+Pick the highest BCRYPT_ROUNDS whose verify time fits your login latency budget
+(~100-300 ms is typical).
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.services import auth_service
+
+
+def bench_rounds(rounds: int, samples: int = 5) -> tuple:
+    ctx = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=rounds)
+    hashed = ctx.hash("correct horse battery staple")
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        ctx.verify("correct horse battery staple", hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+async def bench_burst(burst: int) -> None:
+    hashed = auth_service.hash_password("correct horse battery staple")
+
+    async def status_reads():
+        # Stand-in for sync endpoints: tiny jobs on the default threadpool
+        latencies = []
+        for _ in range(20):
+            start = time.perf_counter()
+            await asyncio.to_thread(lambda: None)
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+        return latencies
+
+    start = time.perf_counter()
+    logins = asyncio.gather(*(
+        auth_service.verify_password_async("correct horse battery staple", hashed) for _ in range(burst)
+    ))
+    reads, _ = await asyncio.gather(status_reads(), logins)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{burst} concurrent logins at cost {settings.BCRYPT_ROUNDS} "
+          f"on {settings.AUTH_HASH_WORKERS} hash thread(s): {elapsed:.2f}s "
+          f"({burst / elapsed:.1f} logins/s)")
+    print(f"Default-threadpool latency during burst: median {statistics.median(reads):.2f} ms, "
+          f"max {max(reads):.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bcrypt cost and the auth hash pool.")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--burst", type=int, default=50)
+    args = parser.parse_args()
+
+    print("rounds  verify median (ms)  verify max (ms)")
+    for rounds in args.rounds:
+        median, worst = bench_rounds(rounds)
+        print(f"{rounds:>6}  {median:>18.1f}  {worst:>15.1f}")
+
+    asyncio.run(bench_burst(args.burst))
+
+
+if __name__ == "__main__":
+    main()
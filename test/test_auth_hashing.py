@@ -0,0 +1,82 @@
+"""
+Tests password hashing on the dedicated auth pool and cost-change detection.
+"""
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from passlib.context import CryptContext
+
+from app.db.models import User
+from app.services.auth_service import authenticate_user, hash_password_async, pwd_context, verify_password_async
+
+
+def test_async_hash_and_rehash_detection():
+    print("--- Testing pooled bcrypt hashing and rehash detection ---")
+
+    async def run():
+        hashed = await hash_password_async("s3cret-pass")
+        assert await verify_password_async("s3cret-pass", hashed)
+        assert not await verify_password_async("wrong", hashed)
+        return hashed
+
+    hashed = asyncio.run(run())
+    assert not pwd_context.needs_update(hashed), "Fresh hash should match BCRYPT_ROUNDS"
+
+    cheaper = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4).hash("s3cret-pass")
+    assert pwd_context.needs_update(cheaper), "Hash at another cost should be flagged for rehash"
+    print("✓ SUCCESS")
+
+
+class _RecordingSession:
+    """Just enough of a Session for authenticate_user; records which thread touches it."""
+
+    def __init__(self, user):
+        self.user, self.threads, self.commits = user, [], 0
+
+    def query(self, *_):
+        self.threads.append(threading.get_ident())
+        return self
+
+    def filter(self, *_):
+        return self
+
+    def first(self):
+        return self.user
+
+    def add(self, _):
+        self.threads.append(threading.get_ident())
+
+    def commit(self):
+        self.threads.append(threading.get_ident())
+        self.commits += 1
+
+    def refresh(self, _):
+        self.threads.append(threading.get_ident())
+
+
+def test_login_rehashes_off_the_event_loop():
+    print("--- Testing login DB work stays off the event loop ---")
+    cheaper = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4).hash("s3cret-pass")
+    user = User(email="ada@example.com", hashed_password=cheaper, is_active=True)
+    db = _RecordingSession(user)
+
+    async def run():
+        return await authenticate_user(db, "ada@example.com", "s3cret-pass"), threading.get_ident()
+
+    result, loop_thread = asyncio.run(run())
+    assert result is user
+    assert db.commits == 1 and not pwd_context.needs_update(user.hashed_password), "Old-cost hash should be upgraded"
+    assert db.threads and loop_thread not in db.threads, "Session calls must not run on the event loop"
+
+    assert asyncio.run(authenticate_user(_RecordingSession(user), "ada@example.com", "wrong")) is None
+    print("✓ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_async_hash_and_rehash_detection()
+    test_login_rehashes_off_the_event_loop()
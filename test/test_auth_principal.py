@@ -0,0 +1,72 @@
+"""
+Tests the cached principal fast path: repeated requests skip the DB, and an
+admin-side invalidation evicts the cached entry.
+"""
+import asyncio
+import sys
+import uuid
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services import auth_service
+from app.services.auth_service import Principal, create_access_token, get_current_principal
+from app.services.job_events import job_events
+
+
+def test_principal_cached_and_invalidated():
+    print("--- Testing cached principal lookup and invalidation ---")
+    user_id = uuid.uuid4()
+    token = create_access_token({"sub": str(user_id), "email": "a@b.c", "is_admin": False})
+    loads = []
+
+    def fake_load(uid):
+        loads.append(uid)
+        return Principal(id=user_id, email="a@b.c", is_admin=False, is_active=True)
+
+    original_load, auth_service._load_principal = auth_service._load_principal, fake_load
+    previous_backend, settings.JOB_EVENTS_BACKEND = settings.JOB_EVENTS_BACKEND, "memory"
+    try:
+        assert get_current_principal(token).id == user_id
+        assert get_current_principal(token).id == user_id
+        assert len(loads) == 1, f"Expected one DB load, got {len(loads)}"
+
+        auth_service.invalidate_principal(user_id)
+        get_current_principal(token)
+        assert len(loads) == 2, "Invalidation should force a reload"
+    finally:
+        auth_service._load_principal = original_load
+        settings.JOB_EVENTS_BACKEND = previous_backend
+        auth_service._principal_cache.clear()
+    print("✓ SUCCESS")
+
+
+def test_invalidation_does_not_reach_job_subscribers():
+    print("--- Testing that invalidation is not a job event ---")
+    user_id = uuid.uuid4()
+    previous_backend, settings.JOB_EVENTS_BACKEND = settings.JOB_EVENTS_BACKEND, "memory"
+
+    async def run():
+        queue = job_events.subscribe(str(user_id))
+        try:
+            auth_service._principal_cache.set(str(user_id), "cached")
+            auth_service.invalidate_principal(user_id)
+            await asyncio.sleep(0)
+            return queue.qsize()
+        finally:
+            job_events.unsubscribe(str(user_id), queue)
+
+    try:
+        assert asyncio.run(run()) == 0, "SSE subscribers must not see auth signals"
+        assert auth_service._principal_cache.get(str(user_id)) is None
+    finally:
+        settings.JOB_EVENTS_BACKEND = previous_backend
+        auth_service._principal_cache.clear()
+    print("✓ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_principal_cached_and_invalidated()
+    test_invalidation_does_not_reach_job_subscribers()
@@ -0,0 +1,48 @@
+"""
+Tests token-budgeted packing: output stays valid JSON, respects the budget and
+keeps every source instead of dropping the ones that serialise last.
+"""
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.context_packer import CHARS_PER_TOKEN, fit_json, pack_research, trim_text
+
+mock_research = {
+    "perplexity_research": {"market_trends": "Demand for recycled fabrics is growing. " * 150},
+    "gemini_research": {"competitors": [{"name": f"Brand {i}", "notes": "Strong on TikTok. " * 20} for i in range(20)]},
+    "brand_audit": {"tone_of_voice": "Playful", "brand_maturity": "Emerging"},
+    "news_research": {"headlines": ["EcoFit raises seed round."] * 5},
+    "summary": {"data_sources": ["perplexity", "gemini", "news"]},
+}
+
+
+def test_pack_research_within_budget():
+    print("--- Testing research packing ---")
+    packed = pack_research(mock_research, budget_tokens=1000)
+    assert len(packed) <= 1000 * CHARS_PER_TOKEN, f"Packed {len(packed)} chars, over budget"
+
+    names = []
+    for section in packed.split("\n\n"):
+        header, body = section.split("\n", 1)
+        names.append(header.removeprefix("## "))
+        json.loads(body)  # every section must stay valid JSON
+    assert set(names) == set(mock_research), f"Sources missing from packed context: {names}"
+    assert "Playful" in packed, "Small sources should be kept whole"
+    print("✓ SUCCESS")
+
+
+def test_trim_at_sentence_boundary():
+    print("--- Testing sentence-boundary trimming ---")
+    trimmed = trim_text("First sentence here. Second one is much longer and gets cut.", 36)
+    assert trimmed == "First sentence here.…", trimmed
+    assert json.loads(fit_json({"k": "word " * 1000}, 50))["k"].endswith("…")
+    print("✓ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_pack_research_within_budget()
+    test_trim_at_sentence_boundary()
@@ -0,0 +1,123 @@
+"""
+Tests the async Gemini validation / channel recommendation and their TTL caches
+(the LLM client is replaced by a scripted fake, no API calls needed).
+"""
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.cache import TTLCache
+from app.schemas.questionnaire import QuestionnaireRequest
+from app.services import gemini_service
+
+
+class ScriptedGemini:
+    """Returns (or raises) the queued replies in order and keeps every prompt."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    async def gemini_generate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+def _with_fake_gemini(*replies):
+    def decorate(test):
+        def wrapper():
+            saved = gemini_service.llm_client
+            gemini_service.llm_client = ScriptedGemini(*replies)
+            gemini_service._channel_cache.clear()
+            gemini_service._validation_cache.clear()
+            try:
+                test(gemini_service.llm_client)
+            finally:
+                gemini_service.llm_client = saved
+                gemini_service._channel_cache.clear()
+                gemini_service._validation_cache.clear()
+        wrapper.__name__ = test.__name__
+        return wrapper
+    return decorate
+
+
+QUESTIONNAIRE = QuestionnaireRequest(
+    project_metadata={"brand_name": "EcoFit", "website_url": "https://ecofit-example.com",
+                      "target_country": "USA", "industry": "Fitness Apparel"},
+    product_definition={"product_description": "Activewear from recycled ocean plastic.",
+                        "core_problem_solved": "Performance gear that doesn't harm the planet.",
+                        "unique_selling_proposition": "Lifetime durability guarantee."},
+    target_audience={"demographics": "Women 25-40", "psychographics": "Eco-conscious",
+                     "cultural_nuances": "Values authenticity."},
+    market_context={"main_competitors": ["Patagonia"], "current_marketing_efforts": "Instagram",
+                    "known_customer_objections": "Price"},
+    the_creative_goal={"primary_objective": "Awareness", "desired_tone_of_voice": "Bold",
+                       "specific_channels": []},
+)
+VALID = json.dumps({"valid": True, "feedback": []})
+CHANNEL_ARGS = ("Awareness", "Bold", "Fitness Apparel", "Women 25-40", "Eco-conscious")
+
+
+@_with_fake_gemini(RuntimeError("quota"), VALID)
+def test_validation_caches_success_but_not_errors(gemini):
+    print("--- Testing the validation cache ---")
+    first = asyncio.run(gemini_service.validate_questionnaire(QUESTIONNAIRE))
+    assert first["valid"] is False, "An API error falls back to invalid"
+    assert asyncio.run(gemini_service.validate_questionnaire(QUESTIONNAIRE))["valid"] is True
+    assert asyncio.run(gemini_service.validate_questionnaire(QUESTIONNAIRE))["valid"] is True
+    assert len(gemini.prompts) == 2, "The error is retried, the success is served from the cache"
+    print("✓ SUCCESS")
+
+
+@_with_fake_gemini(VALID)
+def test_validation_excludes_unset_channels(gemini):
+    print("--- Testing that AI-filled channels are left out of validation ---")
+    asyncio.run(gemini_service.validate_questionnaire(
+        QUESTIONNAIRE, exclude={"the_creative_goal": {"specific_channels"}},
+    ))
+    assert "specific_channels" not in gemini.prompts[0]
+    assert "desired_tone_of_voice" in gemini.prompts[0]
+    print("✓ SUCCESS")
+
+
+@_with_fake_gemini("not json", '["TikTok", "Instagram"]')
+def test_channels_cache_success_but_not_fallback(gemini):
+    print("--- Testing the channel recommendation cache ---")
+    assert asyncio.run(gemini_service.recommend_channels(*CHANNEL_ARGS)) == ["Instagram", "LinkedIn", "YouTube"]
+    assert asyncio.run(gemini_service.recommend_channels(*CHANNEL_ARGS)) == ["TikTok", "Instagram"]
+    assert asyncio.run(gemini_service.recommend_channels(*CHANNEL_ARGS)) == ["TikTok", "Instagram"]
+    assert len(gemini.prompts) == 2
+    print("✓ SUCCESS")
+
+
+def test_ttl_cache_expiry_and_lru():
+    print("--- Testing TTLCache ---")
+    cache = TTLCache(ttl=0.05, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None, "Least recently used entry is evicted"
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None, "Entries expire after the TTL"
+
+    disabled = TTLCache(ttl=0)
+    disabled.set("a", 1)
+    assert disabled.get("a") is None
+    print("✓ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_validation_caches_success_but_not_errors()
+    test_validation_excludes_unset_channels()
+    test_channels_cache_success_but_not_fallback()
+    test_ttl_cache_expiry_and_lru()
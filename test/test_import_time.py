@@ -0,0 +1,53 @@
+"""
+Guards API cold-start: importing app.main must not pull in the provider SDKs or
+touch MinIO, and must stay within an import-time budget.
+
+Budget (seconds) is IMPORT_TIME_BUDGET, default 2.0 — FastAPI + SQLAlchemy alone
+account for most of it on a slow CI box.
+"""
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+HEAVY_MODULES = ("boto3", "google.generativeai", "openai", "pptx", "praw")
+
+
+def _import_app(code: str):
+    # Fresh interpreter: the test runner may already have imported these modules.
+    # An unroutable MinIO endpoint proves nothing connects at import time.
+    env = {**os.environ, "MINIO_ENDPOINT": "127.0.0.1:1"}
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+
+
+def test_no_heavy_sdks_on_import():
+    print("--- Testing that app.main imports no provider SDKs ---")
+    proc = _import_app(f"import sys, app.main; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])")
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    loaded = proc.stdout.strip().splitlines()[-1]
+    assert loaded == "[]", f"Heavy SDKs imported by app.main: {loaded}"
+    print("✓ SUCCESS")
+
+
+def test_import_time_budget():
+    print("--- Testing app.main import-time budget ---")
+    budget = float(os.environ.get("IMPORT_TIME_BUDGET", "2.0"))
+    proc = _import_app("import app.main")
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    match = re.search(r"\|\s*(\d+)\s*\|\s*app\.main\s*$", proc.stderr, re.MULTILINE)
+    assert match, "app.main missing from -X importtime output"
+    seconds = int(match.group(1)) / 1e6
+    print(f"app.main imported in {seconds:.3f}s (budget {budget}s)")
+    assert seconds < budget, f"app.main import took {seconds:.3f}s, budget is {budget}s"
+    print("✓ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_no_heavy_sdks_on_import()
+    test_import_time_budget()
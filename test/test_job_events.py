@@ -0,0 +1,92 @@
+"""
+Tests for job progress pub/sub using the in-memory backend (no Postgres needed).
+"""
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.job_events import CHANNEL, SIGNAL_CHANNEL, JobEventBus
+
+
+def test_events_reach_only_matching_subscribers():
+    print("--- Testing in-memory job event fan-out ---")
+    previous, settings.JOB_EVENTS_BACKEND = settings.JOB_EVENTS_BACKEND, "memory"
+    bus = JobEventBus()
+
+    async def run():
+        mine = bus.subscribe("job-1")
+        other = bus.subscribe("job-2")
+        await bus.publish("job-1", "research.source", {"source": "gemini", "ok": True})
+        await bus.publish("job-1", "completed")
+        await asyncio.sleep(0)  # let call_soon_threadsafe deliveries run
+
+        first = await asyncio.wait_for(mine.get(), timeout=1)
+        second = await asyncio.wait_for(mine.get(), timeout=1)
+        assert first["event"] == "research.source" and first["data"]["source"] == "gemini"
+        assert second["event"] == "completed"
+        assert other.empty(), "Events must not leak to other jobs"
+
+        bus.unsubscribe("job-1", mine)
+        await bus.publish("job-1", "failed")
+        await asyncio.sleep(0)
+        assert mine.empty(), "Unsubscribed queues receive nothing"
+
+    try:
+        asyncio.run(run())
+    finally:
+        settings.JOB_EVENTS_BACKEND = previous
+    print("✓ SUCCESS")
+
+
+class _ListenConn:
+    """Stands in for the LISTEN connection: `poll()` is a no-op, notifies are queued up front."""
+
+    def __init__(self, *notifies):
+        self.notifies = list(notifies)
+
+    def poll(self):
+        pass
+
+
+def test_listener_routes_by_channel_and_warns_only_on_bad_payloads():
+    print("--- Testing the NOTIFY listener ---")
+    bus = JobEventBus()
+    signals = []
+    bus.add_hook("cache.evict", signals.append)
+
+    async def run():
+        queue = bus.subscribe("job-1")
+        bus._listen_conn = _ListenConn(
+            SimpleNamespace(channel=CHANNEL, payload=json.dumps({"job_id": "job-1", "event": "completed"})),
+            SimpleNamespace(channel=SIGNAL_CHANNEL, payload=json.dumps({"signal": "cache.evict", "data": {"key": "k"}})),
+            SimpleNamespace(channel=CHANNEL, payload="{not json"),
+        )
+        bus._on_readable()
+        await asyncio.sleep(0)
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    warnings = []
+    handler = logging.Handler(level=logging.WARNING)
+    handler.emit = lambda record: warnings.append(record.getMessage())
+    logger = logging.getLogger("app.services.job_events")
+    logger.addHandler(handler)
+    try:
+        delivered = asyncio.run(run())
+    finally:
+        logger.removeHandler(handler)
+    assert [m["event"] for m in delivered] == ["completed"]
+    assert signals == [{"key": "k"}], "Signals reach hooks, not job subscribers"
+    assert warnings == ["Ignoring malformed job event payload"], warnings
+    print("✓ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_events_reach_only_matching_subscribers()
+    test_listener_routes_by_channel_and_warns_only_on_bad_payloads()
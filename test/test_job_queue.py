@@ -0,0 +1,178 @@
+"""
+Tests for the durable job queue using the in-memory backend (no Postgres needed).
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.models import JobStatus, QueueStatus
+from app.services import workflow
+from app.services.job_queue import InMemoryJobQueue
+from app.worker import Worker
+
+
+def test_claim_heartbeat_complete():
+    print("--- Testing claim → heartbeat → complete ---")
+    queue = InMemoryJobQueue()
+    task_id = queue.enqueue("job-1", "research_workflow", {"request_data": {"a": 1}})
+
+    task = queue.claim("worker-a")
+    assert task is not None and task.id == task_id
+    assert task.attempts == 1
+    assert queue.claim("worker-b") is None, "A running task must not be claimed twice"
+
+    assert queue.heartbeat(task_id, "worker-a")
+    assert not queue.heartbeat(task_id, "worker-b"), "Only the owner may heartbeat"
+
+    queue.complete(task_id)
+    assert queue.status_of(task_id) == QueueStatus.DONE
+    assert not queue.has_pending("job-1")
+    assert queue.last_payload("job-1") == {"request_data": {"a": 1}}
+    assert queue.last_payload("job-unknown") is None
+    print("✓ SUCCESS")
+
+
+def test_stalled_task_is_requeued_then_abandoned():
+    print("--- Testing stalled task requeue ---")
+    queue = InMemoryJobQueue()
+    task_id = queue.enqueue("job-2", "research_workflow", {})
+
+    for attempt in range(1, 4):
+        task = queue.claim("dead-worker")
+        assert task is not None and task.attempts == attempt
+        time.sleep(0.01)
+        abandoned = queue.requeue_stalled(stall_timeout=0)
+        if attempt < task.max_attempts:
+            assert abandoned == []
+            assert queue.status_of(task_id) == QueueStatus.QUEUED
+            assert not queue.heartbeat(task_id, "dead-worker"), "Requeued task lease must be revoked"
+
+    assert [t.id for t in abandoned] == [task_id]
+    assert queue.status_of(task_id) == QueueStatus.FAILED
+    print("✓ SUCCESS")
+
+
+def test_worker_runs_handler():
+    print("--- Testing Worker loop with a stub handler ---")
+    queue = InMemoryJobQueue()
+    calls = []
+
+    async def handler(job_id, request_data, attempt, max_attempts):
+        calls.append((job_id, request_data))
+
+    async def run():
+        worker = Worker(queue=queue, concurrency=2, worker_id="test-worker")
+        worker._handlers = {"research_workflow": handler}
+        task_id = queue.enqueue("job-3", "research_workflow", {"request_data": {"brand": "EcoFit"}})
+        loop_task = asyncio.create_task(worker.run())
+        for _ in range(50):
+            if queue.status_of(task_id) == QueueStatus.DONE:
+                break
+            await asyncio.sleep(0.02)
+        worker.stop()
+        await loop_task
+        return task_id
+
+    task_id = asyncio.run(run())
+    assert calls == [("job-3", {"brand": "EcoFit"})]
+    assert queue.status_of(task_id) == QueueStatus.DONE
+    print("✓ SUCCESS")
+
+
+def test_failing_handler_is_retried_then_failed():
+    print("--- Testing retries of a failing handler ---")
+    queue = InMemoryJobQueue()
+    calls = []
+
+    async def flaky(job_id, request_data, attempt, max_attempts, resume=False):
+        calls.append((resume, attempt, max_attempts))
+        if len(calls) < 2:
+            raise RuntimeError("provider down")
+
+    async def always_fails(job_id, request_data, attempt, max_attempts, resume=False):
+        raise RuntimeError("still down")
+
+    def run_next(worker):
+        task = queue.claim(worker.worker_id)
+        asyncio.run(worker._execute(task))
+        for entry in queue._entries.values():
+            entry.run_after = datetime.utcnow()  # skip the retry backoff
+        return task
+
+    worker = Worker(queue=queue, worker_id="test-worker")
+    worker._handlers = {"research_workflow": flaky}
+    task_id = queue.enqueue("job-4", "research_workflow", {"request_data": {}})
+    run_next(worker)
+    assert queue.status_of(task_id) == QueueStatus.QUEUED, "A failed attempt must be requeued"
+    assert queue.has_pending("job-4"), "A job waiting out its retry backoff is still pending"
+    run_next(worker)
+    assert queue.status_of(task_id) == QueueStatus.DONE
+    assert calls == [(False, 1, 3), (True, 2, 3)], "Retries resume from the last checkpoint"
+
+    worker._handlers = {"research_workflow": always_fails}
+    task_id = queue.enqueue("job-5", "research_workflow", {"request_data": {}})
+    for _ in range(3):
+        task = run_next(worker)
+    assert task.attempts == task.max_attempts
+    assert queue.status_of(task_id) == QueueStatus.FAILED, "Exhausted attempts must fail the entry"
+    print("✓ SUCCESS")
+
+
+class _Session:
+    def __init__(self, job):
+        self.job, self.commits = job, 0
+
+    def query(self, model):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        return self.job
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_only_the_last_attempt_fails_the_job():
+    print("--- Testing retrying vs failed job events ---")
+    job = SimpleNamespace(status=JobStatus.ANALYZING, failed_step=None, error_message=None)
+    db = _Session(job)
+    events = []
+
+    async def publish(job_id, event, data=None):
+        events.append((event, data))
+
+    saved = workflow.job_events
+    workflow.job_events = SimpleNamespace(publish=publish)
+    try:
+        error = RuntimeError("provider down")
+        asyncio.run(workflow._report_failure(db, "job-6", "consensus", error, "provider down", 1, 3))
+        assert job.status == JobStatus.ANALYZING and db.commits == 0, "A retried job is not marked failed"
+        (event, data), = events
+        assert event == "retrying"
+        assert data["attempt"] == 1 and data["max_attempts"] == 3 and data["step"] == "consensus"
+        assert datetime.fromisoformat(data["next_run_at"].rstrip("Z")) > datetime.utcnow()
+
+        events.clear()
+        asyncio.run(workflow._report_failure(db, "job-6", "consensus", error, "provider down", 3, 3))
+        assert job.status == JobStatus.FAILED and job.failed_step == "consensus"
+        assert events == [("failed", {"step": "consensus", "error": "provider down"})]
+    finally:
+        workflow.job_events = saved
+    print("✓ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_claim_heartbeat_complete()
+    test_stalled_task_is_requeued_then_abandoned()
+    test_worker_runs_handler()
+    test_failing_handler_is_retried_then_failed()
+    test_only_the_last_attempt_fails_the_job()
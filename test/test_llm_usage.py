@@ -0,0 +1,90 @@
+"""
+Tests per-job LLM token accounting: concurrent jobs are tallied separately and the
+totals land in the job's metadata, summed across retries (no API calls or DB needed).
+"""
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.llm_client import LLMClient
+from app.services.workflow import _save_usage
+
+
+def test_usage_is_tracked_per_task():
+    print("--- Testing per-job usage tallies ---")
+    client = LLMClient()
+
+    async def job(prompt_tokens, cached_tokens):
+        usage = client.track_usage()
+
+        async def model_call():  # spawned tasks count towards the job that started them
+            client._record_usage("openai", "gpt-4o", prompt_tokens, cached_tokens)
+
+        await asyncio.gather(model_call(), model_call())
+        await asyncio.sleep(0)
+        client._record_usage("gemini", "gemini-2.0-flash", prompt_tokens, None)
+        return usage
+
+    async def run():
+        return await asyncio.gather(job(1000, 800), job(50, 0))
+
+    first, second = asyncio.run(run())
+    assert first == {
+        "openai/gpt-4o": {"calls": 2, "prompt_tokens": 2000, "cached_tokens": 1600},
+        "gemini/gemini-2.0-flash": {"calls": 1, "prompt_tokens": 1000, "cached_tokens": 0},
+    }
+    assert second["openai/gpt-4o"] == {"calls": 2, "prompt_tokens": 100, "cached_tokens": 0}
+
+    totals = client.usage_snapshot()
+    assert totals["openai/gpt-4o"] == {"calls": 4, "prompt_tokens": 2100, "cached_tokens": 1600}
+
+    client._record_usage("openai", "gpt-4o", 10, 0)  # outside any job
+    assert first["openai/gpt-4o"]["calls"] == 2
+    print("✓ SUCCESS")
+
+
+class _Session:
+    def __init__(self, job):
+        self.job, self.commits = job, 0
+
+    def query(self, model):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        return self.job
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def test_usage_is_saved_on_the_job():
+    print("--- Testing usage persisted in job metadata ---")
+    job = SimpleNamespace(project_metadata={"brand_name": "EcoFit"})
+    db = _Session(job)
+    attempt = {"openai/gpt-4o": {"calls": 3, "prompt_tokens": 3000, "cached_tokens": 2048}}
+
+    _save_usage(db, "job-1", attempt)
+    _save_usage(db, "job-1", attempt)  # a retried attempt adds to the totals
+    _save_usage(db, "job-1", {})
+
+    assert job.project_metadata["brand_name"] == "EcoFit"
+    assert job.project_metadata["llm_usage"] == {
+        "openai/gpt-4o": {"calls": 6, "prompt_tokens": 6000, "cached_tokens": 4096},
+    }
+    assert db.commits == 2, "An attempt without LLM calls writes nothing"
+    print("✓ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_usage_is_tracked_per_task()
+    test_usage_is_saved_on_the_job()
@@ -58,7 +58,7 @@ async def test_phase2_workflow():
 
     # 4. Consensus
     print("\n[4] Generating Consensus...")
-    consensus_result = consensus_service.generate_consensus(triple_analysis_results)
+    consensus_result = await consensus_service.generate_consensus(triple_analysis_results)
     
     print("\n--- FINAL CONSENSUS STRATEGY ---")
     print(json.dumps(consensus_result, indent=2))
@@ -0,0 +1,200 @@
+"""
+Tests for the quorum scheduler and hedged requests (no external services needed).
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.multi_analysis_service import MultiAnalysisService
+from app.services.pipeline_scheduler import gather_quorum, hedged, latency_tracker
+
+
+async def _after(delay: float, value):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def _boom():
+    raise RuntimeError("provider down")
+
+
+def test_slow_source_is_dropped_after_quorum():
+    print("--- Testing quorum + grace period drops a straggler ---")
+    arrived = []
+
+    async def on_result(name, result):
+        arrived.append(name)
+
+    async def run():
+        return await gather_quorum(
+            {
+                "gemini": _after(0.01, {"trends": 1}),
+                "news": _after(0.02, {"articles": 1}),
+                "perplexity": _after(5, {"late": True}),
+            },
+            quorum=2,
+            timeout=5,
+            grace=0.05,
+            required=["gemini"],
+            on_result=on_result,
+        )
+
+    outcome = asyncio.run(run())
+    assert set(outcome.results) == {"gemini", "news"}
+    assert outcome.dropped == ["perplexity"]
+    assert arrived == ["gemini", "news"], "Results are reported as they arrive"
+    print("✓ SUCCESS")
+
+
+def test_optional_failure_degrades_and_required_timeout_raises():
+    print("--- Testing optional failure and required timeout ---")
+
+    async def degraded():
+        return await gather_quorum(
+            {"gemini": _after(0.01, {"trends": 1}), "perplexity": _boom()},
+            quorum=2, timeout=1, required=["gemini"],
+        )
+
+    outcome = asyncio.run(degraded())
+    assert outcome.results == {"gemini": {"trends": 1}, "perplexity": {}}
+    assert outcome.dropped == []
+
+    async def required_too_slow():
+        return await gather_quorum(
+            {"gemini": _after(5, {}), "news": _after(0.01, {"articles": 1})},
+            quorum=1, timeout=0.1, required=["gemini"],
+        )
+
+    try:
+        asyncio.run(required_too_slow())
+    except asyncio.TimeoutError:
+        print("✓ SUCCESS")
+    else:
+        raise AssertionError("A dropped required source must fail the stage")
+
+
+def test_hedged_request_beats_straggler():
+    print("--- Testing that a hedged duplicate wins over a straggler ---")
+    delays = iter([5, 0.01])  # first attempt stalls, the hedge answers quickly
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        return await _after(next(delays), "answer")
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await hedged("test:straggler", call, delay=0.05)
+        return result, loop.time() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result == "answer"
+    assert len(attempts) == 2, "Exactly one hedge should be sent"
+    assert elapsed < 1, f"Hedge should cut the wait, took {elapsed:.2f}s"
+    print("✓ SUCCESS")
+
+
+def test_hedge_latency_and_budget():
+    print("--- Testing hedge latency samples and the hedge budget ---")
+    attempts = []
+
+    async def straggler():
+        attempts.append(1)
+        return await _after(5 if len(attempts) % 2 else 0.01, "answer")
+
+    async def run():
+        return await hedged("test:budget", straggler, delay=0.05)
+
+    asyncio.run(run())
+    assert len(attempts) == 2
+    # The sample is end-to-end from the first attempt, not just the fast hedge
+    assert latency_tracker._samples["test:budget"][-1] >= 0.05
+
+    # A second slow call right away exceeds the 10% budget: no duplicate is sent
+    attempts.clear()
+
+    async def slow_once():
+        attempts.append(1)
+        return await _after(0.1, "answer")
+
+    asyncio.run(hedged("test:budget", slow_once, delay=0.02))
+    assert len(attempts) == 1, "Hedges are capped at HEDGE_BUDGET of recent calls"
+
+    # A caller cancelling the call still records how long it had been running
+    async def cancelled():
+        task = asyncio.ensure_future(hedged("test:cancelled", lambda: _after(5, None), delay=10))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancelled())
+    assert latency_tracker._samples["test:cancelled"][-1] >= 0.05
+    print("✓ SUCCESS")
+
+
+def _analysis_service(delays):
+    """MultiAnalysisService whose models answer after the given delays (None = fail)."""
+    service = MultiAnalysisService()
+
+    def model(source):
+        async def analyse(user_content):
+            if delays[source] is None:
+                raise RuntimeError(f"{source} down")
+            return await _after(delays[source], {"hooks": [source], "source": source})
+        return analyse
+
+    service._gpt4o_analysis = model("gpt4o")
+    service._gemini_analysis = model("gemini")
+    service._perplexity_analysis = model("perplexity")
+    return service
+
+
+def test_triple_analysis_quorum_and_timeout():
+    print("--- Testing the triple analysis quorum and timeout ---")
+    saved = (settings.ANALYSIS_QUORUM, settings.ANALYSIS_QUORUM_GRACE)
+    settings.ANALYSIS_QUORUM, settings.ANALYSIS_QUORUM_GRACE = 2, 0.05
+    try:
+        service = _analysis_service({"gpt4o": 0.01, "gemini": 0.02, "perplexity": 5})
+        reported = []
+
+        async def on_result(source, result):
+            reported.append(source)
+
+        result = asyncio.run(service.run_triple_analysis({}, {}, on_result=on_result, timeout=5))
+        assert result["gpt4o_analysis"]["hooks"] == ["gpt4o"]
+        assert result["gemini_analysis"]["hooks"] == ["gemini"]
+        assert result["perplexity_analysis"]["error"].startswith("Dropped")
+        assert reported == ["gpt4o", "gemini", "perplexity"], "Dropped models are reported too"
+
+        # A failed model does not count towards the quorum: wait for the third
+        service = _analysis_service({"gpt4o": 0.01, "gemini": None, "perplexity": 0.1})
+        result = asyncio.run(service.run_triple_analysis({}, {}, timeout=5))
+        assert "error" in result["gemini_analysis"]
+        assert result["perplexity_analysis"]["hooks"] == ["perplexity"]
+
+        # Nobody finishes in time
+        service = _analysis_service({"gpt4o": 5, "gemini": 5, "perplexity": 5})
+        try:
+            asyncio.run(service.run_triple_analysis({}, {}, timeout=0.05))
+        except asyncio.TimeoutError:
+            print("✓ SUCCESS")
+        else:
+            raise AssertionError("No model finishing in time must raise TimeoutError")
+    finally:
+        settings.ANALYSIS_QUORUM, settings.ANALYSIS_QUORUM_GRACE = saved
+
+
+if __name__ == "__main__":
+    test_slow_source_is_dropped_after_quorum()
+    test_optional_failure_degrades_and_required_timeout_raises()
+    test_hedged_request_beats_straggler()
+    test_hedge_latency_and_budget()
+    test_triple_analysis_quorum_and_timeout()
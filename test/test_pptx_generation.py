@@ -63,5 +63,34 @@ def test_pptx():
     else:
         print("✗ FAILURE: File not created.")
 
+def test_template_cache():
+    print("--- Testing stripped template cache ---")
+    import tempfile
+    import time
+    from app.services import presentation_service as ps
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.pptx")
+        prs = Presentation()
+        for _ in range(3):
+            prs.slides.add_slide(prs.slide_layouts[6])
+        prs.save(template)
+
+        first = ps._load_template(template)
+        second = ps._load_template(template)
+        assert len(first.slides) == 0 and len(second.slides) == 0, "Template slides must be stripped"
+        assert first is not second, "Each render gets its own copy"
+        cached_bytes = ps._TEMPLATE_CACHE[template][1]
+
+        # Touching the file invalidates the entry
+        later = time.time() + 5
+        os.utime(template, (later, later))
+        ps._load_template(template)
+        assert ps._TEMPLATE_CACHE[template][0] == os.path.getmtime(template)
+        assert ps._TEMPLATE_CACHE[template][1] is not cached_bytes
+    print("✓ SUCCESS")
+
+
 if __name__ == "__main__":
     test_pptx()
+    test_template_cache()
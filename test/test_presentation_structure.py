@@ -1,5 +1,6 @@
 
 from dotenv import load_dotenv
+import asyncio
 import json
 from app.services.presentation_service import presentation_service
 
@@ -28,7 +29,7 @@ mock_analysis = {
 def test_structure():
     print("--- Testing Presentation Structuring (GPT-4o) ---")
     
-    result = presentation_service.structure_content(mock_questionnaire, mock_analysis)
+    result = asyncio.run(presentation_service.structure_content(mock_questionnaire, mock_analysis))
     
     print("\n[ Structure Result ]")
     print(json.dumps(result, indent=2))
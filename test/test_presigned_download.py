@@ -0,0 +1,96 @@
+"""
+Tests presigned downloads: URLs are only signed for the public MinIO endpoint,
+and without one the download endpoint proxies the file (no MinIO or DB needed).
+"""
+import io
+import sys
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.responses import RedirectResponse, StreamingResponse
+
+from app.api import endpoints
+from app.core.config import settings
+from app.services.auth_service import Principal
+from app.services.storage_service import storage_service
+
+OWNER = Principal(id=uuid.uuid4(), email="owner@example.com", is_admin=False, is_active=True)
+
+
+class _Session:
+    def __init__(self, job):
+        self.job = job
+
+    def query(self, model):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        return self.job
+
+
+def _with_public_endpoint(endpoint):
+    def decorate(test):
+        def wrapper():
+            saved = (settings.MINIO_PUBLIC_ENDPOINT, settings.MINIO_ENDPOINT, storage_service._presign_client)
+            settings.MINIO_PUBLIC_ENDPOINT, settings.MINIO_ENDPOINT = endpoint, "minio:9000"
+            storage_service._presign_client = None
+            try:
+                test()
+            finally:
+                settings.MINIO_PUBLIC_ENDPOINT, settings.MINIO_ENDPOINT, storage_service._presign_client = saved
+        wrapper.__name__ = test.__name__
+        return wrapper
+    return decorate
+
+
+def _download(mode):
+    job = SimpleNamespace(id="job-1", user_id=OWNER.id)
+    saved = endpoints.storage_service
+    # Real signing, but the PPTX itself comes from memory
+    endpoints.storage_service = SimpleNamespace(
+        presigned_downloads_enabled=storage_service.presigned_downloads_enabled,
+        presigned_download_url=storage_service.presigned_download_url,
+        exists=lambda key: True,
+        get_file_stream=lambda key: io.BytesIO(b"pptx"),
+    )
+    try:
+        return endpoints.download_presentation("job-1", mode=mode, db=_Session(job), current_user=OWNER)
+    finally:
+        endpoints.storage_service = saved
+
+
+@_with_public_endpoint("")
+def test_no_public_endpoint_proxies_instead_of_signing():
+    print("--- Testing downloads without MINIO_PUBLIC_ENDPOINT ---")
+    try:
+        storage_service.presigned_download_url("jobs/job-1/presentation.pptx")
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("Signing for the internal MinIO host must fail loudly")
+
+    for mode in ("url", "redirect", "stream"):
+        assert isinstance(_download(mode), StreamingResponse), f"mode={mode} must fall back to proxying"
+    print("✓ SUCCESS")
+
+
+@_with_public_endpoint("https://files.example.com")
+def test_public_endpoint_signs_for_the_browser_host():
+    print("--- Testing presigned URLs on the public endpoint ---")
+    result = _download("url")
+    assert result["url"].startswith("https://files.example.com/"), result["url"]
+    assert "minio:9000" not in result["url"]
+    assert isinstance(_download("redirect"), RedirectResponse)
+    print("✓ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_no_public_endpoint_proxies_instead_of_signing()
+    test_public_endpoint_signs_for_the_browser_host()
@@ -0,0 +1,63 @@
+"""
+Tests for the provider rate limiter using the in-memory bucket backend.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.rate_limiter import InMemoryBuckets, RateLimiter
+
+
+def test_bucket_queues_bursts_at_sustained_rate():
+    print("--- Testing reservation-based token bucket ---")
+    buckets = InMemoryBuckets()
+    # 10 tokens/s, room for a burst of 2
+    waits = [buckets.reserve("p:m:rpm", rate=10, capacity=2, cost=1) for _ in range(5)]
+    assert waits[0] == 0 and waits[1] == 0, "Burst capacity is admitted immediately"
+    assert all(b > a for a, b in zip(waits[1:], waits[2:])), "Queued callers are spaced out in order"
+    assert abs(waits[4] - 0.3) < 0.05
+    print("✓ SUCCESS")
+
+
+def test_limit_caps_concurrency_and_settles_tokens():
+    print("--- Testing per-provider concurrency cap ---")
+    previous = settings.PROVIDER_RATE_LIMITS
+    settings.PROVIDER_RATE_LIMITS = {"openai": {"rpm": 6000, "tpm": 60_000, "concurrency": 2}}
+    buckets = InMemoryBuckets()
+    limiter = RateLimiter(backend=buckets)
+    in_flight = 0
+    peak = 0
+
+    async def call():
+        nonlocal in_flight, peak
+        async with limiter.limit("openai", "gpt-4o", estimated_tokens=100) as lease:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            lease.actual_tokens = 40
+
+    try:
+        start = time.monotonic()
+        asyncio.run(_gather(call, 6))
+        assert peak == 2, f"Expected at most 2 in-flight calls, saw {peak}"
+        assert time.monotonic() - start >= 0.06
+        tokens, _ = buckets._buckets["openai:gpt-4o:tpm"]
+        assert tokens > 10_000 - 6 * 100, "Over-estimated tokens are credited back"
+    finally:
+        settings.PROVIDER_RATE_LIMITS = previous
+    print("✓ SUCCESS")
+
+
+async def _gather(factory, n):
+    await asyncio.gather(*(factory() for _ in range(n)))
+
+
+if __name__ == "__main__":
+    test_bucket_queues_bursts_at_sustained_rate()
+    test_limit_caps_concurrency_and_settles_tokens()
@@ -0,0 +1,181 @@
+"""
+Tests that decks render in the process pool and come back as valid .pptx bytes.
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from types import SimpleNamespace
+from pptx import Presentation
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services import workflow
+from app.services.render_pool import RenderPool
+
+mock_slides = {
+    "slides": [
+        {"type": "title", "title": "EcoFit Brand Strategy", "subtitle": "Sustainable Performance"},
+        {"type": "content", "title": "The Problem", "content": ["Plastic waste.", "Gym wear wears out."]},
+    ]
+}
+
+mock_questionnaire = {
+    "project_metadata": {"brand_name": "EcoFit", "industry": "Fitness"},
+    "the_creative_goal": {"desired_tone_of_voice": "Energetic"},
+}
+
+
+def test_render_in_process_pool():
+    print("--- Testing PPTX rendering in the process pool ---")
+    previous, settings.PPTX_RENDER_WORKERS = settings.PPTX_RENDER_WORKERS, 1
+    pool = RenderPool()
+    try:
+        data = asyncio.run(pool.render(mock_slides, mock_questionnaire))
+    finally:
+        pool.shutdown()
+        settings.PPTX_RENDER_WORKERS = previous
+
+    prs = Presentation(io.BytesIO(data))
+    assert len(prs.slides) == 2, f"Expected 2 slides, got {len(prs.slides)}"
+    print("✓ SUCCESS")
+
+
+def test_render_stream_builds_slides_as_they_arrive():
+    print("--- Testing streamed rendering in the process pool ---")
+
+    async def arriving():
+        for slide in mock_slides["slides"]:
+            await asyncio.sleep(0.01)
+            yield slide
+
+    previous, settings.PPTX_RENDER_WORKERS = settings.PPTX_RENDER_WORKERS, 1
+    pool = RenderPool()
+    try:
+        # Expect 3 but receive 2: the deck is rebuilt so slide counters stay right
+        data = asyncio.run(pool.render_stream(arriving(), mock_questionnaire, expected_total=3))
+    finally:
+        pool.shutdown()
+        settings.PPTX_RENDER_WORKERS = previous
+
+    prs = Presentation(io.BytesIO(data))
+    assert len(prs.slides) == 2, f"Expected 2 slides, got {len(prs.slides)}"
+    print("✓ SUCCESS")
+
+
+def test_render_stream_without_free_slot_buffers():
+    print("--- Testing streamed rendering when no stream slot is free ---")
+
+    async def arriving():
+        for slide in mock_slides["slides"]:
+            yield slide
+
+    saved = settings.PPTX_RENDER_WORKERS, settings.PPTX_STREAM_RENDER_WORKERS
+    settings.PPTX_RENDER_WORKERS, settings.PPTX_STREAM_RENDER_WORKERS = 0, 0
+    pool = RenderPool()
+    try:
+        data = asyncio.run(pool.render_stream(arriving(), mock_questionnaire, expected_total=2))
+    finally:
+        pool.shutdown()
+        settings.PPTX_RENDER_WORKERS, settings.PPTX_STREAM_RENDER_WORKERS = saved
+
+    assert len(Presentation(io.BytesIO(data)).slides) == 2
+    assert pool._streams_active == 0
+    print("✓ SUCCESS")
+
+
+class _BrokenExecutor(Executor):
+    """Fails every submission the way a pool with a dead worker does."""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_broken_pool_resets_only_itself():
+    print("--- Testing that a broken render pool is rebuilt on its own ---")
+    previous, settings.PPTX_RENDER_WORKERS = settings.PPTX_RENDER_WORKERS, 1
+    pool = RenderPool()
+    broken, streaming = _BrokenExecutor(), _BrokenExecutor()
+    pool._executor, pool._stream_executor = broken, streaming
+    try:
+        asyncio.run(pool.render(mock_slides, mock_questionnaire))
+    except BrokenProcessPool:
+        pass
+    else:
+        raise AssertionError("The broken pool error must reach the caller")
+    finally:
+        settings.PPTX_RENDER_WORKERS = previous
+
+    assert broken.shut_down and pool._executor is None, "The broken pool is dropped"
+    assert not streaming.shut_down and pool._stream_executor is streaming, "The stream pool keeps running"
+
+    replacement = _BrokenExecutor()
+    pool._executor = replacement
+    pool._discard_broken("_executor", broken)  # a late failure from the old pool
+    assert pool._executor is replacement and not replacement.shut_down
+    print("✓ SUCCESS")
+
+
+def test_workflow_falls_back_only_on_slide_stream_errors():
+    print("--- Testing the streamed-slides fallback ---")
+
+    async def failing_stream(questionnaire, analysis):
+        yield mock_slides["slides"][0]
+        raise RuntimeError("LLM stream dropped")
+
+    async def consume(slides, questionnaire, expected_total):
+        return b"".join([s["title"].encode() async for s in slides])
+
+    async def broken_render(slides, questionnaire, expected_total):
+        async for _ in slides:
+            raise BrokenProcessPool("worker died")
+
+    async def no_events(*args, **kwargs):
+        pass
+
+    saved = (workflow.presentation_service, workflow.render_pool, workflow.job_events)
+    workflow.presentation_service = SimpleNamespace(stream_slides=failing_stream)
+    workflow.job_events = SimpleNamespace(publish=no_events)
+    try:
+        workflow.render_pool = SimpleNamespace(render_stream=consume)
+        result = asyncio.run(workflow._stream_slides_and_render("job-1", mock_questionnaire, {}))
+        assert result == (None, None), "A failed slide stream falls back to one structuring request"
+
+        workflow.presentation_service = SimpleNamespace(
+            stream_slides=lambda questionnaire, analysis: _slides_from(mock_slides["slides"]),
+        )
+        workflow.render_pool = SimpleNamespace(render_stream=broken_render)
+        try:
+            asyncio.run(workflow._stream_slides_and_render("job-1", mock_questionnaire, {}))
+        except BrokenProcessPool:
+            pass
+        else:
+            raise AssertionError("A render failure must not trigger the structuring fallback")
+    finally:
+        workflow.presentation_service, workflow.render_pool, workflow.job_events = saved
+    print("✓ SUCCESS")
+
+
+async def _slides_from(slides):
+    for slide in slides:
+        yield slide
+
+
+if __name__ == "__main__":
+    test_render_in_process_pool()
+    test_render_stream_builds_slides_as_they_arrive()
+    test_render_stream_without_free_slot_buffers()
+    test_broken_pool_resets_only_itself()
+    test_workflow_falls_back_only_on_slide_stream_errors()
@@ -0,0 +1,118 @@
+"""
+Tests the cross-job research cache: hit, miss, TTL 0 and force_refresh
+(storage is replaced by an in-memory dict, no MinIO needed).
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.schemas.questionnaire import CampaignCreateRequest
+from app.services import research_cache as research_cache_module
+from app.services.research_cache import ResearchCache
+
+
+class MemoryStorage:
+    def __init__(self):
+        self.objects = {}
+
+    async def exists_async(self, key):
+        return key in self.objects
+
+    async def get_json_async(self, key):
+        return self.objects.get(key)
+
+    async def upload_json_async(self, key, data):
+        self.objects[key] = data
+        return True
+
+
+INPUTS = {"brand": "EcoFit", "industry": "Fitness", "country": "US"}
+
+
+def _run(cache, fetch, source="gemini", force_refresh=False):
+    return asyncio.run(cache.get_or_fetch(source, INPUTS, fetch, force_refresh=force_refresh))
+
+
+def _with_cache(test):
+    def wrapper():
+        storage = MemoryStorage()
+        saved = (research_cache_module.storage_service, settings.RESEARCH_CACHE_ENABLED, dict(settings.RESEARCH_CACHE_TTLS))
+        research_cache_module.storage_service = storage
+        settings.RESEARCH_CACHE_ENABLED = True
+        settings.RESEARCH_CACHE_TTLS = {**settings.RESEARCH_CACHE_TTLS, "gemini": 3600, "news": 0}
+        try:
+            test(ResearchCache(), storage)
+        finally:
+            research_cache_module.storage_service, settings.RESEARCH_CACHE_ENABLED, settings.RESEARCH_CACHE_TTLS = saved
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+def _counting_fetch(result):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return result
+
+    return fetch, calls
+
+
+@_with_cache
+def test_miss_then_hit(cache, storage):
+    print("--- Testing cache miss then hit ---")
+    fetch, calls = _counting_fetch({"trends": ["recycled fabrics"]})
+    assert _run(cache, fetch) == {"trends": ["recycled fabrics"]}
+    assert _run(cache, fetch) == {"trends": ["recycled fabrics"]}
+    assert len(calls) == 1, "Second call must be served from the cache"
+
+    # An entry older than the TTL is a miss
+    key = cache.cache_key("gemini", INPUTS)
+    storage.objects[key]["cached_at"] = (datetime.utcnow() - timedelta(hours=2)).isoformat()
+    _run(cache, fetch)
+    assert len(calls) == 2, "Expired entry must be re-fetched"
+    print("✓ SUCCESS")
+
+
+@_with_cache
+def test_ttl_zero_never_caches(cache, storage):
+    print("--- Testing TTL 0 ---")
+    fetch, calls = _counting_fetch({"articles": [1]})
+    _run(cache, fetch, source="news")
+    _run(cache, fetch, source="news")
+    assert len(calls) == 2
+    assert not storage.objects, "A source with TTL 0 must not be stored"
+    print("✓ SUCCESS")
+
+
+@_with_cache
+def test_force_refresh_bypasses_and_rewrites(cache, storage):
+    print("--- Testing force_refresh ---")
+    first, _ = _counting_fetch({"trends": ["old"]})
+    _run(cache, first)
+    fresh, calls = _counting_fetch({"trends": ["new"]})
+    assert _run(cache, fresh, force_refresh=True) == {"trends": ["new"]}
+    assert len(calls) == 1
+    assert _run(cache, fresh) == {"trends": ["new"]}, "The refreshed result replaces the cached one"
+    assert len(calls) == 1
+    print("✓ SUCCESS")
+
+
+def test_campaign_request_accepts_force_refresh():
+    print("--- Testing force_refresh on the campaign request ---")
+    base = {"client_id": "c1", "campaign_name": "Launch", "primary_objective": "Awareness", "desired_tone_of_voice": "Bold"}
+    assert CampaignCreateRequest(**base).force_refresh is False
+    assert CampaignCreateRequest(**base, force_refresh=True).force_refresh is True
+    print("✓ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_miss_then_hit()
+    test_ttl_zero_never_caches()
+    test_force_refresh_bypasses_and_rewrites()
+    test_campaign_request_accepts_force_refresh()
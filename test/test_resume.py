@@ -0,0 +1,222 @@
+"""
+Tests resuming failed jobs from their stored checkpoints
+(storage, DB session and job queue are in-memory stand-ins, no services needed).
+"""
+import asyncio
+import sys
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+
+from app.api import endpoints
+from app.db.models import JobStatus
+from app.services import workflow
+from app.services.auth_service import Principal
+from app.services.storage_service import storage_service
+
+
+class MemoryStorage:
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+
+    def exists(self, key):
+        return key in self.objects
+
+    def get_json(self, key):
+        return self.objects.get(key)
+
+    async def exists_async(self, key):
+        return self.exists(key)
+
+    async def get_json_async(self, key):
+        return self.get_json(key)
+
+
+class _Session:
+    """Serves one job for db.query(Job).filter(...).first()."""
+
+    def __init__(self, job):
+        self.job, self.commits = job, 0
+
+    def query(self, model):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def with_for_update(self):
+        return self
+
+    def first(self):
+        return self.job
+
+    def commit(self):
+        self.commits += 1
+
+
+class _Queue:
+    def __init__(self):
+        self.enqueued, self.pending, self.previous = [], False, None
+
+    def enqueue(self, job_id, task, payload, db=None):
+        self.enqueued.append((job_id, task, payload))
+
+    def has_pending(self, job_id, db=None):
+        return self.pending
+
+    def last_payload(self, job_id, db=None):
+        return self.previous
+
+
+JOB_ID = str(uuid.uuid4())
+OWNER = Principal(id=uuid.uuid4(), email="owner@example.com", is_admin=False, is_active=True)
+
+
+def _artifacts(*names):
+    return {f"jobs/{JOB_ID}/{name}": {"ok": True} for name in names}
+
+
+RESEARCH = dict(workflow.WORKFLOW_CHECKPOINTS)["quad_research"]
+
+
+def _with_storage(objects):
+    def decorate(test):
+        def wrapper():
+            storage = MemoryStorage(objects)
+            saved = (workflow.storage_service, endpoints.storage_service, endpoints.get_job_queue)
+            queue = _Queue()
+            workflow.storage_service = endpoints.storage_service = storage
+            endpoints.get_job_queue = lambda: queue
+            try:
+                test(storage, queue)
+            finally:
+                workflow.storage_service, endpoints.storage_service, endpoints.get_job_queue = saved
+        wrapper.__name__ = test.__name__
+        return wrapper
+    return decorate
+
+
+@_with_storage(_artifacts(*RESEARCH, "analysis_raw_triple.json"))
+def test_find_resume_step_picks_first_missing_checkpoint(storage, queue):
+    print("--- Testing the resume step lookup ---")
+    assert workflow.find_resume_step(JOB_ID) == "consensus"
+
+    del storage.objects[f"jobs/{JOB_ID}/research_news.json"]
+    assert workflow.find_resume_step(JOB_ID) == "quad_research", "A partial step is redone"
+
+    storage.objects.update(_artifacts(
+        "research_news.json", "analysis.json", "slides.json", "presentation.pptx",
+    ))
+    assert workflow.find_resume_step(JOB_ID) is None
+    print("✓ SUCCESS")
+
+
+@_with_storage({
+    **_artifacts("analysis.json"),
+    f"jobs/{JOB_ID}/analysis_raw_triple.json": {"error": "all models failed"},
+})
+def test_load_checkpoint_skips_missing_and_failed(storage, queue):
+    print("--- Testing checkpoint loading ---")
+    assert asyncio.run(workflow._load_checkpoint(JOB_ID, "analysis.json")) == {"ok": True}
+    assert asyncio.run(workflow._load_checkpoint(JOB_ID, "slides.json")) is None
+    assert asyncio.run(workflow._load_checkpoint(JOB_ID, "analysis_raw_triple.json")) is None, \
+        "An error payload must be recomputed"
+    print("✓ SUCCESS")
+
+
+@_with_storage({**_artifacts(*RESEARCH), f"jobs/{JOB_ID}/questionnaire.json": {"brand": "EcoFit"}})
+def test_resume_job_requeues_failed_job(storage, queue):
+    print("--- Testing resume of a failed job ---")
+    job = SimpleNamespace(
+        id=JOB_ID, user_id=OWNER.id, status=JobStatus.FAILED,
+        failed_step="triple_analysis", error_message="timeout",
+    )
+    db = _Session(job)
+    queue.previous = {"request_data": {"brand": "EcoFit"}, "force_refresh": True}
+    result = endpoints.resume_job(JOB_ID, db=db, current_user=OWNER)
+
+    assert result["resume_from"] == "triple_analysis"
+    assert job.status == JobStatus.APPROVED and job.failed_step is None and job.error_message is None
+    assert queue.enqueued == [(
+        JOB_ID, endpoints.RESEARCH_WORKFLOW_TASK,
+        {"request_data": {"brand": "EcoFit"}, "resume": True, "force_refresh": True},
+    )], "The resumed job keeps its original force_refresh"
+    assert db.commits == 1
+    print("✓ SUCCESS")
+
+
+@_with_storage({f"jobs/{JOB_ID}/questionnaire.json": {"brand": "EcoFit"}})
+def test_resume_job_rejects_job_still_in_queue(storage, queue):
+    print("--- Testing that a job waiting for a retry is not queued twice ---")
+    job = SimpleNamespace(id=JOB_ID, user_id=OWNER.id, status=JobStatus.FAILED)
+    queue.pending = True
+    try:
+        endpoints.resume_job(JOB_ID, db=_Session(job), current_user=OWNER)
+    except HTTPException as e:
+        assert e.status_code == 409
+    else:
+        raise AssertionError("A job with a queued or running entry must not be resumed")
+    assert not queue.enqueued and job.status == JobStatus.FAILED
+    print("✓ SUCCESS")
+
+
+@_with_storage({f"jobs/{JOB_ID}/questionnaire.json": {"brand": "EcoFit"}})
+def test_resume_job_rejects_unfailed_jobs(storage, queue):
+    print("--- Testing that only failed jobs can be resumed ---")
+    # RESEARCHING / ANALYZING are the running states
+    for status in (JobStatus.COMPLETED, JobStatus.RESEARCHING, JobStatus.ANALYZING):
+        job = SimpleNamespace(id=JOB_ID, user_id=OWNER.id, status=status)
+        try:
+            endpoints.resume_job(JOB_ID, db=_Session(job), current_user=OWNER)
+        except HTTPException as e:
+            assert e.status_code == 409
+        else:
+            raise AssertionError(f"A {status} job must not be resumed")
+
+    stranger = Principal(id=uuid.uuid4(), email="x@example.com", is_admin=False, is_active=True)
+    job = SimpleNamespace(id=JOB_ID, user_id=OWNER.id, status=JobStatus.FAILED)
+    try:
+        endpoints.resume_job(JOB_ID, db=_Session(job), current_user=stranger)
+    except HTTPException as e:
+        assert e.status_code == 403
+    else:
+        raise AssertionError("Another user's job must not be resumed")
+    assert not queue.enqueued
+    print("✓ SUCCESS")
+
+
+class _HeadOnlyS3:
+    def __init__(self, error_code=None):
+        self.error_code = error_code
+
+    def head_object(self, Bucket, Key):
+        if self.error_code:
+            raise ClientError({"Error": {"Code": self.error_code}}, "HeadObject")
+        return {"ContentLength": 1}
+
+
+def test_storage_exists():
+    print("--- Testing StorageService.exists ---")
+    saved = storage_service._s3_client
+    try:
+        for error_code, expected in ((None, True), ("404", False), ("NoSuchKey", False), ("403", False)):
+            storage_service._s3_client = _HeadOnlyS3(error_code)
+            assert storage_service.exists("jobs/x/analysis.json") is expected, error_code
+    finally:
+        storage_service._s3_client = saved
+    print("✓ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_find_resume_step_picks_first_missing_checkpoint()
+    test_load_checkpoint_skips_missing_and_failed()
+    test_resume_job_requeues_failed_job()
+    test_resume_job_rejects_job_still_in_queue()
+    test_resume_job_rejects_unfailed_jobs()
+    test_storage_exists()
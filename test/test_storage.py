@@ -37,9 +37,25 @@ def test_minio():
     except Exception as e:
         print(f"❌ MinIO Error: {e}")
 
+def test_json_encoding_roundtrip():
+    print("\n--- Testing compressed JSON encoding ---")
+    from app.services.storage_service import _loads, decode_body, encode_json
+
+    data = {"insights": ["Consumers want durable gym wear."] * 200, "score": 0.93}
+    body, encoding = encode_json(data, "gzip")
+    assert encoding == "gzip" and len(body) < len(str(data)) // 5
+    assert _loads(decode_body(body)) == data
+
+    # Tiny payloads and legacy uncompressed objects are stored / read as plain JSON
+    small, encoding = encode_json({"ok": True}, "gzip")
+    assert encoding is None
+    assert _loads(decode_body(b'{"legacy": 1}')) == {"legacy": 1}
+    print("✅ Round-trip verified")
+
 if __name__ == "__main__":
     # Give Docker a moment to spin up if just started
     print("Waiting 5s for services to warm up...")
     time.sleep(5)
     test_postgres()
     test_minio()
+    test_json_encoding_roundtrip()